@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the iterative auto-scaling loop (used up to version 0.4.1) with
+`IconFont.fit_font` on all icons of the bundled Font Awesome font.
+
+Usage:
+    $ python benchmarks/bench_auto_scale.py [--size SIZE]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import sys
+import timeit
+
+from PIL import Image, ImageDraw, ImageFont
+
+from common import CSS_FILE, TTF_FILE
+from icon_font_to_png import IconFont
+from icon_font_to_png.stats import ExportStats
+
+
+def legacy_fit_font(ttf_file, char, size, draw):
+    """Auto-scaling loop from `IconFont.export_icon` in version 0.4.1"""
+    font = ImageFont.truetype(ttf_file, size)
+    # `export_icon` measured the text once before entering the loop
+    measurements = 1
+    iteration = 0
+    factor = 1
+
+    while True:
+        width, height = draw.textsize(char, font=font)
+        measurements += 1
+
+        dim = max(width, height)
+        if dim > size:
+            font = ImageFont.truetype(ttf_file, int(size * size/dim * factor))
+        else:
+            break
+
+        iteration += 1
+        if iteration % 2 == 0:
+            factor *= 0.99
+
+    return font, measurements
+
+
+def bench_legacy(icon_font, size, draw):
+    measurements = 0
+    for char in icon_font.css_icons.values():
+        measurements += legacy_fit_font(icon_font.ttf_file, char, size,
+                                        draw)[1]
+    return measurements
+
+
+def bench_fit_font(icon_font, size, draw):
+    icon_font.stats = ExportStats()
+    for char in icon_font.css_icons.values():
+        icon_font.fit_font(char, size, draw)
+
+    # Each text measurement is counted as an auto-scale iteration
+    return icon_font.stats.counters['auto_scale_iterations']
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=150)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    icon_font = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE)
+    draw = ImageDraw.Draw(Image.new("RGBA", (args.size, args.size)))
+
+    for name, func in (('legacy loop', bench_legacy),
+                       ('fit_font', bench_fit_font)):
+        measurements = func(icon_font, args.size, draw)
+        seconds = min(timeit.repeat(
+            lambda: func(icon_font, args.size, draw),
+            repeat=args.repeat, number=1,
+        ))
+        print("{name:<12} {icons} icons: {measurements} text measurements, "
+              "{seconds:.3f}s".format(name=name,
+                                      icons=len(icon_font.css_icons),
+                                      measurements=measurements,
+                                      seconds=seconds))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Compares 'tinycss' and 'fast' CSS parsers on the bundled CSS files and on
+generated, Font Awesome like, CSS files with a lot of icon rules.
+
+Usage:
+    $ python benchmarks/bench_css.py [--rules RULES]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from common import FILES_DIR
+from icon_font_to_png import IconFont
+
+
+def generate_css(path, rules, minified=False):
+    """Writes CSS file with given number of icon rules"""
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(".ic {\n  display: inline-block;\n  font-family: Ic;\n}\n")
+        for i in range(rules):
+            # Every tenth rule is an alias, like in Font Awesome
+            if i % 10 == 9:
+                selector = '.ic-icon-{i}:before,\n.ic-alias-{i}:before'
+            else:
+                selector = '.ic-icon-{i}:before'
+            f.write((selector + ' {{\n  content: "\\{codepoint:x}";\n}}\n')
+                    .format(i=i, codepoint=0xe000 + i % 0x1000))
+
+    if minified:
+        with io.open(path, encoding='utf-8') as f:
+            css = f.read()
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(css.replace('\n', '').replace(': ', ':')
+                    .replace(' {', '{').replace(';}', '}'))
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rules', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    tmp_dir = tempfile.mkdtemp()
+    generated = os.path.join(tmp_dir, 'generated.css')
+    minified = os.path.join(tmp_dir, 'generated.min.css')
+    generate_css(generated, args.rules)
+    generate_css(minified, args.rules, minified=True)
+
+    css_files = [
+        os.path.join(FILES_DIR, 'font-awesome.css'),
+        os.path.join(FILES_DIR, 'octicons.css'),
+        generated,
+    ]
+
+    try:
+        for css_file in css_files:
+            results = {}
+            for css_parser in ('tinycss', 'fast'):
+                def load():
+                    # Icons are loaded on first access
+                    icon_font = IconFont(css_file=css_file, ttf_file=None,
+                                         css_parser=css_parser)
+                    icon_font.css_icons
+                    return icon_font
+
+                results[css_parser] = load()
+                seconds = min(timeit.repeat(load, repeat=args.repeat,
+                                            number=1))
+                print("{name:<20} {parser:<8} {icons:>6} icons "
+                      "{seconds:.3f}s".format(
+                          name=os.path.basename(css_file), parser=css_parser,
+                          icons=len(results[css_parser].css_icons),
+                          seconds=seconds))
+
+            same = (results['tinycss'].css_icons ==
+                    results['fast'].css_icons and
+                    results['tinycss'].common_prefix ==
+                    results['fast'].common_prefix)
+            print("{name:<20} identical results: {same}".format(
+                name=os.path.basename(css_file), same=same))
+
+        # tinycss based parser doesn't handle multiple selectors per line
+        seconds = min(timeit.repeat(
+            lambda: IconFont(css_file=minified, ttf_file=None,
+                             css_parser='fast').css_icons,
+            repeat=args.repeat, number=1,
+        ))
+        icons = IconFont(css_file=minified, ttf_file=None,
+                         css_parser='fast').css_icons
+        print("{name:<20} {parser:<8} {icons:>6} icons {seconds:.3f}s".format(
+            name=os.path.basename(minified), parser='fast',
+            icons=len(icons), seconds=seconds))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Compares encoding time and file size of exported images with different
+formats and compression options, on all icons of the bundled Font Awesome
+font. Images are encoded in memory.
+
+Usage:
+    $ python benchmarks/bench_encode.py [--size SIZE] [--color COLOR]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import io
+import sys
+import timeit
+
+from common import CSS_FILE, TTF_FILE
+from icon_font_to_png import IconFont
+from icon_font_to_png.encoder import ImageEncoder
+
+
+ENCODERS = (
+    ('png', dict()),
+    ('png, level 1', dict(compress_level=1)),
+    ('png, level 9', dict(compress_level=9)),
+    ('png, rle', dict(strategy='rle')),
+    ('palette', dict(palette=True)),
+    ('palette, level 9', dict(palette=True, compress_level=9)),
+    ('webp', dict(format='webp')),
+)
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--color', type=str, default='#336699')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    icon_font = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE)
+    images = [
+        icon_font.render_icon(icon, args.size, color=args.color)
+        for icon in icon_font.css_icons
+    ]
+
+    for name, options in ENCODERS:
+        encoder = ImageEncoder(**options)
+        sizes = []
+
+        def encode_all():
+            del sizes[:]
+            for image in images:
+                fp = io.BytesIO()
+                encoder.save([image], fp, args.color)
+                sizes.append(len(fp.getvalue()))
+
+        seconds = min(timeit.repeat(encode_all, repeat=args.repeat, number=1))
+        print("{name:<17} {time:.3f}ms, {size:.0f} bytes per icon".format(
+            name=name,
+            time=seconds * 1000 / len(images),
+            size=float(sum(sizes)) / len(images)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Measures package import time and command line cold start (in fresh Python
+processes), and lists heavy dependencies imported along the way.
+
+Usage:
+    $ python benchmarks/bench_import.py [--repeat REPEAT]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+from common import CSS_FILE, ROOT_DIR, TTF_FILE
+
+
+SCRIPT = os.path.join(ROOT_DIR, 'bin', 'icon-font-to-png')
+
+# Dependencies which shouldn't be imported unless they're needed
+HEAVY_MODULES = ('PIL', 'tinycss', 'requests', 'numpy', 'multiprocessing')
+
+COMMANDS = [
+    ('python -c pass', ['-c', 'pass']),
+    ('import icon_font_to_png', ['-c', 'import icon_font_to_png']),
+    ('import command_line',
+     ['-c', 'import icon_font_to_png.command_line']),
+    ('cli -h', [SCRIPT, '-h']),
+    ('cli --list', [SCRIPT, '--list', '--css', CSS_FILE, '--ttf', TTF_FILE]),
+    ('cli --list (fast)', [SCRIPT, '--list', '--css_parser', 'fast',
+                           '--css', CSS_FILE, '--ttf', TTF_FILE]),
+]
+
+
+def run_python(arguments):
+    """Runs Python with given arguments in the repository directory"""
+    with open(os.devnull, 'w') as devnull:
+        subprocess.check_call([sys.executable] + arguments, cwd=ROOT_DIR,
+                              stdout=devnull)
+
+
+def imported_modules(module):
+    """Returns heavy dependencies imported by importing given module"""
+    code = (
+        "import sys, {module}; "
+        "print(' '.join(m for m in {heavy!r} if m in sys.modules))"
+    ).format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', code],
+                                     cwd=ROOT_DIR)
+    return output.decode('utf-8').split()
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args(arguments)
+
+    for name, command in COMMANDS:
+        seconds = min(timeit.repeat(lambda: run_python(command),
+                                    repeat=args.repeat, number=1))
+        print("{name:<26} {ms:>7.1f}ms".format(name=name, ms=seconds * 1000))
+
+    for module in ('icon_font_to_png', 'icon_font_to_png.command_line'):
+        print("{module:<30} imports: {modules}".format(
+            module=module,
+            modules=', '.join(imported_modules(module)) or '-'))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
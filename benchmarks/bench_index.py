@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Compares selecting icons with `IconIndex` and with linear scans of all icon
+names, on generated icon fonts with a lot of icons.
+
+Usage:
+    $ python benchmarks/bench_index.py [--icons ICONS]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import fnmatch
+import re
+import sys
+import timeit
+
+from six import unichr
+
+import common  # noqa: F401 -- puts the checkout on sys.path
+from icon_font_to_png.index import IconIndex
+
+
+WORDS = ('arrow', 'chevron', 'circle', 'file', 'user', 'cloud', 'star',
+         'heart', 'folder', 'caret', 'square', 'bell', 'lock', 'map')
+
+
+def generate_icons(count):
+    """Returns dict of generated icon names and characters"""
+    icons = dict()
+    for i in range(count):
+        name = '{first}-{second}-{i}'.format(
+            first=WORDS[i % len(WORDS)],
+            second=WORDS[(i // len(WORDS)) % len(WORDS)], i=i,
+        )
+        icons[name] = unichr(0xe000 + i % 0x1000)
+    return icons
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--icons', type=int, default=20000)
+    parser.add_argument('--number', type=int, default=100)
+    args = parser.parse_args(arguments)
+
+    icons = generate_icons(args.icons)
+    names = sorted(icons)
+
+    seconds = timeit.timeit(lambda: IconIndex(icons), number=10) / 10
+    print("building index of {count} icons: {ms:.2f}ms".format(
+        count=len(icons), ms=seconds * 1000))
+    index = IconIndex(icons)
+
+    queries = [
+        ('glob arrow-*', lambda: index.glob('arrow-*'),
+         lambda: fnmatch.filter(names, 'arrow-*')),
+        ('glob arrow-circle-1*', lambda: index.glob('arrow-circle-1*'),
+         lambda: fnmatch.filter(names, 'arrow-circle-1*')),
+        ('regex ^chevron-star-', lambda: index.regex('^chevron-star-'),
+         lambda: [name for name in names
+                  if re.search('^chevron-star-', name)]),
+        ('codepoint U+E123', lambda: index.by_codepoint(0xe123),
+         lambda: [name for name in names if ord(icons[name]) == 0xe123]),
+    ]
+
+    for name, indexed, linear in queries:
+        assert indexed() == linear()
+        indexed_seconds = timeit.timeit(indexed, number=args.number)
+        linear_seconds = timeit.timeit(linear, number=args.number)
+        print("{name:<24} {matches:>5} matches: index {indexed:.3f}ms, "
+              "linear scan {linear:.3f}ms".format(
+                  name=name, matches=len(indexed()),
+                  indexed=indexed_seconds * 1000 / args.number,
+                  linear=linear_seconds * 1000 / args.number))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Compares rendering icons with FreeType, drawing them from glyph outlines,
+and exporting them as SVG images, in several sizes, on (a part of) the
+icons of the bundled Font Awesome font. Images aren't written to disk.
+
+Usage:
+    $ python benchmarks/bench_outline.py [--sizes SIZE [SIZE ...]]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import sys
+import timeit
+
+from common import CSS_FILE, TTF_FILE
+from icon_font_to_png import IconFont
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[64, 256, 1024])
+    parser.add_argument('--icons', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    freetype = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE)
+    outline = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE,
+                       rasterizer='outline')
+    icons = list(freetype.css_icons.keys())[:args.icons]
+
+    # Read (and cache) glyph outlines up front
+    for icon in icons:
+        outline.glyph_outline(icon)
+        freetype.glyph_outline(icon)
+
+    funcs = (
+        ('freetype', lambda icon, size: freetype.render_icon(icon, size)),
+        ('outline', lambda icon, size: outline.render_icon(icon, size)),
+        ('svg', lambda icon, size: freetype.render_svg(icon, size)),
+    )
+
+    for size in args.sizes:
+        for name, func in funcs:
+            def render_all():
+                for icon in icons:
+                    func(icon, size)
+
+            seconds = min(timeit.repeat(render_all, repeat=args.repeat,
+                                        number=1))
+            print("{size:>5}px {name:<9} {time:.3f}ms per icon".format(
+                size=size, name=name, time=seconds * 1000 / len(icons)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
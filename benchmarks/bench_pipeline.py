@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Compares `IconFont.export_icons` with the threaded export pipeline, on Font
+Awesome icons, optionally simulating slow (e.g. network) file system
+writes.
+
+Usage:
+    $ python benchmarks/bench_pipeline.py [--size SIZE] [--write_latency MS]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+from common import CSS_FILE, TTF_FILE
+from icon_font_to_png import IconFont
+from icon_font_to_png.pipeline import ExportPipeline
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--icons', type=int, default=200)
+    parser.add_argument('--write_latency', metavar='MS', type=float,
+                        default=5.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    icon_font = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE)
+    icons = list(icon_font.css_icons)[:args.icons]
+
+    # Simulate file system latency
+    save_file = icon_font.save_file
+
+    def slow_save_file(entry, save):
+        time.sleep(args.write_latency / 1000.0)
+        save_file(entry, save)
+
+    icon_font.save_file = slow_save_file
+
+    export_dir = tempfile.mkdtemp()
+    try:
+        functions = [
+            ('export_icons', lambda: icon_font.export_icons(
+                icons, args.size, export_dir=export_dir)),
+        ]
+        for workers in (1, 2):
+            for in_flight in (4, 32):
+                pipeline = ExportPipeline(icon_font, render_workers=workers,
+                                          max_in_flight=in_flight)
+                functions.append((
+                    'pipeline ({workers} render, {in_flight} in '
+                    'flight)'.format(workers=workers, in_flight=in_flight),
+                    lambda pipeline=pipeline: pipeline.export_icons(
+                        icons, args.size, export_dir=export_dir),
+                ))
+
+        for name, func in functions:
+            seconds = min(timeit.repeat(func, repeat=args.repeat, number=1))
+            print("{name:<34} {seconds:.3f}s".format(name=name,
+                                                     seconds=seconds))
+    finally:
+        shutil.rmtree(export_dir)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
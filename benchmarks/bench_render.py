@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the rendering pipeline used up to version 0.4.1 (two glyph
+rasterizations, four full size images) with the current one, on all icons
+of the bundled Font Awesome font. Exported files aren't written to disk.
+
+Usage:
+    $ python benchmarks/bench_render.py [--size SIZE] [--color COLOR]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import sys
+import timeit
+
+from PIL import Image, ImageChops, ImageDraw
+
+from common import CSS_FILE, TTF_FILE
+from icon_font_to_png import IconFont
+
+
+def legacy_render(icon_font, icon, size, color):
+    """Rendering part of `IconFont.export_icon` in version 0.4.1"""
+    org_size = size
+    size = max(150, size)
+
+    image = Image.new("RGBA", (size, size), color=(0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    font, width, height = icon_font.fit_font(icon_font.css_icons[icon], size,
+                                             draw)
+    draw.text((float(size - width) / 2, float(size - height) / 2),
+              icon_font.css_icons[icon], font=font, fill=color)
+    bbox = image.getbbox()
+
+    image_mask = Image.new("L", (size, size), 0)
+    draw_mask = ImageDraw.Draw(image_mask)
+    draw_mask.text((float(size - width) / 2, float(size - height) / 2),
+                   icon_font.css_icons[icon], font=font, fill=255)
+
+    icon_image = Image.new("RGBA", (size, size), color)
+    icon_image.putalpha(image_mask)
+    if bbox:
+        icon_image = icon_image.crop(bbox)
+
+    border_w = int((size - (bbox[2] - bbox[0])) / 2)
+    border_h = int((size - (bbox[3] - bbox[1])) / 2)
+
+    out_image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    out_image.paste(icon_image, (border_w, border_h))
+
+    if org_size != size:
+        out_image = out_image.resize((org_size, org_size), Image.ANTIALIAS)
+
+    return out_image
+
+
+def current_render(icon_font, icon, size, color):
+    """Rendering part of `IconFont.export_icon`"""
+    return icon_font.render_icon(icon, size, color=color)
+
+
+class AllocationCounter(object):
+    """Counts pixel memory of all images created by PIL"""
+    def __init__(self):
+        self.bytes = 0
+        self.images = 0
+
+    def __enter__(self):
+        self._new = Image.Image._new
+
+        def _new(image, im):
+            self.images += 1
+            self.bytes += im.size[0] * im.size[1] * len(im.mode)
+            return self._new(image, im)
+
+        Image.Image._new = _new
+        return self
+
+    def __exit__(self, *args):
+        Image.Image._new = self._new
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=16)
+    parser.add_argument('--color', type=str, default='blue')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    icon_font = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE)
+    icons = list(icon_font.css_icons.keys())
+
+    # Make sure both pipelines give the same results
+    different = 0
+    for icon in icons:
+        legacy = legacy_render(icon_font, icon, args.size, args.color)
+        current = current_render(icon_font, icon, args.size, args.color)
+        if ImageChops.difference(legacy, current).getbbox() is not None:
+            different += 1
+    print("{different} of {count} icons rendered differently".format(
+        different=different, count=len(icons)))
+
+    for name, func in (('legacy', legacy_render),
+                       ('current', current_render)):
+        def render_all():
+            for icon in icons:
+                func(icon_font, icon, args.size, args.color)
+
+        with AllocationCounter() as counter:
+            render_all()
+
+        seconds = min(timeit.repeat(render_all, repeat=args.repeat, number=1))
+        print("{name:<8} {time:.3f}ms, {images:.1f} images, {kb:.1f}kB "
+              "of pixel data per icon".format(
+                  name=name,
+                  time=seconds * 1000 / len(icons),
+                  images=float(counter.images) / len(icons),
+                  kb=float(counter.bytes) / len(icons) / 1024))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
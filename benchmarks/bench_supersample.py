@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Compares quality and speed of rendering icons with several supersampling
+factors (and the default 150x150 pixels canvas). Quality is the difference
+from the reference images in the test files (rendered on the default
+canvas), speed is measured on (a part of) the icons of the bundled Font
+Awesome font, in several sizes. Images aren't written to disk.
+
+Usage:
+    $ python benchmarks/bench_supersample.py [--factors N [N ...]]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import os
+import sys
+import timeit
+
+from PIL import Image, ImageChops, ImageStat
+
+from common import CSS_FILE, FILES_DIR, TTF_FILE
+from icon_font_to_png import IconFont
+
+
+# Reference images of 'rocket' icon, and their size and scale
+REFERENCES = [
+    ('rocket_16.png', 16, 'auto'),
+    ('rocket_100.png', 100, 'auto'),
+    ('rocket_256.png', 256, 'auto'),
+    ('rocket_x1.png', 16, 1),
+    ('rocket_x05.png', 16, 0.5),
+]
+
+
+def difference(icon_font, image, size, scale):
+    """Returns mean and maximum alpha difference from reference image"""
+    reference = Image.open(os.path.join(FILES_DIR, image)).convert('RGBA')
+    rendered = icon_font.render_icon('rocket', size, scale=scale)
+    diff = ImageChops.difference(reference.getchannel('A'),
+                                 rendered.getchannel('A'))
+    return ImageStat.Stat(diff).mean[0], diff.getextrema()[1]
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--factors', type=int, nargs='+',
+                        default=[1, 2, 4, 8])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 64])
+    parser.add_argument('--icons', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    modes = [('150px canvas', None)] + [
+        ('supersample {0}'.format(factor), factor) for factor in args.factors
+    ]
+
+    print("{0:<16}{1:>10}{2:>10}".format('quality', 'mean diff',
+                                         'max diff'))
+    for name, factor in modes:
+        icon_font = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE,
+                             supersample=factor)
+        diffs = [difference(icon_font, image, size, scale)
+                 for image, size, scale in REFERENCES]
+        print("{name:<16}{mean:>10.2f}{max:>10}".format(
+            name=name, mean=sum(diff[0] for diff in diffs) / len(diffs),
+            max=max(diff[1] for diff in diffs),
+        ))
+
+    print()
+    print("{0:<16}".format('speed') + ''.join(
+        '{0:>10}'.format('{0}px'.format(size)) for size in args.sizes
+    ))
+    for name, factor in modes:
+        icon_font = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE,
+                             supersample=factor)
+        icons = list(icon_font.css_icons.keys())[:args.icons]
+
+        line = '{0:<16}'.format(name)
+        for size in args.sizes:
+            def render():
+                for icon in icons:
+                    icon_font.render_icon(icon, size)
+
+            # Load fonts in all the sizes first
+            render()
+            seconds = min(timeit.repeat(render, repeat=args.repeat,
+                                        number=1))
+            line += '{0:>10}'.format(
+                '{0:.2f}ms'.format(seconds * 1000 / len(icons))
+            )
+        print(line)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
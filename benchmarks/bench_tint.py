@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Compares coloring icon alpha masks one color at a time with coloring them
+in a batch (vectorised with NumPy, if it's installed), on all icons of
+the bundled Font Awesome font.
+
+Usage:
+    $ python benchmarks/bench_tint.py [--size SIZE] [--colors COLORS]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import sys
+import timeit
+
+from common import CSS_FILE, TTF_FILE
+from icon_font_to_png import IconFont, icon_font as icon_font_module
+
+
+def one_by_one(mask, colors):
+    """Coloring used by `IconFont.render_variants` up to version 0.4.1"""
+    return [icon_font_module.colorize_mask(mask, color) for color in colors]
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--colors', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    icon_font = IconFont(css_file=CSS_FILE, ttf_file=TTF_FILE)
+    masks = [
+        icon_font.draw_mask(icon, args.size)
+        for icon in icon_font.css_icons
+    ]
+    colors = [
+        '#{value:06x}'.format(value=i * 0xFFFFFF // args.colors)
+        for i in range(args.colors)
+    ]
+
+    numpy = icon_font_module.numpy
+    funcs = [('one by one', one_by_one)]
+    if numpy is not None:
+        funcs.append(('numpy', icon_font_module.colorize_masks))
+
+    def batch_pil(mask, colors):
+        icon_font_module.numpy = None
+        try:
+            return icon_font_module.colorize_masks(mask, colors)
+        finally:
+            icon_font_module.numpy = numpy
+    funcs.append(('batch PIL', batch_pil))
+
+    for name, func in funcs:
+        def colorize_all():
+            for mask in masks:
+                func(mask, colors)
+
+        seconds = min(timeit.repeat(colorize_all, repeat=args.repeat,
+                                    number=1))
+        print("{name:<11} {time:.3f}ms per icon ({colors} colors)".format(
+            name=name, time=seconds * 1000 / len(masks), colors=len(colors)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+Setup shared by the benchmarks, which are run as scripts from a checkout
+of the repository (e.g. `python benchmarks/suite.py`).
+"""
+from __future__ import absolute_import, unicode_literals
+
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FILES_DIR = os.path.join(ROOT_DIR, 'icon_font_to_png', 'test', 'files')
+
+# Bundled Font Awesome files, used by most of the benchmarks
+CSS_FILE = os.path.join(FILES_DIR, 'font-awesome.css')
+TTF_FILE = os.path.join(FILES_DIR, 'fontawesome-webfont.ttf')
+
+# Benchmark the package in the checkout, not an installed one
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Runs benchmarks of CSS parsing and icon exporting on the bundled icon fonts.
+
+Results are printed and can be saved as JSON, to compare them with results
+of another version of the package (or another machine). No network access
+is needed.
+
+Usage:
+    $ python benchmarks/suite.py [--output FILE] [--compare FILE] [--quick]
+"""
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import datetime
+import fnmatch
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from collections import OrderedDict
+
+from common import FILES_DIR, ROOT_DIR
+import icon_font_to_png
+from icon_font_to_png import IconFont
+from icon_font_to_png.index import IconIndex
+from icon_font_to_png.pipeline import ExportPipeline
+
+
+# Bundled icon fonts and an icon used for single icon benchmarks
+FONTS = OrderedDict([
+    ('font-awesome', dict(
+        css_file=os.path.join(FILES_DIR, 'font-awesome.css'),
+        ttf_file=os.path.join(FILES_DIR, 'fontawesome-webfont.ttf'),
+        icon='rocket',
+    )),
+    ('octicons', dict(
+        css_file=os.path.join(FILES_DIR, 'octicons.css'),
+        ttf_file=os.path.join(FILES_DIR, 'octicons.ttf'),
+        icon='mark-github',
+    )),
+])
+
+SIZES = (16, 64, 256, 512)
+
+
+class Benchmark(object):
+    """Named function timed a given number of times"""
+    def __init__(self, name, func, repeat=5, number=1):
+        """
+        :param name: unique name, with '/' separated parts
+        :param func: function to time, called without arguments
+        :param repeat: how many times the function is timed
+        :param number: how many times it's called in each timing
+        """
+        self.name = name
+        self.func = func
+        self.repeat = repeat
+        self.number = number
+
+    def run(self, repeat=None):
+        """Returns a dict of timing results, in seconds per call"""
+        # Warm up (font and outline caches are filled in the first run)
+        self.func()
+        timings = [
+            seconds / self.number for seconds in timeit.repeat(
+                self.func, repeat=repeat or self.repeat, number=self.number
+            )
+        ]
+
+        return OrderedDict([
+            ('min', min(timings)),
+            ('median', median(timings)),
+            ('max', max(timings)),
+            ('repeat', len(timings)),
+            ('number', self.number),
+        ])
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def get_benchmarks(export_dir):
+    """Returns the list of all benchmarks"""
+    benchmarks = []
+    icon_fonts = OrderedDict(
+        (name, IconFont(css_file=font['css_file'], ttf_file=font['ttf_file']))
+        for name, font in FONTS.items()
+    )
+
+    # CSS parsing (icons are loaded on first access)
+    for name, font in FONTS.items():
+        for css_parser in ('tinycss', 'fast'):
+            def load_css(font=font, css_parser=css_parser):
+                return IconFont(css_file=font['css_file'],
+                                ttf_file=font['ttf_file'],
+                                css_parser=css_parser).css_icons
+
+            benchmarks.append(Benchmark(
+                'load_css/{font}/{parser}'.format(font=name,
+                                                  parser=css_parser),
+                load_css, repeat=10,
+            ))
+
+    # Single icon in different sizes
+    for name, icon_font in icon_fonts.items():
+        for size in SIZES:
+            def export_icon(icon_font=icon_font, icon=FONTS[name]['icon'],
+                            size=size):
+                icon_font.export_icon(icon, size, export_dir=export_dir)
+
+            benchmarks.append(Benchmark(
+                'export_icon/{font}/{size}'.format(font=name, size=size),
+                export_icon, repeat=10, number=10,
+            ))
+
+    # Automatic scaling (fitting icon size) and fixed scale, on every tenth
+    # Font Awesome icon
+    icon_font = icon_fonts['font-awesome']
+    icons = list(icon_font.css_icons)[::10]
+    for scale in ('auto', 1.0):
+        def export_icons(scale=scale):
+            icon_font.export_icons(icons, 64, scale=scale,
+                                   export_dir=export_dir)
+
+        benchmarks.append(Benchmark(
+            'scale/font-awesome/{scale}'.format(scale=scale),
+            export_icons,
+        ))
+
+    # Supersampled rendering of small icons, on every tenth Font Awesome icon
+    for factor in (None, 4):
+        supersampled = IconFont(css_file=FONTS['font-awesome']['css_file'],
+                                ttf_file=FONTS['font-awesome']['ttf_file'],
+                                supersample=factor)
+
+        def render_icons(icon_font=supersampled):
+            for icon in icons:
+                icon_font.render_icon(icon, 16)
+
+        benchmarks.append(Benchmark(
+            'supersample/font-awesome/{factor}'.format(factor=factor or 1),
+            render_icons,
+        ))
+
+    # Building the icon name index and querying it
+    benchmarks.append(Benchmark(
+        'index/font-awesome/build',
+        lambda: IconIndex(icon_font.css_icons, icon_font.common_prefix),
+        repeat=10, number=10,
+    ))
+    for query in ('arrow-*', '/^chevron-/', 'U+F135'):
+        benchmarks.append(Benchmark(
+            'index/font-awesome/{query}'.format(query=query),
+            lambda query=query: icon_font.index.select(query),
+            repeat=10, number=100,
+        ))
+
+    # All icons
+    for name, icon_font in icon_fonts.items():
+        for size in (16, 64):
+            def export_all(icon_font=icon_font, size=size):
+                icon_font.export_icons(list(icon_font.css_icons), size,
+                                       export_dir=export_dir)
+
+            benchmarks.append(Benchmark(
+                'export_all/{font}/{size}'.format(font=name, size=size),
+                export_all, repeat=3,
+            ))
+
+    # All icons, rendered, encoded and written in separate threads
+    for name, icon_font in icon_fonts.items():
+        pipeline = ExportPipeline(icon_font)
+
+        def export_pipeline(pipeline=pipeline, icon_font=icon_font):
+            pipeline.export_icons(list(icon_font.css_icons), 64,
+                                  export_dir=export_dir)
+
+        benchmarks.append(Benchmark(
+            'pipeline/{font}/64'.format(font=name),
+            export_pipeline, repeat=3,
+        ))
+
+    return benchmarks
+
+
+def get_environment():
+    """Returns information about the package version and the platform"""
+    try:
+        with open(os.devnull, 'w') as devnull:
+            commit = subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                stderr=devnull,
+            ).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import PIL
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+
+    return OrderedDict([
+        ('version', icon_font_to_png.__version__),
+        ('commit', commit),
+        ('date', datetime.datetime.utcnow().isoformat() + 'Z'),
+        ('python', platform.python_version()),
+        ('implementation', platform.python_implementation()),
+        ('pillow', getattr(PIL, '__version__', None)),
+        ('numpy', numpy_version),
+        ('platform', platform.platform()),
+        ('machine', platform.machine()),
+    ])
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints minimum times of benchmarks also found in baseline results, and
+    their ratios.
+
+    :returns list of names of benchmarks slower by more than `threshold`
+    """
+    regressions = []
+    print()
+    print("{name:<32} {old:>10} {new:>10} {ratio:>7}".format(
+        name="compared with {version} ({commit})".format(
+            **baseline['environment']),
+        old="old", new="new", ratio="ratio"))
+
+    for name, result in results.items():
+        if name not in baseline['results']:
+            continue
+
+        old = baseline['results'][name]['min']
+        new = result['min']
+        ratio = new / old
+        slower = ratio > 1 + threshold
+        if slower:
+            regressions.append(name)
+
+        print("{name:<32} {old:>8.2f}ms {new:>8.2f}ms {ratio:>6.2f}x"
+              "{mark}".format(name=name, old=old * 1000, new=new * 1000,
+                              ratio=ratio, mark=' slower' if slower else ''))
+
+    return regressions
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--output', metavar='FILE',
+                        help="save results as JSON")
+    parser.add_argument('--compare', metavar='FILE',
+                        help="compare results with ones saved before")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="fraction by which benchmarks can be slower "
+                             "than compared ones (default: 0.1)")
+    parser.add_argument('--filter', metavar='PATTERN', default='*',
+                        help="only run benchmarks matching the pattern, "
+                             "e.g. 'export_icon/*'")
+    parser.add_argument('--quick', action='store_true',
+                        help="time each benchmark only once")
+    args = parser.parse_args(arguments)
+
+    baseline = None
+    if args.compare:
+        with io.open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    export_dir = tempfile.mkdtemp()
+    results = OrderedDict()
+    try:
+        for benchmark in get_benchmarks(export_dir):
+            if not fnmatch.fnmatch(benchmark.name, args.filter):
+                continue
+
+            result = benchmark.run(repeat=1 if args.quick else None)
+            results[benchmark.name] = result
+            print("{name:<32} {min:>8.2f}ms (median {median:.2f}ms)".format(
+                name=benchmark.name, min=result['min'] * 1000,
+                median=result['median'] * 1000))
+            sys.stdout.flush()
+    finally:
+        shutil.rmtree(export_dir)
+
+    if args.output:
+        data = OrderedDict([
+            ('environment', get_environment()),
+            ('results', results),
+        ])
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+from icon_font_to_png.archive import ArchiveWriter  # noqa
 from icon_font_to_png.icon_font import IconFont  # noqa
 from icon_font_to_png.icon_font_downloader import (  # noqa
     FontAwesomeDownloader, OcticonsDownloader, AVAILABLE_ICON_FONTS
 )
+from icon_font_to_png.registry import FontRegistry  # noqa
 
 
 __version__ = '0.4.1'
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import os
+import sys
+import time
+
+from icon_font_to_png.lazy import lazy_import
+
+tarfile = lazy_import('tarfile')
+zipfile = lazy_import('zipfile')
+
+# Supported archive formats, and file extensions they're guessed from
+ARCHIVE_FORMATS = ('zip', 'tar', 'tar.gz')
+ARCHIVE_EXTENSIONS = (
+    ('.tar.gz', 'tar.gz'),
+    ('.tgz', 'tar.gz'),
+    ('.tar', 'tar'),
+    ('.zip', 'zip'),
+)
+
+# Archive path meaning standard output
+STDOUT = '-'
+
+
+class ArchiveWriter(object):
+    """
+    Zip or tar archive exported icons are written into one by one, as
+    they're rendered, instead of into thousands of separate files.
+
+    Archive is written sequentially - each file is appended as soon as it's
+    rendered, and nothing but the file being appended is kept in memory -
+    so it can be written into a pipe (e.g. standard output) as well. Tar
+    archives are streamed as they are; zip archives written into unseekable
+    files (which requires Python 3.5+) use data descriptors instead of
+    going back to fill in file sizes.
+    """
+    def __init__(self, path, format=None, mtime=None):
+        """
+        :param path: path to archive file, '-' for standard output, or
+                     binary file object
+        :param format: one of `ARCHIVE_FORMATS`; guessed from file extension
+                       if None ('tar' for standard output and file objects)
+        :param mtime: modification time of archived files (as timestamp);
+                      current time if None
+        :raises ValueError: if the archive format is unknown
+        """
+        format = format or guess_format(path)
+        if format is None:
+            raise ValueError("Can't guess archive format of '{path}'".format(
+                path=path)
+            )
+        if format not in ARCHIVE_FORMATS:
+            raise ValueError("Unknown archive format '{format}'".format(
+                format=format)
+            )
+
+        self.format = format
+        self.mtime = int(time.time() if mtime is None else mtime)
+        self._own_file = False
+
+        if path == STDOUT:
+            # Python 3 standard output is a text stream
+            fileobj = getattr(sys.stdout, 'buffer', sys.stdout)
+        elif hasattr(path, 'write'):
+            fileobj = path
+        else:
+            fileobj = io.open(path, 'wb')
+            self._own_file = True
+        self.fileobj = fileobj
+
+        if format == 'zip':
+            self._archive = zipfile.ZipFile(fileobj, 'w', allowZip64=True)
+        else:
+            self._archive = tarfile.open(
+                fileobj=fileobj, mode='w|gz' if format == 'tar.gz' else 'w|'
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, name, data, compress=False):
+        """
+        Appends file to the archive.
+
+        :param name: archived file name (path inside the archive)
+        :param data: file content as bytes
+        :param compress: whether to compress the file in zip archives;
+                         already compressed images (e.g. PNG) don't get
+                         any smaller
+        """
+        name = name.replace(os.sep, '/')
+
+        if self.format == 'zip':
+            # Zip timestamps start in 1980
+            date_time = max(tuple(time.localtime(self.mtime)[:6]),
+                            (1980, 1, 1, 0, 0, 0))
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = (zipfile.ZIP_DEFLATED if compress
+                                  else zipfile.ZIP_STORED)
+            info.external_attr = 0o644 << 16
+            self._archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = self.mtime
+            info.mode = 0o644
+            self._archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        """Writes the end of the archive, and closes its file"""
+        self._archive.close()
+        if self._own_file:
+            self.fileobj.close()
+        else:
+            self.fileobj.flush()
+
+
+def guess_format(path):
+    """
+    Returns archive format given by archive file extension, 'tar' for
+    standard output and file objects, or None.
+    """
+    if path == STDOUT or hasattr(path, 'write'):
+        return 'tar'
+
+    for extension, format in ARCHIVE_EXTENSIONS:
+        if path.lower().endswith(extension):
+            return format
+    return None
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import json
+import os
+import re
+from collections import OrderedDict
+
+import six
+
+from icon_font_to_png.lazy import lazy_import
+
+Image = lazy_import('PIL.Image')
+
+
+class Atlas(object):
+    """
+    Packs multiple images into one or more sprite sheets (texture atlases).
+
+    Images are packed on 'shelves' - rows as high as the highest image
+    placed in them - after being sorted by height, which wastes little space
+    for icons, as they're usually squares of a few distinct sizes.
+    """
+    def __init__(self, max_size=2048, padding=1):
+        """
+        :param max_size: maximum sprite sheet width and height in pixels
+        :param padding: space between images in pixels
+        """
+        self.max_size = max_size
+        self.padding = padding
+        self.images = OrderedDict()
+
+    def add(self, name, image):
+        """
+        Adds image to the atlas.
+
+        :param name: unique image name
+        :param image: PIL image
+        """
+        width, height = image.size
+        if width > self.max_size or height > self.max_size:
+            raise ValueError(
+                "Image '{name}' is bigger than maximum atlas size".format(
+                    name=name)
+            )
+
+        self.images[name] = image
+
+    def pack(self):
+        """
+        Finds out where to place each of the added images.
+
+        :returns list of sheets, each being a dict with its 'width', 'height'
+                 and 'sprites' - dict of image names and their positions
+                 as (x, y, width, height) tuples
+        """
+        sheets = []
+        order = sorted(self.images.items(),
+                       key=lambda t: (-t[1].size[1], -t[1].size[0]))
+
+        for name, image in order:
+            width, height = image.size
+            position = None
+
+            for sheet in sheets:
+                position = self._place(sheet, width, height)
+                if position:
+                    break
+            else:
+                sheet = dict(width=0, height=0, shelves=[],
+                             sprites=OrderedDict())
+                sheets.append(sheet)
+                position = self._place(sheet, width, height)
+
+            sheet['sprites'][name] = position + (width, height)
+            sheet['width'] = max(sheet['width'], position[0] + width)
+            sheet['height'] = max(sheet['height'], position[1] + height)
+
+        for sheet in sheets:
+            del sheet['shelves']
+
+        return sheets
+
+    def _place(self, sheet, width, height):
+        """
+        Finds (and reserves) place for an image of given size in given sheet.
+
+        :returns (x, y) tuple, or None if the image doesn't fit
+        """
+        # Shelf with the least wasted height
+        best = None
+        for shelf in sheet['shelves']:
+            if (shelf['height'] >= height and
+                    shelf['x'] + width <= self.max_size and
+                    (best is None or shelf['height'] < best['height'])):
+                best = shelf
+
+        if best is None:
+            y = 0
+            if sheet['shelves']:
+                last = sheet['shelves'][-1]
+                y = last['y'] + last['height'] + self.padding
+
+            if y + height > self.max_size:
+                return None
+
+            best = dict(x=0, y=y, height=height)
+            sheet['shelves'].append(best)
+
+        position = (best['x'], best['y'])
+        best['x'] += width + self.padding
+
+        return position
+
+    def save(self, name, export_dir='exported'):
+        """
+        Saves sprite sheet(s) as PNG files, along with JSON and CSS files
+        describing where each of the images is.
+
+        :param name: name of the output files (without extension)
+        :param export_dir: path to export directory
+        :returns list of paths to saved files
+        """
+        # Make sure export directory exists
+        if not os.path.exists(export_dir):
+            os.makedirs(export_dir)
+
+        sheets = self.pack()
+        manifest = OrderedDict()
+        css_rules = []
+        paths = []
+
+        for i, sheet in enumerate(sheets):
+            if len(sheets) > 1:
+                filename = '{name}-{i}.png'.format(name=name, i=i)
+            else:
+                filename = name + '.png'
+
+            image = Image.new("RGBA", (sheet['width'], sheet['height']),
+                              (0, 0, 0, 0))
+            for sprite, (x, y, width, height) in sheet['sprites'].items():
+                image.paste(self.images[sprite], (x, y))
+                manifest[sprite] = OrderedDict([
+                    ('sheet', filename),
+                    ('x', x), ('y', y), ('width', width), ('height', height),
+                ])
+
+            path = os.path.join(export_dir, filename)
+            image.save(path)
+            paths.append(path)
+
+        # Keep the original order of images
+        manifest = OrderedDict(
+            (sprite, manifest[sprite]) for sprite in self.images
+        )
+
+        for sprite, values in manifest.items():
+            css_rules.append(
+                ".{selector} {{\n"
+                "  background: url('{sheet}') {x}px {y}px no-repeat;\n"
+                "  width: {width}px;\n"
+                "  height: {height}px;\n"
+                "}}\n".format(selector=css_class_name(sprite),
+                              sheet=values['sheet'],
+                              x=-values['x'], y=-values['y'],
+                              width=values['width'], height=values['height'])
+            )
+
+        json_path = os.path.join(export_dir, name + '.json')
+        with io.open(json_path, 'w', encoding='utf-8') as f:
+            f.write(six.text_type(
+                json.dumps(manifest, indent=2, ensure_ascii=False)
+            ))
+        paths.append(json_path)
+
+        css_path = os.path.join(export_dir, name + '.css')
+        with io.open(css_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(css_rules))
+        paths.append(css_path)
+
+        return paths
+
+
+def css_class_name(name):
+    """Converts sprite name to a valid CSS class name"""
+    name = re.sub(r'[^\w-]', '-', name)
+    if re.match(r'^(\d|-\d|--)', name):
+        name = '_' + name
+    return name
@@ -0,0 +1,474 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from six import unichr
+
+from icon_font_to_png.css import CSS_PARSERS
+
+# `os.rename` doesn't overwrite existing files on Windows
+replace_file = getattr(os, 'replace', os.rename)
+
+
+class LRUCache(object):
+    """Bounded, thread-safe 'least recently used' cache"""
+    def __init__(self, maxsize=128):
+        """
+        :param maxsize: maximum number of stored items; unbounded if None
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("Cache size has to be a positive number")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """
+        Returns cached value (marking it as recently used) or `default`,
+        and updates hit / miss counters.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Stores value, evicting the least recently used one if needed"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def clear(self):
+        """Removes all cached values and resets counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class IconMapCache(object):
+    """
+    On-disk cache of icons parsed from CSS files.
+
+    Cached entries are keyed by the CSS file path and the parser it was
+    parsed with (as parsers may not find exactly the same icons), and are
+    valid only as long as the file size, modification time and content hash
+    stay the same.
+    """
+    version = 1
+
+    def __init__(self, directory):
+        """
+        :param directory: path to cache directory (created if necessary)
+        """
+        self.directory = directory
+
+    def _path(self, css_file, parser='tinycss'):
+        """Returns path to cache file of given CSS file and parser"""
+        key = hashlib.sha1(
+            '{path}|{parser}'.format(path=os.path.abspath(css_file),
+                                     parser=parser).encode('utf-8')
+        ).hexdigest()
+        return os.path.join(self.directory, key + '.json')
+
+    @staticmethod
+    def _fingerprint(css_file, parser='tinycss'):
+        """
+        Returns CSS file size, modification time and content hash, and
+        the parser name
+        """
+        with open(css_file, 'rb') as f:
+            content = f.read()
+
+        return {
+            'path': os.path.abspath(css_file),
+            'parser': parser,
+            'size': len(content),
+            'mtime': os.path.getmtime(css_file),
+            'sha1': hashlib.sha1(content).hexdigest(),
+        }
+
+    def get(self, css_file, parser='tinycss'):
+        """
+        Returns cached icons of given CSS file.
+
+        :param css_file: path to CSS file
+        :param parser: name of the CSS parser (see `IconFont`)
+        :returns dict of icon names and characters, common icon prefix;
+                 or None if there's no valid cache entry
+        """
+        fingerprint = self._fingerprint(css_file, parser)
+
+        try:
+            with open(self._path(css_file, parser), 'rb') as f:
+                cached = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+
+        if (cached.get('version') != self.version or
+                cached.get('fingerprint') != fingerprint):
+            return None
+
+        icons = dict(
+            (name, unichr(codepoint))
+            for name, codepoint in cached['icons'].items()
+        )
+        return icons, cached['common_prefix']
+
+    def set(self, css_file, icons, common_prefix, parser='tinycss'):
+        """
+        Caches icons of given CSS file.
+
+        :param css_file: path to CSS file
+        :param icons: dict of icon names and characters
+        :param common_prefix: common icon prefix
+        :param parser: name of the CSS parser (see `IconFont`)
+        """
+        cached = {
+            'version': self.version,
+            'fingerprint': self._fingerprint(css_file, parser),
+            'icons': dict((name, ord(char)) for name, char in icons.items()),
+            'common_prefix': common_prefix,
+        }
+        data = json.dumps(cached, separators=(',', ':'), sort_keys=True)
+        atomic_write(self._path(css_file, parser), data.encode('utf-8'))
+
+    def invalidate(self, css_file=None):
+        """
+        Removes cache entries of given CSS file (parsed with any parser), or
+        all entries if it's None
+
+        :param css_file: path to CSS file
+        """
+        if css_file is not None:
+            paths = [self._path(css_file, parser) for parser in CSS_PARSERS]
+        elif os.path.isdir(self.directory):
+            paths = [
+                os.path.join(self.directory, filename)
+                for filename in os.listdir(self.directory)
+                if filename.endswith('.json')
+            ]
+        else:
+            paths = []
+
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class RenderCache(object):
+    """
+    Content addressed, on-disk cache of rendered images, which can be shared
+    by multiple processes (and icon fonts).
+
+    Images are stored under the hash of everything they were rendered from
+    (see `IconFont.fingerprint`). Entries are written atomically, and when
+    the cache grows bigger than its maximum size, least recently used entries
+    are removed. Cached images are copied (not linked) to their destination,
+    so that exported files can be edited in place without changing the
+    cache.
+    """
+    def __init__(self, directory, max_size=256 * 1024 * 1024):
+        """
+        :param directory: path to cache directory (created if necessary)
+        :param max_size: maximum cache size in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        # Estimated cache size, computed on first write
+        self._size = None
+
+    @staticmethod
+    def key(fingerprint):
+        """Returns cache key of given rendering inputs"""
+        data = json.dumps(fingerprint, sort_keys=True)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def _path(self, key, path):
+        """
+        Returns path to cache entry with given key (with the file extension
+        of given path)
+        """
+        extension = os.path.splitext(path)[1]
+        return os.path.join(self.directory, key[:2], key + extension)
+
+    def get(self, key, path):
+        """
+        Places a copy of cached image under given path.
+
+        :param key: cache entry key
+        :param path: destination file path
+        :returns whether the image was in the cache
+        """
+        cached_path = self._path(key, path)
+
+        try:
+            # Mark as recently used
+            os.utime(cached_path, None)
+        except OSError:
+            self.misses += 1
+            return False
+
+        try:
+            shutil.copyfile(cached_path, path)
+        except (IOError, OSError):
+            # Evicted by another process in the meantime
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    def set(self, key, path):
+        """
+        Stores image file in the cache.
+
+        :param key: cache entry key
+        :param path: image file path
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        atomic_write(self._path(key, path), data)
+
+        if self._size is None:
+            self._size = sum(size for path, mtime, size in self._entries())
+        else:
+            self._size += len(data)
+
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entries(self):
+        """Returns list of (path, last use time, size) of all cache entries"""
+        entries = []
+        for directory, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                # Skip files being written
+                if filename.startswith('.tmp-'):
+                    continue
+
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size))
+
+        return entries
+
+    def evict(self):
+        """
+        Removes least recently used entries, until the cache takes at most
+        90% of its maximum size.
+        """
+        entries = sorted(self._entries(), key=lambda t: t[1])
+        size = sum(entry[2] for entry in entries)
+
+        for path, mtime, entry_size in entries:
+            if size <= self.max_size * 0.9:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                # Removed by another process in the meantime
+                pass
+            size -= entry_size
+
+        self._size = size
+
+
+class DownloadCache(object):
+    """
+    On-disk cache of downloaded files, keyed by their URL, along with their
+    validators (entity tag and last modification date), so that they can be
+    revalidated with conditional requests instead of downloaded again.
+
+    Files are downloaded into a partial file first, which is kept if the
+    download is interrupted, so that it can be resumed later on.
+    """
+    def __init__(self, directory):
+        """
+        :param directory: path to cache directory (created if necessary)
+        """
+        self.directory = directory
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def path(self, url):
+        """Returns path to cached file of given URL"""
+        filename = url.split('?')[0].rstrip('/').split('/')[-1] or 'index'
+        return os.path.join(self.directory, self._key(url), filename)
+
+    def partial_path(self, url):
+        """Returns path to partially downloaded file of given URL"""
+        return self.path(url) + '.part'
+
+    def _read_json(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _write_json(self, path, data):
+        atomic_write(path, json.dumps(data, sort_keys=True).encode('utf-8'))
+
+    def get(self, url):
+        """
+        Returns cached file of given URL.
+
+        :param url: file URL
+        :returns dict with 'path', 'etag' and 'last_modified' keys, or None
+                 if the file isn't cached
+        """
+        entry = self._read_json(
+            os.path.join(self.directory, self._key(url) + '.json')
+        )
+        if (entry is None or entry.get('url') != url or
+                not os.path.isfile(self.path(url))):
+            return None
+
+        entry['path'] = self.path(url)
+        return entry
+
+    def set(self, url, etag=None, last_modified=None):
+        """
+        Moves completely downloaded partial file of given URL into the cache.
+
+        :param url: file URL
+        :param etag: value of 'ETag' response header
+        :param last_modified: value of 'Last-Modified' response header
+        :returns path to cached file
+        """
+        path = self.path(url)
+        replace_file(self.partial_path(url), path)
+
+        self._write_json(
+            os.path.join(self.directory, self._key(url) + '.json'),
+            {'url': url, 'etag': etag, 'last_modified': last_modified},
+        )
+        self._remove(self._partial_info_path(url))
+
+        return path
+
+    def _partial_info_path(self, url):
+        return os.path.join(self.directory, self._key(url) + '.part.json')
+
+    def get_partial(self, url):
+        """
+        Returns partially downloaded file of given URL, if it can be resumed.
+
+        :param url: file URL
+        :returns (downloaded size, validator) tuple, or None
+        """
+        info = self._read_json(self._partial_info_path(url))
+        if info is None or not info.get('validator'):
+            return None
+
+        try:
+            size = os.path.getsize(self.partial_path(url))
+        except OSError:
+            return None
+
+        return size, info['validator']
+
+    def start_partial(self, url, validator=None):
+        """
+        Prepares partial file of given URL for (resumed) download.
+
+        :param url: file URL
+        :param validator: strong entity tag or last modification date of
+                          the downloaded file, needed to resume it
+        :returns path to partial file
+        """
+        path = self.partial_path(url)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self._write_json(self._partial_info_path(url),
+                         {'url': url, 'validator': validator})
+        return path
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def user_cache_dir():
+    """Returns default, per user cache directory"""
+    base = (os.environ.get('XDG_CACHE_HOME') or
+            os.environ.get('LOCALAPPDATA') or
+            os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'icon_font_to_png')
+
+
+def make_dirs(directory):
+    """
+    Creates directory (with any missing parents) unless it exists, even if
+    other threads or processes are creating it at the same time.
+
+    :param directory: directory path
+    """
+    if not os.path.exists(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Created by another thread or process in the meantime
+            if not os.path.isdir(directory):
+                raise
+
+
+def atomic_write(path, data):
+    """
+    Writes data to a file, so that other processes never see it partially
+    written (it's written to a temporary file, which is then renamed).
+
+    :param path: file path; its directory is created if necessary
+    :param data: bytes to write
+    """
+    directory = os.path.dirname(path) or '.'
+    make_dirs(directory)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        replace_file(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
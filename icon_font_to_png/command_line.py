@@ -2,20 +2,40 @@
 from __future__ import absolute_import, unicode_literals, print_function
 
 import os
+import sys
 import argparse
+from collections import OrderedDict
 
 from icon_font_to_png import IconFont, AVAILABLE_ICON_FONTS
+from icon_font_to_png.archive import ARCHIVE_FORMATS, ArchiveWriter
+from icon_font_to_png.atlas import Atlas
+from icon_font_to_png.encoder import (
+    IMAGE_FORMATS, PNG_STRATEGIES, ImageEncoder
+)
+from icon_font_to_png.icon_font import (
+    CSS_PARSERS, RASTERIZERS, format_filename, is_filename_template
+)
+from icon_font_to_png.index import is_pattern
+from icon_font_to_png.jobfile import load_jobfile, schedule
+from icon_font_to_png.stats import ExportStats
 
 
 def run(arguments):
     """Main function for command line usage"""
+    # Separate 'serve' command
+    if arguments[:1] == ['serve']:
+        # HTTP server modules are only imported when they're needed
+        from icon_font_to_png import server
+        return server.run(arguments[1:])
+
     parser = argparse.ArgumentParser(
         description="Exports font icons as PNG images."
     )
     parser.add_argument(
         '--list',
         action='store_true',
-        help="list all available icon names and exit"
+        help="list all available icon names (or the ones matching given "
+             "icon patterns) and exit"
     )
     parser.add_argument(
         '--download',
@@ -23,6 +43,69 @@ def run(arguments):
         help="download latest icon font and exit"
     )
 
+    parser.add_argument(
+        '--jobfile',
+        metavar='FILE',
+        type=str,
+        help="export icons described by JSON (or YAML) job file, with "
+             "any number of icon fonts, icons, sizes and colors, and exit"
+    )
+
+    parser.add_argument(
+        '--cache_dir',
+        metavar='DIR',
+        type=str,
+        help="cache parsed CSS files (and downloaded icon fonts) in given "
+             "directory, which speeds up subsequent runs"
+    )
+
+    parser.add_argument(
+        '--render_cache',
+        metavar='DIR',
+        type=str,
+        help="reuse icons rendered before (with any icon font) by caching "
+             "them in given directory"
+    )
+    parser.add_argument(
+        '--render_cache_size',
+        metavar='MB',
+        type=int,
+        default=256,
+        help="maximum render cache size in megabytes (default: 256)"
+    )
+    parser.add_argument(
+        '--css_parser',
+        choices=CSS_PARSERS,
+        default='tinycss',
+        help="parse the whole CSS file with 'tinycss', or only quickly scan "
+             "it for icons with 'fast' parser (default: tinycss)"
+    )
+
+    parser.add_argument(
+        '--rasterizer',
+        choices=RASTERIZERS,
+        default='freetype',
+        help="render icons with 'freetype', or draw them from glyph "
+             "'outline' in each size (default: freetype)"
+    )
+
+    parser.add_argument(
+        '--supersample',
+        metavar='N',
+        type=int,
+        help="rasterize icons N times bigger than each size and scale them "
+             "down (1 renders them directly in each size); by default, "
+             "icons are rasterized on at least 150x150 pixels"
+    )
+
+    parser.add_argument(
+        '--stats',
+        default=False,
+        action='store_true',
+        help="print time spent in each rendering stage, auto-scale "
+             "iterations and cache hits when done"
+    )
+
     required_group = parser.add_argument_group("required arguments")
     required_group.add_argument(
         '--ttf',
@@ -42,13 +125,16 @@ def run(arguments):
         'icons',
         type=str,
         nargs='*',
-        help="names of the icons to export (or 'ALL' for all icons)"
+        help="names of the icons to export, glob patterns ('arrow-*'), "
+             "regular expressions ('/^chevron-/'), codepoints ('U+F135'), "
+             "or 'ALL' for all icons"
     )
     exp_group.add_argument(
         '--size',
         type=int,
-        default=16,
-        help="icon size in pixels (default: 16)"
+        action='append',
+        help="icon size in pixels (default: 16); can be repeated "
+             "to export multiple sizes"
     )
     exp_group.add_argument(
         '--scale',
@@ -61,14 +147,43 @@ def run(arguments):
     exp_group.add_argument(
         '--color',
         type=str,
-        default='black',
-        help="color name or hex value (default: black)"
+        action='append',
+        help="color name or hex value (default: black); can be repeated "
+             "to export multiple colors"
     )
     exp_group.add_argument(
         '--filename',
         type=str,
-        help="name of the output file (without '.png' extension); "
-             "it's used as a prefix if multiple icons are exported"
+        help="name of the output file (without extension); "
+             "it's used as a prefix if multiple icons are exported; "
+             "it can also be a template using {icon}, {size} and {color} "
+             "fields"
+    )
+    exp_group.add_argument(
+        '--format',
+        choices=IMAGE_FORMATS.keys(),
+        default='png',
+        help="output image format (default: png); ICO files contain "
+             "all exported sizes of an icon, SVG files are made of glyph "
+             "outlines"
+    )
+    exp_group.add_argument(
+        '--compress_level',
+        metavar='LEVEL',
+        type=int,
+        help="PNG compression level between 0 (fastest) and 9 (smallest)"
+    )
+    exp_group.add_argument(
+        '--png_strategy',
+        choices=PNG_STRATEGIES.keys(),
+        help="PNG compression strategy"
+    )
+    exp_group.add_argument(
+        '--palette',
+        default=False,
+        action='store_true',
+        help="save PNG images as 8-bit indexed ones, without losing "
+             "quality (which makes bigger icons smaller)"
     )
     exp_group.add_argument(
         '--keep_prefix',
@@ -77,31 +192,137 @@ def run(arguments):
         help="do not remove common icon prefix "
              "(i.e. 'fa-arrow-right' instead of 'arrow-right')"
     )
+    exp_group.add_argument(
+        '--atlas',
+        metavar='NAME',
+        type=str,
+        help="pack all exported icons into sprite sheet(s) 'NAME.png', "
+             "described by 'NAME.json' and 'NAME.css' files"
+    )
+    exp_group.add_argument(
+        '--atlas_size',
+        type=int,
+        default=2048,
+        help="maximum sprite sheet width and height in pixels "
+             "(default: 2048)"
+    )
+    exp_group.add_argument(
+        '--archive',
+        metavar='PATH',
+        type=str,
+        help="write all exported icons into a single zip or tar archive "
+             "(.zip, .tar, .tar.gz or .tgz), or into standard output as "
+             "a tar archive ('-'), instead of into separate files"
+    )
+    exp_group.add_argument(
+        '--archive_format',
+        choices=ARCHIVE_FORMATS,
+        help="archive format, instead of guessing it from archive path"
+    )
+    exp_group.add_argument(
+        '--incremental',
+        default=False,
+        action='store_true',
+        help="skip icons which were already exported with the same "
+             "parameters and font"
+    )
+    exp_group.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help="number of icons exported in parallel (default: 1)"
+    )
+    exp_group.add_argument(
+        '--pipeline',
+        default=False,
+        action='store_true',
+        help="render (with --jobs threads), encode and write icons "
+             "concurrently, in a pipeline of threads"
+    )
+    exp_group.add_argument(
+        '--in_flight',
+        metavar='N',
+        type=int,
+        default=16,
+        help="maximum number of rendered (and encoded) images waiting "
+             "to be encoded (and written) in pipeline mode (default: 16)"
+    )
 
     args = parser.parse_args(arguments)
 
     # Parse '--download' argument first
     if args.download:
-        downloader = download_icon_font(args.download, os.getcwd())
-        downloader.download_files()
+        cache_dir = None
+        if args.cache_dir:
+            cache_dir = os.path.join(args.cache_dir, 'downloads')
+
+        download_icon_font(args.download, os.getcwd(), cache_dir=cache_dir)
         print("Icon font '{name}' successfully downloaded".format(
             name=args.download)
         )
         parser.exit()
 
+    if args.jobs < 1:
+        parser.error("Number of jobs has to be a positive number")
+
+    if args.supersample is not None and args.supersample < 1:
+        parser.error("Supersampling factor has to be a positive number")
+
+    if args.archive and (args.atlas or args.incremental or args.pipeline):
+        parser.error("--archive can't be combined with --atlas, "
+                     "--incremental or --pipeline")
+
+    # Sprite sheets are packed from icons rendered one by one
+    if args.atlas and (args.jobs > 1 or args.pipeline):
+        parser.error("--atlas can't be combined with --jobs or --pipeline")
+
+    # Sprite sheets are always saved as PNG files, and always written again
+    if args.atlas and (args.incremental or args.format != 'png' or
+                       args.palette or args.compress_level is not None or
+                       args.png_strategy):
+        parser.error("--atlas can't be combined with --incremental, "
+                     "--format, --palette, --compress_level or "
+                     "--png_strategy")
+
+    # Then '--jobfile', which has everything else in it
+    if args.jobfile:
+        return run_jobfile(args, parser)
+
     # If not '--download', then css and tff files are required
     if not args.css or not args.ttf:
         parser.error("You have to provide CSS and TTF files")
 
+    if args.in_flight < 1:
+        parser.error("Number of images in flight has to be a positive "
+                     "number")
+
+    try:
+        encoder = ImageEncoder(format=args.format,
+                               compress_level=args.compress_level,
+                               strategy=args.png_strategy,
+                               palette=args.palette)
+    except ValueError as e:
+        parser.error(str(e))
+
     icon_font = IconFont(css_file=args.css.name,
                          ttf_file=args.ttf.name,
-                         keep_prefix=args.keep_prefix)
+                         keep_prefix=args.keep_prefix,
+                         cache_dir=args.cache_dir,
+                         css_parser=args.css_parser,
+                         render_cache_dir=args.render_cache,
+                         render_cache_size=args.render_cache_size * 1024 ** 2,
+                         rasterizer=args.rasterizer,
+                         supersample=args.supersample,
+                         stats=ExportStats() if args.stats else None)
     args.css.close()
     args.ttf.close()
 
     # Then '--list'
     if args.list:
-        for icon in icon_font.css_icons.keys():
+        icons = icon_font.css_icons.keys()
+        if args.icons and args.icons != ['ALL']:
+            icons = select_icons(icon_font, args.icons, parser)
+        for icon in icons:
             print(icon)
         parser.exit()
 
@@ -112,63 +333,257 @@ def run(arguments):
     elif args.icons == ['ALL']:
         selected_icons = icon_font.css_icons.keys()
     else:
-        for icon in args.icons:
-            if (args.keep_prefix and
-                    not icon.startswith(icon_font.common_prefix)):
-                # Prepend icon name with prefix
-                icon = icon_font.common_prefix + icon
-            elif (not args.keep_prefix and
-                  icon.startswith(icon_font.common_prefix)):
-                # Remove prefix from icon name
-                icon = icon[len(icon_font.common_prefix):]
-
-            # Check if given icon names exist
-            if icon in icon_font.css_icons:
-                selected_icons.append(icon)
-            else:
-                parser.error("Unknown icon name '{icon}'".format(icon=icon))
+        selected_icons = select_icons(icon_font, args.icons, parser)
 
     # Parse filename and remove the extension if necessary
     given_filename = args.filename or ''
-    if given_filename.lower().endswith('.png'):
-        given_filename = given_filename[:-4]
+    extension = encoder.extension
+    if given_filename.lower().endswith(extension):
+        given_filename = given_filename[:-len(extension)]
 
     # Some fonts have empty values
     # (prefix only - which we remove - for common styles)
     selected_icons = list(filter(None, selected_icons))
 
+    sizes = args.size or [16]
+    colors = args.color or ['black']
+    if encoder.multiple_sizes:
+        multiple_variants = len(colors) > 1
+        variant_suffix = '-{color}'
+    else:
+        multiple_variants = len(sizes) > 1 or len(colors) > 1
+        variant_suffix = '-{size}-{color}'
+
+    # Report bad templates before anything gets exported
+    is_template = is_filename_template(given_filename)
+    if is_template:
+        try:
+            format_filename(given_filename, 'icon', sizes[0], colors[0])
+        except ValueError as e:
+            parser.error(str(e))
+
     # Commence exporting
+    filenames = dict()
     for icon in selected_icons:
-        if len(selected_icons) > 1:
+        if is_template:
+            # Use the specified filename template
+            filename = given_filename
+        elif len(selected_icons) > 1:
             # Multiple icons - treat the filename option as name prefix
-            filename = '{prefix}{icon}.png'.format(
+            filename = '{prefix}{icon}'.format(
                 prefix=given_filename, icon=icon,
             )
         else:
             if given_filename:
                 # Use the specified filename
-                filename = given_filename + '.png'
+                filename = given_filename
             else:
                 # Use icon name as filename
-                filename = str(icon) + '.png'
+                filename = str(icon)
+
+        # Multiple sizes and / or colors - add them to the filename
+        if multiple_variants and not is_template:
+            filename += variant_suffix
+
+        filenames[icon] = filename + extension
+
+    # Skip icons which files are up to date
+    # (once - they aren't checked again when exporting)
+    skipped = []
+    if args.incremental:
+        outdated = set(icon_font.outdated_icons(
+            icons=selected_icons, size=sizes, color=colors, scale=args.scale,
+            filenames=filenames, export_dir='exported', encoder=encoder
+        ))
+        skipped = [icon for icon in selected_icons if icon not in outdated]
+        selected_icons = [icon for icon in selected_icons if icon in outdated]
+
+    # Standard output can be taken by the archive
+    messages = sys.stdout
+    archive = None
+    if args.archive:
+        try:
+            archive = ArchiveWriter(args.archive, format=args.archive_format)
+        except (ValueError, IOError, OSError) as e:
+            parser.error(str(e))
+        if archive.fileobj is getattr(sys.stdout, 'buffer', sys.stdout):
+            messages = sys.stderr
+
+    if args.atlas:
+        try:
+            export_atlas(icon_font, args, selected_icons, filenames, sizes,
+                         colors)
+        except ValueError as e:
+            parser.error(str(e))
+        print_stats(icon_font.stats)
+        print()
+        print("All done")
+        return
+
+    for icon in selected_icons:
+        files = icon_font.export_files(icon, sizes, colors, filenames[icon],
+                                       encoder)
+        print("Exporting icon '{icon}' as {files} ({sizes} pixels)".format(
+            icon=icon,
+            files=', '.join("'{0}'".format(name) for name, _, _ in files),
+            sizes=', '.join('{0}x{0}'.format(size) for size in sizes),
+        ), file=messages)
 
-        print("Exporting icon '{icon}' as '{filename}'"
-              "({size}x{size} pixels)".format(icon=icon,
-                                              filename=filename,
-                                              size=args.size))
+    if archive:
+        try:
+            failed = icon_font.archive_icons(icons=selected_icons,
+                                             archive=archive, size=sizes,
+                                             color=colors, scale=args.scale,
+                                             filenames=filenames,
+                                             jobs=args.jobs, encoder=encoder)
+        finally:
+            archive.close()
+    elif args.pipeline:
+        from icon_font_to_png.pipeline import ExportPipeline
+        pipeline = ExportPipeline(icon_font, render_workers=args.jobs,
+                                  max_in_flight=args.in_flight)
+        failed = pipeline.export_icons(icons=selected_icons, size=sizes,
+                                       color=colors, scale=args.scale,
+                                       filenames=filenames,
+                                       incremental=args.incremental,
+                                       encoder=encoder,
+                                       outdated=selected_icons)
+    else:
+        failed = icon_font.export_icons(icons=selected_icons, size=sizes,
+                                        color=colors, scale=args.scale,
+                                        filenames=filenames, jobs=args.jobs,
+                                        incremental=args.incremental,
+                                        encoder=encoder,
+                                        outdated=selected_icons)
+
+    if args.incremental:
+        print()
+        print("Exported {exported} icons, skipped {skipped} up to date "
+              "icons".format(exported=len(selected_icons) - len(failed),
+                             skipped=len(skipped)))
+
+    print_stats(icon_font.stats, file=messages)
+
+    if failed:
+        print(file=messages)
+        for icon, error in failed.items():
+            print("Failed to export icon '{icon}' ({error})".format(
+                icon=icon, error=error), file=messages
+            )
+        parser.exit(1, "{count} of {total} icons failed\n".format(
+            count=len(failed), total=len(selected_icons))
+        )
+
+    print(file=messages)
+    print("All done", file=messages)
+
+
+def select_icons(icon_font, queries, parser):
+    """
+    Returns names of icons matching given names, patterns or codepoints
+    (see `IconIndex.select`), without duplicates
+    """
+    selected_icons = OrderedDict()
+    for query in queries:
+        try:
+            icons = icon_font.index.select(query)
+        except ValueError as e:
+            parser.error(str(e))
+
+        if not icons and is_pattern(query):
+            parser.error("No icons match '{query}'".format(query=query))
+        elif not icons:
+            parser.error("Unknown icon name '{icon}'".format(
+                icon=icon_font.index.normalize(query))
+            )
+
+        selected_icons.update((icon, None) for icon in icons)
+
+    return list(selected_icons)
+
+
+def print_stats(stats, file=None):
+    """Print stats collected while exporting icons (if enabled)"""
+    if stats is None:
+        return
 
-        icon_font.export_icon(icon=icon, filename=filename, size=args.size,
-                              color=args.color, scale=args.scale)
+    print(file=file)
+    print(stats.report(), file=file)
+
+
+def run_jobfile(args, parser):
+    """Export icons described by job file, sharing loaded icon fonts"""
+    stats = ExportStats() if args.stats else None
+    try:
+        registry, jobs = load_jobfile(
+            args.jobfile,
+            cache_dir=args.cache_dir,
+            css_parser=args.css_parser,
+            render_cache_dir=args.render_cache,
+            render_cache_size=args.render_cache_size * 1024 ** 2,
+            rasterizer=args.rasterizer,
+            supersample=args.supersample,
+            stats=stats,
+        )
+        batches = schedule(registry, jobs)
+    except ValueError as e:
+        parser.error(str(e))
+
+    total = 0
+    failed = 0
+    for batch in batches:
+        print("Exporting {count} icons of '{font}' font into '{export_dir}' "
+              "({sizes} pixels)".format(
+                  count=len(batch.icons), font=batch.font,
+                  export_dir=batch.export_dir,
+                  sizes=', '.join('{0}x{0}'.format(size)
+                                  for size in batch.sizes),
+              ))
+
+        errors = batch.export(registry, jobs=args.jobs)
+        total += len(batch.icons)
+        failed += len(errors)
+        for icon, error in errors.items():
+            print("Failed to export icon '{icon}' ({error})".format(
+                icon=icon, error=error)
+            )
+
+    print_stats(stats)
+
+    if failed:
+        parser.exit(1, "{count} of {total} icons failed\n".format(
+            count=failed, total=total)
+        )
 
     print()
     print("All done")
 
 
+def export_atlas(icon_font, args, icons, filenames, sizes, colors):
+    """Pack exported icons into sprite sheet(s) instead of separate files"""
+    atlas = Atlas(max_size=args.atlas_size)
+
+    for icon in icons:
+        for size, color, image in icon_font.render_variants(
+                icon, sizes, colors, args.scale):
+            name = format_filename(filenames[icon], icon, size, color)
+            atlas.add(os.path.splitext(name)[0], image)
+
+    for path in atlas.save(args.atlas):
+        print("Saved '{path}'".format(path=path))
+
+
 # Isolated for use in wrapper scripts
-def download_icon_font(icon_font, directory):
-    """Download given (implemented) icon font into passed directory"""
+def download_icon_font(icon_font, directory, cache_dir=None):
+    """
+    Download given (implemented) icon font into passed directory
+    (or just into the cache directory, if `directory` is None and
+    `cache_dir` is set)
+    """
     try:
-        downloader = AVAILABLE_ICON_FONTS[icon_font]['downloader'](directory)
+        downloader = AVAILABLE_ICON_FONTS[icon_font]['downloader'](
+            directory, cache_dir=cache_dir
+        )
         downloader.download_files()
         return downloader
     except KeyError:  # pragma: no cover
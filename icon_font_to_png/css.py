@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import os
+import re
+
+from six import unichr
+
+
+# Available `IconFont.parse_css` implementations
+CSS_PARSERS = ('tinycss', 'fast')
+
+# Whole rules, without nested blocks (so '@media' blocks are skipped over,
+# but rules inside them are found)
+RULE_RE = re.compile(r'([^{}]*)\{([^{}]*)\}')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+# At-rules without a block (e.g. '@charset' or '@import') preceding rules
+AT_STATEMENT_RE = re.compile(r'@[^{};]*;')
+ICON_SELECTOR_RE = re.compile(r'^\.(.+?)::?before$')
+CONTENT_RE = re.compile(
+    r'(?:^|;)\s*content\s*:\s*([\'"]?)\\([0-9a-fA-F]+)\1\s*(?=;|$)', re.I
+)
+
+
+def iter_css_rules(fp, chunk_size=64 * 1024):
+    """
+    Reads CSS incrementally and yields its rules, without building
+    the whole stylesheet in memory.
+
+    :param fp: text file object
+    :param chunk_size: number of characters read at once
+    :returns generator of (selector, declarations block) tuples
+    """
+    buf = ''
+    while True:
+        chunk = fp.read(chunk_size)
+        buf += chunk
+
+        # Wait for unterminated comment to end
+        if chunk and buf.rfind('/*') > buf.rfind('*/'):
+            continue
+
+        buf = COMMENT_RE.sub('', buf)
+
+        # Only complete rules can be processed
+        end = len(buf) if not chunk else buf.rfind('}') + 1
+        for match in RULE_RE.finditer(buf, 0, end):
+            selector = AT_STATEMENT_RE.sub('', match.group(1))
+            yield selector.strip(), match.group(2)
+        buf = buf[end:]
+
+        if not chunk:
+            break
+
+
+def iter_icon_rules(fp, chunk_size=64 * 1024):
+    """
+    Yields icon rules found in CSS file object. Icon rules are ones which
+    selectors look like '.name:before' (or '.name::before'); multiple comma
+    separated selectors per rule are supported.
+
+    :param fp: text file object
+    :param chunk_size: number of characters read at once
+    :returns generator of (selector, icon names, character) tuples;
+             character is None if the rule doesn't set 'content'
+    """
+    for selector, declarations in iter_css_rules(fp, chunk_size):
+        names = []
+        for part in selector.split(','):
+            match = ICON_SELECTOR_RE.match(part.strip())
+            if match:
+                names.append(match.group(1))
+
+        if not names:
+            continue
+
+        # The last 'content' declaration wins
+        contents = CONTENT_RE.findall(declarations)
+        char = unichr(int(contents[-1][1], 16)) if contents else None
+
+        yield selector, names, char
+
+
+def iter_css_icons(fp, chunk_size=64 * 1024):
+    """
+    Yields icon names and characters found in CSS file object.
+
+    :param fp: text file object
+    :param chunk_size: number of characters read at once
+    :returns generator of (icon name, character) tuples
+    """
+    for selector, names, char in iter_icon_rules(fp, chunk_size):
+        if char is not None:
+            for name in names:
+                yield name, char
+
+
+def extract_icons(css_file):
+    """
+    Fast alternative to parsing the whole CSS file with `tinycss`.
+
+    :param css_file: path to CSS file
+    :returns dict of (prefixed) icon names and characters,
+             common icon prefix
+    """
+    icons = dict()
+    common_prefix = None
+
+    with io.open(css_file, encoding='utf-8', errors='replace') as fp:
+        for selector, names, char in iter_icon_rules(fp):
+            # Find out what the common prefix is
+            if common_prefix is None:
+                common_prefix = selector[1:]
+            else:
+                common_prefix = os.path.commonprefix((common_prefix,
+                                                      selector[1:]))
+
+            if char is not None:
+                for name in names:
+                    icons[name] = char
+
+    return icons, common_prefix or ''
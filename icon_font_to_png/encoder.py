@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+from collections import OrderedDict
+
+from icon_font_to_png.lazy import lazy_import
+
+ImageColor = lazy_import('PIL.ImageColor')
+
+
+# Image formats exported icons can be saved in, and their file extensions
+IMAGE_FORMATS = OrderedDict([
+    ('png', '.png'),
+    ('webp', '.webp'),
+    ('ico', '.ico'),
+    ('svg', '.svg'),
+])
+
+# zlib compression strategies (Pillow's `compress_type` PNG option)
+PNG_STRATEGIES = OrderedDict([
+    ('default', 0),
+    ('filtered', 1),
+    ('huffman', 2),
+    ('rle', 3),
+    ('fixed', 4),
+])
+
+
+class ImageEncoder(object):
+    """
+    Saves exported icon images in given format, with given compression
+    options.
+
+    Palette output stores single color icons as 8-bit indexed PNG images,
+    with a palette of the icon color in all opacity levels used in the
+    image, which is lossless (apart from the color of fully transparent
+    pixels) and needs no quantization.
+
+    ICO files can contain multiple sizes of an icon (up to 256x256 pixels).
+    WebP images are always saved losslessly. SVG images aren't saved by the
+    encoder, as they're made of glyph outlines (see `IconFont.render_svg`).
+    """
+    max_ico_size = 256
+
+    def __init__(self, format='png', compress_level=None, strategy=None,
+                 palette=False):
+        """
+        :param format: one of `IMAGE_FORMATS`
+        :param compress_level: PNG zlib compression level, between 0 (no
+                               compression) and 9; Pillow's default if None
+        :param strategy: one of `PNG_STRATEGIES`; Pillow's default if None
+        :param palette: whether to save PNG images as 8-bit indexed ones
+        """
+        if format not in IMAGE_FORMATS:
+            raise ValueError("Unknown image format '{format}'".format(
+                format=format)
+            )
+
+        if compress_level is not None and not 0 <= compress_level <= 9:
+            raise ValueError("Compression level has to be between 0 and 9")
+
+        if strategy is not None and strategy not in PNG_STRATEGIES:
+            raise ValueError("Unknown compression strategy '{name}'".format(
+                name=strategy)
+            )
+
+        if palette and format != 'png':
+            raise ValueError("Palette output is only supported for PNG "
+                             "images")
+
+        self.format = format
+        self.compress_level = compress_level
+        self.strategy = strategy
+        self.palette = palette
+
+    @property
+    def extension(self):
+        """File extension of the image format"""
+        return IMAGE_FORMATS[self.format]
+
+    @property
+    def vector(self):
+        """Whether images are vector ones, rather than rendered"""
+        return self.format == 'svg'
+
+    @property
+    def multiple_sizes(self):
+        """Whether multiple icon sizes are saved in a single file"""
+        return self.format == 'ico'
+
+    def get_options(self):
+        """Returns arguments needed to create an equivalent instance"""
+        return dict(
+            format=self.format,
+            compress_level=self.compress_level,
+            strategy=self.strategy,
+            palette=self.palette,
+        )
+
+    def save(self, images, fp, color):
+        """
+        Saves icon image(s) of given color.
+
+        :param images: list of "RGBA" mode images; only ICO format accepts
+                       more than one (of different sizes)
+        :param fp: file object or path
+        :param color: color name or hex value the images were rendered in
+        """
+        if self.vector:
+            raise ValueError("Vector images can't be saved from rendered "
+                             "ones")
+
+        if len(images) > 1 and not self.multiple_sizes:
+            raise ValueError("Format '{format}' doesn't support multiple "
+                             "images per file".format(format=self.format))
+
+        if self.format == 'ico':
+            images = sorted(images, key=lambda image: -image.size[0])
+            if images[0].size[0] > self.max_ico_size:
+                raise ValueError(
+                    "ICO images can't be bigger than {max}x{max} "
+                    "pixels".format(max=self.max_ico_size)
+                )
+
+            # The biggest image is saved as is, the rest (when supported
+            # by Pillow) are used instead of scaling it down
+            images[0].save(fp, format='ICO',
+                           sizes=[image.size for image in images],
+                           append_images=images[1:])
+        elif self.format == 'webp':
+            images[0].save(fp, format='WEBP', lossless=True)
+        else:
+            options = dict()
+            if self.compress_level is not None:
+                options['compress_level'] = self.compress_level
+            if self.strategy is not None:
+                options['compress_type'] = PNG_STRATEGIES[self.strategy]
+
+            image = images[0]
+            if self.palette:
+                image = to_palette_image(image, color)
+                options['transparency'] = image.info['transparency']
+
+            image.save(fp, format='PNG', **options)
+
+
+def to_palette_image(image, color):
+    """
+    Converts single color "RGBA" image to an 8-bit indexed one, without
+    losing any information (see `ImageEncoder`).
+
+    :param image: "RGBA" mode image
+    :param color: color name or hex value the image was rendered in
+    :returns "P" mode image
+    """
+    rgb = ImageColor.getrgb(color)[:3]
+    alpha = image.split()[3]
+
+    # Only opacity levels used in the image are put in the palette
+    used = [
+        value for value, count in enumerate(alpha.histogram()) if count
+    ]
+    lookup = [0] * 256
+    for index, value in enumerate(used):
+        lookup[value] = index
+
+    palette_image = alpha.point(lookup)
+    palette_image.putpalette(list(rgb) * len(used))
+    palette_image.info['transparency'] = bytes(bytearray(used))
+
+    return palette_image
@@ -1,44 +1,251 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import hashlib
+import io
 import os
 import re
 from collections import OrderedDict
 
-import tinycss
-from PIL import Image, ImageFont, ImageDraw
 from six import unichr
 
+from icon_font_to_png.cache import (
+    IconMapCache, LRUCache, RenderCache, make_dirs
+)
+from icon_font_to_png.css import CSS_PARSERS, extract_icons
+from icon_font_to_png.encoder import ImageEncoder
+from icon_font_to_png.index import IconIndex
+from icon_font_to_png.lazy import lazy_import
+from icon_font_to_png.manifest import ExportManifest
+from icon_font_to_png.outline import rasterize, svg_path
+from icon_font_to_png.stats import NULL_STAGE, ExportStats
+from icon_font_to_png.ttf import TTFFile
+
+Image = lazy_import('PIL.Image')
+ImageColor = lazy_import('PIL.ImageColor')
+ImageDraw = lazy_import('PIL.ImageDraw')
+ImageFont = lazy_import('PIL.ImageFont')
+tinycss = lazy_import('tinycss')
+
+# Optional dependency, imported on first use by `colorize_masks` (False if
+# it isn't installed)
+numpy = None
+
+
+# Available `IconFont.draw_masks` implementations
+RASTERIZERS = ('freetype', 'outline')
+
+# Has to be increased whenever changes in rendering affect exported images
+RENDERER_VERSION = 1
+
+# Used when exporting multiple sizes and / or colors of an icon
+DEFAULT_FILENAME_TEMPLATE = '{icon}-{size}-{color}'
+
+# Fields file name templates are recognized by
+FILENAME_FIELDS_RE = re.compile(r'\{(icon|size|color)([!:][^{}]*)?\}')
+
 
 class IconFont(object):
     """Base class that represents web icon font"""
-    def __init__(self, css_file, ttf_file, keep_prefix=False):
+    def __init__(self, css_file, ttf_file, keep_prefix=False,
+                 font_cache_size=32, cache_dir=None, css_parser='tinycss',
+                 render_cache_dir=None, render_cache_size=256 * 1024 * 1024,
+                 rasterizer='freetype', stats=None, ttf=None,
+                 supersample=None):
         """
         :param css_file: path to icon font CSS file
         :param ttf_file: path to icon font TTF file
         :param keep_prefix: whether to keep common icon prefix
+        :param font_cache_size: how many loaded font sizes to keep in memory
+        :param cache_dir: path to directory where parsed CSS files are cached;
+                          caching is disabled if None
+        :param css_parser: 'tinycss' for parsing the whole stylesheet, or
+                           'fast' for only scanning it for icon rules
+        :param render_cache_dir: path to directory where exported images are
+                                 cached (and shared between icon fonts and
+                                 processes); caching is disabled if None
+        :param render_cache_size: maximum render cache size in bytes
+        :param rasterizer: 'freetype' for rendering icons with FreeType, or
+                           'outline' for drawing glyph outlines read from
+                           the TTF file (directly in each size)
+        :param stats: `ExportStats` instance collecting per-stage timings
+                      and counters; nothing is collected if None
+        :param ttf: `TTFFile` instance of `ttf_file`, shared with other
+                    icon fonts (see `FontRegistry`); loaded on first use
+                    if None
+        :param supersample: how many times bigger than each icon size the
+                            glyph is rasterized (1 for rendering it directly
+                            in the icon size, with hinting); if None, glyph
+                            is rasterized once on the biggest mask, but at
+                            least 150x150 pixels (see `get_canvas_size`)
         """
+        if css_parser not in CSS_PARSERS:
+            raise ValueError("Unknown CSS parser '{name}'".format(
+                name=css_parser)
+            )
+
+        if rasterizer not in RASTERIZERS:
+            raise ValueError("Unknown rasterizer '{name}'".format(
+                name=rasterizer)
+            )
+
+        if supersample is not None and supersample < 1:
+            raise ValueError("Supersampling factor has to be a positive "
+                             "number")
+
         self.css_file = css_file
         self.ttf_file = ttf_file
         self.keep_prefix = keep_prefix
+        self.font_cache_size = font_cache_size
+        self.cache_dir = cache_dir
+        self.css_parser = css_parser
+        self.render_cache_dir = render_cache_dir
+        self.render_cache_size = render_cache_size
+        self.rasterizer = rasterizer
+        self.supersample = supersample
+        self.stats = stats
+        self.render_cache = None
+        if render_cache_dir:
+            self.render_cache = RenderCache(render_cache_dir,
+                                            max_size=render_cache_size)
+        self.font_cache = LRUCache(maxsize=font_cache_size)
+        self.outline_cache = LRUCache(maxsize=None)
+        self._ttf = ttf
+        self._ttf_hash = None
 
-        self.css_icons, self.common_prefix = self.load_css()
+        # Icons are only loaded when they're first needed, but a missing
+        # CSS file should still be reported right away
+        io.open(css_file, 'rb').close()
+        self._css_icons = None
+        self._common_prefix = None
+        self._index = None
+
+    @property
+    def css_icons(self):
+        """Sorted dict of icon names and characters (see `load_css`)"""
+        if self._css_icons is None:
+            self._load_icons()
+        return self._css_icons
+
+    @property
+    def common_prefix(self):
+        """Common icon prefix (see `load_css`)"""
+        if self._css_icons is None:
+            self._load_icons()
+        return self._common_prefix
+
+    @property
+    def index(self):
+        """Icon name index, built on first use (see `IconIndex`)"""
+        if self._index is None:
+            self._index = IconIndex(self.css_icons, self.common_prefix,
+                                    self.keep_prefix)
+        return self._index
+
+    def _load_icons(self):
+        with self._stage('load_css'):
+            self._css_icons, self._common_prefix = self.load_css()
+
+    def _stage(self, name):
+        """Returns context manager measuring time of given stage"""
+        if self.stats is None:
+            return NULL_STAGE
+        return self.stats.stage(name)
+
+    def _count(self, name, value=1):
+        """Increases given stats counter"""
+        if self.stats is not None:
+            self.stats.increment(name, value)
+
+    def get_options(self):
+        """Returns arguments needed to create an equivalent instance"""
+        return dict(
+            css_file=self.css_file,
+            ttf_file=self.ttf_file,
+            keep_prefix=self.keep_prefix,
+            font_cache_size=self.font_cache_size,
+            cache_dir=self.cache_dir,
+            css_parser=self.css_parser,
+            render_cache_dir=self.render_cache_dir,
+            render_cache_size=self.render_cache_size,
+            rasterizer=self.rasterizer,
+            ttf=self._ttf,
+            supersample=self.supersample,
+        )
+
+    def copy(self):
+        """
+        Returns an equivalent instance sharing loaded icons, TTF file data
+        and stats, but not FreeType fonts - so that both instances can be
+        used by different threads at the same time.
+        """
+        options = self.get_options()
+        options.update(ttf=self.ttf, stats=self.stats)
+        icon_font = IconFont(**options)
+        icon_font._css_icons = self.css_icons
+        icon_font._common_prefix = self.common_prefix
+        icon_font._index = self._index
+        icon_font.outline_cache = self.outline_cache
+
+        return icon_font
 
     def load_css(self):
         """
         Creates a dict of all icons available in CSS file, and finds out
         what's their common prefix.
 
+        If `cache_dir` is set, parsed icons are loaded from (or saved to)
+        the cache instead of parsing the CSS file every time.
+
         :returns sorted icons dict, common icon prefix
         """
+        if self.cache_dir:
+            cache = IconMapCache(self.cache_dir)
+            cached = cache.get(self.css_file, self.css_parser)
+            if cached is None:
+                self._count('css_cache_misses')
+                icons, common_prefix = self.parse_css()
+                cache.set(self.css_file, icons, common_prefix,
+                          self.css_parser)
+            else:
+                self._count('css_cache_hits')
+                icons, common_prefix = cached
+        else:
+            icons, common_prefix = self.parse_css()
+
+        # Remove common prefix
+        if not self.keep_prefix and len(common_prefix) > 0:
+            non_prefixed_icons = {}
+            for name in icons.keys():
+                non_prefixed_icons[name[len(common_prefix):]] = icons[name]
+            icons = non_prefixed_icons
+
+        sorted_icons = OrderedDict(sorted(icons.items(), key=lambda t: t[0]))
+
+        return sorted_icons, common_prefix
+
+    def parse_css(self):
+        """
+        Parses CSS file, looking for icon definitions.
+
+        :returns dict of (prefixed) icon names and characters,
+                 common icon prefix
+        """
+        if self.css_parser == 'fast':
+            return extract_icons(self.css_file)
+
         icons = dict()
         common_prefix = None
         parser = tinycss.make_parser('page3')
         stylesheet = parser.parse_stylesheet_file(self.css_file)
 
-        is_icon = re.compile("\.(.*):before,?")
+        is_icon = re.compile(r"\.(.+?)::?before(?=\s*,|\s*$)")
 
         for rule in stylesheet.rules:
+            # Skip at-rules (e.g. '@import')
+            if not hasattr(rule, 'selector'):
+                continue
+
             selector = rule.selector.as_css()
 
             # Skip CSS classes that are not icons
@@ -64,112 +271,1122 @@ class IconFont(object):
 
         common_prefix = common_prefix or ''
 
-        # Remove common prefix
-        if not self.keep_prefix and len(common_prefix) > 0:
-            non_prefixed_icons = {}
-            for name in icons.keys():
-                non_prefixed_icons[name[len(common_prefix):]] = icons[name]
-            icons = non_prefixed_icons
+        return icons, common_prefix
 
-        sorted_icons = OrderedDict(sorted(icons.items(), key=lambda t: t[0]))
+    def get_font(self, size):
+        """
+        Returns TTF font loaded in given size. Loaded fonts are cached, so
+        the TTF file is parsed only once per distinct size.
 
-        return sorted_icons, common_prefix
+        FreeType opens the TTF file by its path, so that it can map the
+        file into memory instead of each font size keeping its own copy of
+        the file data (mapped pages are shared by all font sizes and
+        processes through the page cache).
+
+        :param size: font size in pixels
+        """
+        key = (self.ttf_file, size)
+        font = self.font_cache.get(key)
+
+        if font is None:
+            self._count('font_cache_misses')
+            with self._stage('load_font'):
+                font = ImageFont.truetype(self.ttf_file, size)
+            self.font_cache.set(key, font)
+        else:
+            self._count('font_cache_hits')
+
+        return font
+
+    @property
+    def ttf(self):
+        """Lazily loaded TTF file metrics"""
+        if self._ttf is None:
+            self._ttf = TTFFile(self.ttf_file)
+        return self._ttf
+
+    def canvas_size(self, sizes):
+        """
+        Returns size of the mask icons of given sizes are rasterized on
+        (see `get_canvas_size`).
+
+        :param sizes: list of icon sizes in pixels
+        """
+        return get_canvas_size(sizes, self.supersample)
+
+    def fit_font(self, char, size, draw):
+        """
+        Finds the biggest font size (but not bigger than `size`) in which
+        given character fits inside a `size` x `size` pixels square.
+
+        The size is computed directly from glyph metrics read from the TTF
+        file, and then verified by measuring the rendered text once. Hinting
+        may make the rendered glyph a pixel or two bigger than expected, in
+        which case the size is corrected once, from the measured dimensions.
+        If hinting still makes the corrected size a pixel too big, the next
+        smaller size is used without measuring it again (and the returned
+        dimensions are the measured ones, limited to `size`), so the text is
+        measured at most twice.
+
+        :param char: icon character
+        :param size: boundary size in pixels
+        :param draw: `ImageDraw` instance used for measuring text
+        :returns font, text width, text height
+        """
+        with self._stage('fit_font'):
+            return self._fit_font(char, size, draw)
+
+    def _fit_font(self, char, size, draw):
+        font_size = size
+
+        # Rendered text spans from the ascender line (or higher) down to the
+        # lowest point of the glyph, and at least the glyph advance width
+        bbox = self.ttf.glyph_bbox(char)
+        if bbox:
+            x_min, y_min, x_max, y_max = bbox
+            units = max(self.ttf.advance_width(char), x_max,
+                        max(self.ttf.ascender, y_max) - min(0, y_min))
+            if units > self.ttf.units_per_em:
+                font_size = int(size * self.ttf.units_per_em / float(units))
+
+        font = self.get_font(font_size)
+        width, height = draw.textsize(char, font=font)
+        self._count('auto_scale_iterations')
+
+        # Correct the rounding / hinting errors (or fonts without readable
+        # metrics) with the measured dimensions, in a single step
+        dim = max(width, height)
+        if dim > size and font_size > 1:
+            font_size = max(min(font_size - 1,
+                                int(font_size * size / float(dim))), 1)
+            font = self.get_font(font_size)
+            width, height = draw.textsize(char, font=font)
+            self._count('auto_scale_iterations')
+
+            if max(width, height) > size and font_size > 1:
+                font = self.get_font(font_size - 1)
+                width, height = min(width, size), min(height, size)
+
+        return font, width, height
+
+    def draw_mask(self, icon, size, scale='auto'):
+        """
+        Draws given icon on a `size` x `size` pixels alpha mask.
+
+        :param icon: valid icon name
+        :param size: mask size in pixels
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :returns "L" mode image
+        """
+        char = self.css_icons[icon]
+
+        with self._stage('draw_glyph'):
+            mask = Image.new("L", (size, size), 0)
+            draw = ImageDraw.Draw(mask)
+
+            if scale == 'auto':
+                font, width, height = self.fit_font(char, size, draw)
+            else:
+                font = self.get_font(int(size * float(scale)))
+                width, height = draw.textsize(char, font=font)
+
+            draw.text((float(size - width) / 2, float(size - height) / 2),
+                      char, font=font, fill=255)
+
+        return mask
+
+    def draw_fitted_mask(self, icon, size, scale='auto'):
+        """
+        Draws given icon, centered, on a `size` x `size` pixels alpha mask,
+        rasterizing the glyph directly in the mask size.
+
+        Instead of leaving enough room on a big mask, the glyph is drawn
+        with a margin around it and its measured bounding box is centered
+        on the mask. With automatic scaling, font size is corrected the way
+        `fit_font` does it if hinting makes the glyph bigger than its
+        metrics: once from the measured bounding box, and then by a single
+        size without measuring it again, so the glyph is drawn at most three
+        times.
+
+        :param icon: valid icon name
+        :param size: mask size in pixels
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :returns "L" mode image
+        """
+        char = self.css_icons[icon]
+        canvas_size = size + 2 * (size // 4 + 2)
+
+        with self._stage('draw_glyph'):
+            canvas = Image.new("L", (canvas_size, canvas_size), 0)
+            draw = ImageDraw.Draw(canvas)
+
+            def draw_glyph(font, width, height):
+                draw.rectangle((0, 0, canvas_size, canvas_size), fill=0)
+                draw.text((float(canvas_size - width) / 2,
+                           float(canvas_size - height) / 2),
+                          char, font=font, fill=255)
+                return canvas.getbbox()
+
+            if scale == 'auto':
+                font, width, height = self.fit_font(char, size, draw)
+            else:
+                font = self.get_font(int(size * float(scale)))
+                width, height = draw.textsize(char, font=font)
+            bbox = draw_glyph(font, width, height)
+
+            dim = max(bbox[2] - bbox[0], bbox[3] - bbox[1]) if bbox else 0
+            if scale == 'auto' and dim > size and font.size > 1:
+                font_size = max(min(font.size - 1,
+                                    int(font.size * size / float(dim))), 1)
+                font = self.get_font(font_size)
+                width, height = draw.textsize(char, font=font)
+                self._count('auto_scale_iterations')
+                bbox = draw_glyph(font, width, height)
+
+                if bbox and font_size > 1 and \
+                        max(bbox[2] - bbox[0], bbox[3] - bbox[1]) > size:
+                    bbox = draw_glyph(self.get_font(font_size - 1), width,
+                                      height)
+
+        mask = Image.new("L", (size, size), 0)
+        if bbox:
+            with self._stage('center'):
+                glyph = canvas.crop(bbox)
+                mask.paste(glyph, (int((size - glyph.size[0]) / 2),
+                                   int((size - glyph.size[1]) / 2)))
+
+        return mask
+
+    def glyph_outline(self, icon):
+        """
+        Returns outline of given icon glyph, read from the TTF file once
+        and then cached.
+
+        :param icon: valid icon name
+        :returns list of contours (see `TTFFile.glyph_contours`)
+        """
+        char = self.css_icons[icon]
+        contours = self.outline_cache.get(char)
+
+        if contours is None:
+            contours = self.ttf.glyph_contours(char)
+            self.outline_cache.set(char, contours)
+
+        return contours
+
+    def outline_transform(self, icon, size, scale='auto'):
+        """
+        Finds out where to place glyph outline so that it's scaled and
+        centered the same way as rendered icons are.
+
+        :param icon: valid icon name
+        :param size: icon size in pixels
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :returns (scale, x offset, y offset) tuple, mapping font units to
+                 pixels as `(x * scale + x offset, y offset - y * scale)`
+        """
+        char = self.css_icons[icon]
+        units_per_em = float(self.ttf.units_per_em)
+        bbox = self.ttf.glyph_bbox(char) or (0, 0, 0, 0)
+        x_min, y_min, x_max, y_max = bbox
+
+        if scale == 'auto':
+            # Same metrics as in `fit_font`
+            units = max(self.ttf.advance_width(char), x_max,
+                        max(self.ttf.ascender, y_max) - min(0, y_min))
+            pixel_scale = size / max(units_per_em, units)
+        else:
+            pixel_scale = size * float(scale) / units_per_em
+
+        x_offset = (size - (x_max - x_min) * pixel_scale) / 2 - \
+            x_min * pixel_scale
+        y_offset = (size - (y_max - y_min) * pixel_scale) / 2 + \
+            y_max * pixel_scale
+
+        return pixel_scale, x_offset, y_offset
+
+    def draw_outline_mask(self, icon, size, scale='auto'):
+        """
+        Draws given icon, centered, on a `size` x `size` pixels alpha mask,
+        from its (cached) glyph outline instead of with FreeType.
+
+        :param icon: valid icon name
+        :param size: mask size in pixels
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :returns "L" mode image
+        """
+        pixel_scale, x_offset, y_offset = self.outline_transform(icon, size,
+                                                                 scale)
+
+        def transform(point):
+            return (point[0] * pixel_scale + x_offset,
+                    y_offset - point[1] * pixel_scale)
+
+        # Big icons need less supersampling for smooth edges
+        supersample = self.supersample or max(2, min(4, 2048 // size))
+
+        contours = self.glyph_outline(icon)
+        with self._stage('draw_outline'):
+            return rasterize(contours, size, transform, supersample)
+
+    def render_svg(self, icon, size, color='black', scale='auto'):
+        """
+        Renders given icon as an SVG image, made of its glyph outline,
+        which takes the same time regardless of the size.
+
+        :param icon: valid icon name
+        :param size: icon size in pixels
+        :param color: color name or hex value
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :returns SVG document
+        """
+        pixel_scale, x_offset, y_offset = self.outline_transform(icon, size,
+                                                                 scale)
+        contours = self.glyph_outline(icon)
+        with self._stage('render_svg'):
+            path = svg_path(contours)
+
+        return (
+            '<svg xmlns="http://www.w3.org/2000/svg" width="{size}" '
+            'height="{size}" viewBox="0 0 {size} {size}">\n'
+            '<path fill="#{color}" transform="matrix({scale} 0 0 -{scale} '
+            '{x} {y})" d="{path}"/>\n'
+            '</svg>\n'
+        ).format(
+            size=size,
+            color='{0:02x}{1:02x}{2:02x}'.format(
+                *ImageColor.getrgb(color)[:3]
+            ),
+            scale=_format_float(pixel_scale), x=_format_float(x_offset),
+            y=_format_float(y_offset),
+            path=path,
+        )
+
+    def draw_masks(self, icon, sizes, scale='auto', canvas_size=None):
+        """
+        Draws given icon, centered, on alpha masks of all given sizes.
+
+        The glyph is rasterized only once, on the biggest mask (but at least
+        150x150 pixels, so that it's much less likely that the edges of the
+        icon end up cropped), which is then scaled down to other sizes.
+
+        With `supersample` factor, the glyph is rasterized for each size
+        instead, `supersample` times bigger (see `draw_fitted_mask`), and
+        scaled down to the size. With 'outline' rasterizer, glyph outline
+        is drawn directly in each of the sizes instead.
+
+        :param icon: valid icon name
+        :param sizes: list of mask sizes in pixels
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param canvas_size: size of the mask the glyph is rasterized on;
+                            see `canvas_size` if None (ignored with
+                            `supersample` factor or 'outline' rasterizer)
+        :returns generator of (size, "L" mode image) tuples
+        """
+        if self.rasterizer == 'outline':
+            for size in sizes:
+                yield size, self.draw_outline_mask(icon, size, scale)
+            return
+
+        if self.supersample:
+            for size in sizes:
+                mask = self.draw_fitted_mask(icon, size * self.supersample,
+                                             scale)
+                if self.supersample > 1:
+                    with self._stage('resize'):
+                        mask = mask.resize((size, size), Image.ANTIALIAS)
+                yield size, mask
+            return
+
+        canvas_size = canvas_size or self.canvas_size(sizes)
+
+        # Rasterize the glyph only once, into an 8-bit alpha mask
+        mask = self.draw_mask(icon, canvas_size, scale)
+        bbox = mask.getbbox()
+
+        # Center the icon
+        if bbox:
+            with self._stage('center'):
+                icon_mask = mask.crop(bbox)
+                border_w = int((canvas_size - icon_mask.size[0]) / 2)
+                border_h = int((canvas_size - icon_mask.size[1]) / 2)
+
+                mask = Image.new("L", (canvas_size, canvas_size), 0)
+                mask.paste(icon_mask, (border_w, border_h))
+
+        for size in sizes:
+            if size == canvas_size:
+                yield size, mask
+            else:
+                with self._stage('resize'):
+                    resized = mask.resize((size, size), Image.ANTIALIAS)
+                yield size, resized
+
+    def render_variants(self, icon, sizes, colors, scale='auto',
+                        canvas_size=None):
+        """
+        Renders given icon in all combinations of passed sizes and colors,
+        rasterizing the glyph only once.
+
+        :param icon: valid icon name
+        :param sizes: list of icon sizes in pixels
+        :param colors: list of color names or hex values
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param canvas_size: size of the mask the glyph is rasterized on;
+                            see `canvas_size` if None
+        :returns generator of (size, color, "RGBA" mode image) tuples
+        """
+        for size, mask in self.draw_masks(icon, sizes, scale, canvas_size):
+            with self._stage('colorize'):
+                images = colorize_masks(mask, colors)
+            for color, image in zip(colors, images):
+                yield size, color, image
+
+    def render_icon(self, icon, size, color='black', scale='auto', fp=None,
+                    format='PNG'):
+        """
+        Renders given icon with provided parameters, without touching
+        the file system (unless `fp` is a path).
+
+        :param icon: valid icon name
+        :param size: icon size in pixels
+        :param color: color name or hex value
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param fp: file object (e.g. `io.BytesIO`) or path the encoded
+                   image is written to; if None, the image is returned
+        :param format: image format used when writing to `fp`
+        :returns "RGBA" mode image, or `fp` if it was passed
+        """
+        image = next(self.render_variants(icon, [size], [color], scale))[2]
+
+        if fp is None:
+            return image
+
+        image.save(fp, format=format)
+        return fp
 
     def export_icon(self, icon, size, color='black', scale='auto',
-                    filename=None, export_dir='exported'):
+                    filename=None, export_dir='exported', encoder=None):
         """
         Exports given icon with provided parameters.
 
         If the desired icon size is less than 150x150 pixels, we will first
         create a 150x150 pixels image and then scale it down, so that
-        it's much less likely that the edges of the icon end up cropped.
+        it's much less likely that the edges of the icon end up cropped
+        (unless `supersample` factor is set, see `draw_masks`).
+
+        Lists of sizes and / or colors can be passed to export all their
+        combinations at once (from a single glyph rasterization). In that
+        case `filename` is a template, which can use `{icon}`, `{size}`
+        and `{color}` fields (with '#' stripped from hex values). Formats
+        supporting multiple sizes (ICO) store all sizes in one file.
+
+        If render cache is enabled, cached images are copied instead of being
+        rendered again.
 
         :param icon: valid icon name
-        :param filename: name of the output file
-        :param size: icon size in pixels
+        :param filename: name of the output file (or file name template)
+        :param size: icon size in pixels, or list of sizes
+        :param color: color name or hex value, or list of colors
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param export_dir: path to export directory
+        :param encoder: `ImageEncoder` instance, with image format and
+                        compression options; default PNG if None
+        """
+        encoder = encoder or ImageEncoder()
+        missing = self.missing_files(icon, size, color, scale, filename,
+                                     export_dir, encoder)
+
+        for entry, content in self.render_files(icon, missing, scale,
+                                                encoder):
+            if encoder.vector:
+                self.save_file(entry, lambda path: _write_text(path, content))
+            else:
+                self.save_file(entry, lambda path: encoder.save(
+                    content, path, entry['color']
+                ))
+
+    def missing_files(self, icon, size, color='black', scale='auto',
+                      filename=None, export_dir='exported', encoder=None):
+        """
+        Returns output files of given icon which have to be rendered,
+        after copying the ones found in render cache
+        (see `export_icon`). Export directory is created if needed.
+
+        :returns list of dicts with output file `path`, render cache `key`
+                 (or None), list of `sizes`, `color` and `canvas` size (of
+                 all sizes, see `canvas_size`)
+        """
+        encoder = encoder or ImageEncoder()
+        sizes = _to_list(size)
+        colors = _to_list(color)
+        canvas_size = self.canvas_size(sizes)
+
+        # Make sure export directory exists
+        make_dirs(export_dir)
+
+        missing = []
+        for file_name, file_sizes, file_color in self.export_files(
+                icon, sizes, colors, filename, encoder):
+            path = os.path.join(export_dir, file_name)
+            key = None
+
+            if self.render_cache:
+                key = RenderCache.key(self.fingerprint(
+                    icon, _from_list(file_sizes), file_color, scale,
+                    canvas_size, encoder
+                ))
+                with self._stage('render_cache'):
+                    hit = self.render_cache.get(key, path)
+                if hit:
+                    self._count('render_cache_hits')
+                    continue
+                self._count('render_cache_misses')
+
+            missing.append(dict(path=path, key=key, sizes=file_sizes,
+                                color=file_color, canvas=canvas_size))
+
+        return missing
+
+    def render_files(self, icon, files, scale='auto', encoder=None):
+        """
+        Renders given output files of an icon, rasterizing the glyph only
+        once. Each file is yielded as soon as all its sizes are rendered.
+
+        :param icon: valid icon name
+        :param files: list of output files (see `missing_files`)
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        :returns generator of (file, content) tuples, where content is a
+                 list of "RGBA" mode images (one per size), or SVG document
+                 for vector formats
+        """
+        encoder = encoder or ImageEncoder()
+        if not files:
+            return
+
+        # Vector images don't need rasterizing at all
+        if encoder.vector:
+            for entry in files:
+                yield entry, self.render_svg(icon, entry['sizes'][0],
+                                             entry['color'], scale)
+            return
+
+        # Files waiting for each of the rendered variants
+        waiting = dict()
+        images = dict()
+        for index, entry in enumerate(files):
+            images[index] = []
+            for file_size in entry['sizes']:
+                waiting.setdefault((file_size, entry['color']), []).append(
+                    index
+                )
+
+        sizes = list(OrderedDict.fromkeys(
+            file_size for entry in files for file_size in entry['sizes']
+        ))
+        colors = list(OrderedDict.fromkeys(
+            entry['color'] for entry in files
+        ))
+        for variant_size, variant_color, out_image in self.render_variants(
+                icon, sizes, colors, scale, files[0]['canvas']):
+            for index in waiting.get((variant_size, variant_color), []):
+                images[index].append(out_image)
+                if len(images[index]) == len(files[index]['sizes']):
+                    yield files[index], images.pop(index)
+
+    def encode_file(self, entry, content, encoder=None):
+        """
+        Returns rendered output file encoded as bytes.
+
+        :param entry: output file (see `missing_files`)
+        :param content: rendered file content (see `render_files`)
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        """
+        encoder = encoder or ImageEncoder()
+        with self._stage('encode'):
+            if encoder.vector:
+                return content.encode('utf-8')
+
+            fp = io.BytesIO()
+            encoder.save(content, fp, entry['color'])
+            return fp.getvalue()
+
+    def save_file(self, entry, save):
+        """
+        Saves rendered output file, and stores it in render cache.
+
+        :param entry: output file (see `missing_files`)
+        :param save: function writing the file to given path
+        """
+        with self._stage('save'):
+            save(entry['path'])
+        self._count('files_saved')
+
+        if entry['key']:
+            with self._stage('render_cache'):
+                self.render_cache.set(entry['key'], entry['path'])
+
+    def export_files(self, icon, sizes, colors, filename=None,
+                     encoder=None):
+        """
+        Returns output files of all combinations of given sizes and
+        colors (see `export_icon`).
+
+        :param icon: valid icon name
+        :param sizes: list of icon sizes in pixels
+        :param colors: list of color names or hex values
+        :param filename: name of the output file (or file name template)
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        :returns list of (file name, list of sizes, color) tuples
+        """
+        encoder = encoder or ImageEncoder()
+
+        # Default filename
+        if not filename:
+            if encoder.multiple_sizes and len(colors) > 1:
+                filename = '{icon}-{color}' + encoder.extension
+            elif encoder.multiple_sizes:
+                filename = icon + encoder.extension
+            elif len(sizes) > 1 or len(colors) > 1:
+                filename = DEFAULT_FILENAME_TEMPLATE + encoder.extension
+            else:
+                filename = icon + encoder.extension
+
+        if encoder.multiple_sizes:
+            variants = [(size, color) for color in colors for size in sizes]
+        else:
+            variants = [(size, color) for size in sizes for color in colors]
+
+        # Later variants overwrite earlier ones with the same file name,
+        # unless they're another size to be stored in the same file
+        files = OrderedDict()
+        for size, color in variants:
+            name = format_filename(filename, icon, size, color)
+            if (encoder.multiple_sizes and name in files and
+                    files[name][1] == color):
+                if size not in files[name][0]:
+                    files[name][0].append(size)
+            else:
+                files[name] = ([size], color)
+
+        return [
+            (name, file_sizes, color)
+            for name, (file_sizes, color) in files.items()
+        ]
+
+    @property
+    def ttf_hash(self):
+        """Lazily computed TTF file content hash"""
+        if self._ttf_hash is None:
+            self._ttf_hash = hashlib.sha1(self.ttf.data).hexdigest()
+        return self._ttf_hash
+
+    def fingerprint(self, icon, size, color, scale='auto',
+                    canvas_size=None, encoder=None):
+        """
+        Describes everything exported icon file depends on.
+
+        :param icon: valid icon name
+        :param size: icon size in pixels, or list of sizes stored in one file
         :param color: color name or hex value
         :param scale: scaling factor between 0 and 1,
                       or 'auto' for automatic scaling
+        :param canvas_size: size of the mask the glyph is rasterized on;
+                            see `canvas_size` if None
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        :returns dict
+        """
+        # Other sizes exported along don't change supersampled and outline
+        # icons, which are rasterized for each size on its own
+        if self.supersample or self.rasterizer == 'outline':
+            canvas_size = None
+
+        fingerprint = {
+            'ttf': self.ttf_hash,
+            'codepoint': ord(self.css_icons[icon]),
+            'size': size,
+            'color': color,
+            'scale': str(scale),
+            'canvas': canvas_size or self.canvas_size(_to_list(size)),
+            'encoder': (encoder or ImageEncoder()).get_options(),
+            'rasterizer': self.rasterizer,
+            'renderer': RENDERER_VERSION,
+        }
+
+        # Files rendered before supersampling was configurable stay valid
+        if self.supersample:
+            fingerprint['supersample'] = self.supersample
+
+        return fingerprint
+
+    def outdated_icons(self, icons, size, color='black', scale='auto',
+                       filenames=None, export_dir='exported', encoder=None):
+        """
+        Finds out which of given icons have to be exported (again), because
+        some of their files are missing, or were exported with different
+        parameters or from different font.
+
+        :param icons: list of valid icon names
+        :param size: icon size in pixels, or list of sizes
+        :param color: color name or hex value, or list of colors
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param filenames: dict of icon names and output file names
+                          (or templates, see `export_icon`)
         :param export_dir: path to export directory
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        :returns list of icon names
         """
-        org_size = size
-        size = max(150, size)
+        sizes = _to_list(size)
+        colors = _to_list(color)
+        filenames = filenames or {}
+        canvas_size = self.canvas_size(sizes)
+        manifest = ExportManifest(export_dir)
 
-        image = Image.new("RGBA", (size, size), color=(0, 0, 0, 0))
-        draw = ImageDraw.Draw(image)
+        return [
+            icon for icon in icons
+            if not all(
+                manifest.is_up_to_date(
+                    file_name,
+                    self.fingerprint(icon, _from_list(file_sizes), file_color,
+                                     scale, canvas_size, encoder)
+                )
+                for file_name, file_sizes, file_color
+                in self.export_files(icon, sizes, colors,
+                                     filenames.get(icon), encoder)
+            )
+        ]
 
-        if scale == 'auto':
-            scale_factor = 1
+    def export_icons(self, icons, size, color='black', scale='auto',
+                     filenames=None, export_dir='exported', jobs=1,
+                     incremental=False, encoder=None, outdated=None):
+        """
+        Exports multiple icons with provided parameters.
+
+        If `jobs` is bigger than 1, icons are exported in parallel by a pool
+        of worker processes, each one loading the icon font files only once.
+        Failing icons don't stop the export of the others.
+
+        In incremental mode, what each file was rendered from is recorded in
+        a manifest file in the export directory, and icons which files are
+        up to date are skipped (see `outdated_icons`).
+
+        :param icons: list of valid icon names
+        :param size: icon size in pixels, or list of sizes
+        :param color: color name or hex value, or list of colors
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param filenames: dict of icon names and output file names
+                          (or templates, see `export_icon`);
+                          icon name is used if it's missing
+        :param export_dir: path to export directory
+        :param jobs: number of worker processes
+        :param incremental: whether to skip icons exported before
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        :param outdated: in incremental mode, icons already known to be
+                         outdated (see `outdated_icons`), so that they
+                         aren't checked again; checked if None
+        :returns dict of failed icon names and error messages
+        """
+        filenames = filenames or {}
+        if incremental and outdated is None:
+            icons = self.outdated_icons(icons, size, color, scale, filenames,
+                                        export_dir, encoder)
+        elif incremental:
+            outdated = set(outdated)
+            icons = [icon for icon in icons if icon in outdated]
+
+        # Created before worker processes start creating it all at once
+        make_dirs(export_dir)
+
+        tasks = [
+            dict(icon=icon, size=size, color=color, scale=scale,
+                 filename=filenames.get(icon), export_dir=export_dir,
+                 encoder=encoder)
+            for icon in icons
+        ]
+
+        if jobs > 1:
+            from multiprocessing import Pool
+            pool = Pool(
+                processes=jobs,
+                initializer=_init_export_worker,
+                initargs=(self.get_options(), self.stats is not None),
+            )
+            try:
+                results = []
+                for error, stats in pool.map(_export_icon_worker, tasks):
+                    results.append(error)
+                    if stats is not None:
+                        self.stats.merge(stats)
+            finally:
+                pool.close()
+                pool.join()
         else:
-            scale_factor = float(scale)
+            results = [_export_icon(self, task) for task in tasks]
 
-        font = ImageFont.truetype(self.ttf_file, int(size * scale_factor))
-        width, height = draw.textsize(self.css_icons[icon], font=font)
+        failed = OrderedDict(
+            (task['icon'], error)
+            for task, error in zip(tasks, results) if error is not None
+        )
+
+        if incremental and tasks:
+            self.record_exports(
+                [icon for icon in icons if icon not in failed], size, color,
+                scale, filenames, export_dir, encoder
+            )
+
+        return failed
+
+    def archive_icon(self, icon, size, color='black', scale='auto',
+                     filename=None, encoder=None):
+        """
+        Renders and encodes given icon with provided parameters (see
+        `export_icon`), without touching the file system.
+
+        :returns list of (file name, content as bytes) tuples, with the
+                 file names `export_icon` would write
+        """
+        encoder = encoder or ImageEncoder()
+        sizes = _to_list(size)
+        canvas_size = self.canvas_size(sizes)
+        files = [
+            dict(path=file_name, key=None, sizes=file_sizes,
+                 color=file_color, canvas=canvas_size)
+            for file_name, file_sizes, file_color in self.export_files(
+                icon, sizes, _to_list(color), filename, encoder)
+        ]
+
+        return [
+            (entry['path'], self.encode_file(entry, content, encoder))
+            for entry, content in self.render_files(icon, files, scale,
+                                                    encoder)
+        ]
+
+    def archive_icons(self, icons, archive, size, color='black',
+                      scale='auto', filenames=None, jobs=1, encoder=None):
+        """
+        Writes multiple icons into an archive (instead of into separate
+        files in export directory), each one as soon as it's rendered.
+
+        If `jobs` is bigger than 1, icons are rendered and encoded by a
+        pool of worker processes, and written into the archive by this one,
+        in order. Only a few icons per worker are rendered ahead, so memory
+        use doesn't depend on the number of icons.
+
+        :param icons: list of valid icon names
+        :param archive: `ArchiveWriter` instance
+        :param size: icon size in pixels, or list of sizes
+        :param color: color name or hex value, or list of colors
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param filenames: dict of icon names and archived file names
+                          (or templates, see `export_icon`);
+                          icon name is used if it's missing
+        :param jobs: number of worker processes
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        :returns dict of failed icon names and error messages
+        """
+        encoder = encoder or ImageEncoder()
+        filenames = filenames or {}
+        tasks = [
+            dict(icon=icon, size=size, color=color, scale=scale,
+                 filename=filenames.get(icon), encoder=encoder)
+            for icon in icons
+        ]
+
+        failed = OrderedDict()
+
+        def write(task, error, files):
+            if error is not None:
+                failed[task['icon']] = error
+                return
+
+            for file_name, data in files:
+                with self._stage('save'):
+                    archive.write(file_name, data, compress=encoder.vector)
+                self._count('files_saved')
+
+        if jobs > 1:
+            from multiprocessing import Pool
+            pool = Pool(
+                processes=jobs,
+                initializer=_init_export_worker,
+                initargs=(self.get_options(), self.stats is not None),
+            )
+            try:
+                chunk_size = jobs * 4
+                for start in range(0, len(tasks), chunk_size):
+                    chunk = tasks[start:start + chunk_size]
+                    results = pool.imap(_archive_icon_worker, chunk)
+                    for task, (error, files, stats) in zip(chunk, results):
+                        if stats is not None:
+                            self.stats.merge(stats)
+                        write(task, error, files)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for task in tasks:
+                write(task, *_archive_icon(self, task))
+
+        return failed
+
+    def record_exports(self, icons, size, color='black', scale='auto',
+                       filenames=None, export_dir='exported', encoder=None):
+        """
+        Records what files of given (exported) icons were rendered from in
+        the export directory manifest (see `outdated_icons`).
+
+        :param icons: list of valid icon names
+        :param size: icon size in pixels, or list of sizes
+        :param color: color name or hex value, or list of colors
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param filenames: dict of icon names and output file names
+                          (or templates, see `export_icon`)
+        :param export_dir: path to export directory
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        """
+        sizes = _to_list(size)
+        colors = _to_list(color)
+        filenames = filenames or {}
+        canvas_size = self.canvas_size(sizes)
+        manifest = ExportManifest(export_dir)
+
+        for icon in icons:
+            for file_name, file_sizes, file_color in self.export_files(
+                    icon, sizes, colors, filenames.get(icon), encoder):
+                manifest.set(file_name, self.fingerprint(
+                    icon, _from_list(file_sizes), file_color, scale,
+                    canvas_size, encoder
+                ))
+        manifest.save()
 
-        # If auto-scaling is enabled, we need to make sure the resulting
-        # graphic fits inside the boundary. The values are rounded and may be
-        # off by a pixel or two, so we may need to do a few iterations.
-        # The use of a decrementing multiplication factor protects us from
-        # getting into an infinite loop.
-        if scale == 'auto':
-            iteration = 0
-            factor = 1
 
-            while True:
-                width, height = draw.textsize(self.css_icons[icon], font=font)
+def get_canvas_size(sizes, supersample=None):
+    """
+    Returns size of the mask icons of given sizes are rasterized on - the
+    biggest of them, but at least 150x150 pixels, so that it's much less
+    likely that the edges of the icon end up cropped. With `supersample`
+    factor, the biggest size that many times instead (see
+    `IconFont.draw_masks`).
 
-                # Check if the image fits
-                dim = max(width, height)
-                if dim > size:
-                    font = ImageFont.truetype(self.ttf_file,
-                                              int(size * size/dim * factor))
-                else:
-                    break
+    :param sizes: list of icon sizes in pixels
+    :param supersample: supersampling factor, or None
+    """
+    if supersample:
+        return max(sizes) * supersample
+    return max(150, max(sizes))
 
-                # Adjust the factor every two iterations
-                iteration += 1
-                if iteration % 2 == 0:
-                    factor *= 0.99
 
-        draw.text((float(size - width) / 2, float(size - height) / 2),
-                  self.css_icons[icon], font=font, fill=color)
+def is_filename_template(filename):
+    """
+    Returns whether given file name is a template, i.e. contains at least
+    one of the `{icon}`, `{size}` and `{color}` fields (other braces are
+    taken literally)
+    """
+    return bool(FILENAME_FIELDS_RE.search(filename))
 
-        # Get bounding box
-        bbox = image.getbbox()
 
-        # Create an alpha mask
-        image_mask = Image.new("L", (size, size), 0)
-        draw_mask = ImageDraw.Draw(image_mask)
+def format_filename(template, icon, size, color):
+    """
+    Fills output file name template with given icon variant values. File
+    names without any template fields are returned unchanged.
 
-        # Draw the icon on the mask
-        draw_mask.text((float(size - width) / 2, float(size - height) / 2),
-                       self.css_icons[icon], font=font, fill=255)
+    :param template: file name, optionally with `{icon}`, `{size}` and
+                     `{color}` fields
+    :param icon: icon name
+    :param size: icon size in pixels
+    :param color: color name or hex value ('#' is stripped from the latter)
+    :raises ValueError: if the template is invalid
+    """
+    if not is_filename_template(template):
+        return template
+
+    try:
+        return template.format(icon=icon, size=size,
+                               color=color.lstrip('#'))
+    except (ValueError, KeyError, IndexError) as e:
+        raise ValueError("Invalid file name template '{template}': "
+                         "{error}".format(template=template, error=e))
+
+
+def colorize_mask(mask, color):
+    """
+    Creates an image of given size and color, using passed alpha mask.
+    Pixels outside of the mask bounding box are left fully transparent.
+
+    :param mask: "L" mode image
+    :param color: color name or hex value
+    :returns "RGBA" mode image
+    """
+    image = Image.new("RGBA", mask.size, (0, 0, 0, 0))
+    bbox = mask.getbbox()
+
+    if bbox:
+        icon_mask = mask.crop(bbox)
 
         # Create a solid color image and apply the mask
-        icon_image = Image.new("RGBA", (size, size), color)
-        icon_image.putalpha(image_mask)
+        icon_image = Image.new("RGBA", icon_mask.size, color)
+        icon_image.putalpha(icon_mask)
+        image.paste(icon_image, bbox[:2])
 
-        if bbox:
-            icon_image = icon_image.crop(bbox)
+    return image
 
-        border_w = int((size - (bbox[2] - bbox[0])) / 2)
-        border_h = int((size - (bbox[3] - bbox[1])) / 2)
 
-        # Create output image
-        out_image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        out_image.paste(icon_image, (border_w, border_h))
+def colorize_masks(mask, colors):
+    """
+    Creates images of all given colors at once, using the same alpha mask
+    (see `colorize_mask`).
 
-        # If necessary, scale the image to the target size
-        if org_size != size:
-            out_image = out_image.resize((org_size, org_size), Image.ANTIALIAS)
+    If NumPy is installed, multiple colors are tinted with vectorised array
+    operations; otherwise the mask is cropped only once and reused for
+    every color.
 
-        # Make sure export directory exists
-        if not os.path.exists(export_dir):
-            os.makedirs(export_dir)
+    :param mask: "L" mode image
+    :param colors: list of color names or hex values
+    :returns list of "RGBA" mode images, in the order of `colors`
+    """
+    bbox = mask.getbbox()
+    if not bbox:
+        return [Image.new("RGBA", mask.size, (0, 0, 0, 0)) for _ in colors]
 
-        # Default filename
-        if not filename:
-            filename = icon + '.png'
+    # Not worth the array set up for a single color
+    numpy = _import_numpy() if len(colors) > 1 else None
+    if numpy is not None:
+        width, height = mask.size
+        left, upper, right, lower = bbox
+
+        # Pixels are handled as 32-bit integers, so that all channels are set
+        # at once. Only color channels are used, alpha comes from the mask.
+        rgb = numpy.zeros((len(colors), 4), dtype=numpy.uint8)
+        rgb[:, :3] = [ImageColor.getrgb(color)[:3] for color in colors]
+        alpha = numpy.zeros((height, width, 4), dtype=numpy.uint8)
+        alpha[..., 3] = numpy.asarray(mask)
+
+        pixels = numpy.empty((len(colors), height, width), dtype=numpy.uint32)
+        pixels[:] = alpha.view(numpy.uint32)[..., 0]
+        pixels[:, upper:lower, left:right] |= \
+            rgb.view(numpy.uint32)[:, 0, None, None]
+
+        pixels = pixels.view(numpy.uint8).reshape(len(colors), height,
+                                                  width, 4)
+        return [Image.fromarray(image, "RGBA") for image in pixels]
+
+    icon_mask = mask.crop(bbox)
+    images = []
+    for color in colors:
+        icon_image = Image.new("RGBA", icon_mask.size, color)
+        icon_image.putalpha(icon_mask)
+
+        image = Image.new("RGBA", mask.size, (0, 0, 0, 0))
+        image.paste(icon_image, bbox[:2])
+        images.append(image)
+
+    return images
+
+
+def _format_float(value):
+    """Formats number with 6 significant digits"""
+    return '{0:.6g}'.format(value)
+
+
+def _to_list(value):
+    """Wraps single value in a list (used for sizes and colors)"""
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _import_numpy():
+    """Imports NumPy on first use; returns None if it isn't installed"""
+    global numpy
+    if numpy is None:
+        try:
+            import numpy as module
+        except ImportError:  # pragma: no cover
+            module = False
+        numpy = module
+    return numpy or None
+
+
+def _from_list(values):
+    """Unwraps single value list (reverse of `_to_list`)"""
+    return values[0] if len(values) == 1 else values
+
+
+def _write_text(path, text):
+    """Writes text to an UTF-8 encoded file"""
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _export_icon(icon_font, task):
+    """Exports single icon, returning error message if it fails"""
+    try:
+        icon_font.export_icon(**task)
+    except Exception as e:
+        return '{name}: {error}'.format(name=type(e).__name__, error=e)
+
+
+def _archive_icon(icon_font, task):
+    """
+    Renders single icon for archiving, returning error message if it fails,
+    and list of archived files
+    """
+    try:
+        return None, icon_font.archive_icon(**task)
+    except Exception as e:
+        return '{name}: {error}'.format(name=type(e).__name__, error=e), []
+
+
+# Icon font instance loaded once per `IconFont.export_icons` worker process
+_worker_icon_font = None
+
+
+def _init_export_worker(options, collect_stats=False):
+    """Loads icon font files in `IconFont.export_icons` worker process"""
+    global _worker_icon_font
+    _worker_icon_font = IconFont(**options)
+    if collect_stats:
+        _worker_icon_font.stats = ExportStats()
+
+
+def _export_icon_worker(task):
+    """
+    Exports single icon in `IconFont.export_icons` worker process
+
+    :returns error message (or None), dict of stats collected during the
+             export (or None)
+    """
+    stats = _worker_icon_font.stats
+    if stats is not None:
+        stats.clear()
+
+    error = _export_icon(_worker_icon_font, task)
+    return error, stats.to_dict() if stats is not None else None
+
+
+def _archive_icon_worker(task):
+    """
+    Renders single icon for `IconFont.archive_icons` in worker process
+
+    :returns error message (or None), list of archived files, dict of stats
+             collected during rendering (or None)
+    """
+    stats = _worker_icon_font.stats
+    if stats is not None:
+        stats.clear()
 
-        # Save file
-        out_image.save(os.path.join(export_dir, filename))
+    error, files = _archive_icon(_worker_icon_font, task)
+    return error, files, stats.to_dict() if stats is not None else None
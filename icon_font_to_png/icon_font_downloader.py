@@ -2,11 +2,16 @@
 from __future__ import absolute_import, unicode_literals
 
 import os
+import shutil
+import tempfile
 from abc import ABCMeta, abstractmethod
 
-import requests
 import six
-from six.moves.urllib.request import urlretrieve
+
+from icon_font_to_png.cache import DownloadCache
+from icon_font_to_png.lazy import lazy_import
+
+requests = lazy_import('requests')
 
 
 @six.add_metaclass(ABCMeta)
@@ -15,6 +20,15 @@ class IconFontDownloader(object):
     css_path = None
     ttf_path = None
 
+    # Request timeout in seconds
+    timeout = 30
+    chunk_size = 64 * 1024
+
+    # Downloaded files are saved as they're served, and interrupted
+    # downloads resumed at the offset of the saved bytes - which wouldn't
+    # match the file if it was compressed in transfer
+    headers = {'Accept-Encoding': 'identity'}
+
     @property
     def css_url(self):
         """Icon font CSS file URL"""
@@ -25,34 +39,106 @@ class IconFontDownloader(object):
         """Icon font TTF file URL"""
         raise NotImplementedError
 
-    def __init__(self, directory=None):
+    def __init__(self, directory=None, cache_dir=None, session=None):
         """
         :param directory: path to download directory; temporary dir if None
+                          (or cache directory, if caching is enabled)
+        :param cache_dir: path to directory where downloaded files are
+                          cached and revalidated on subsequent downloads;
+                          caching is disabled if None
+        :param session: `requests.Session` instance, reusing connections
+                        between requests; new one is created if None
         """
         self.directory = directory
+        self.cache = DownloadCache(cache_dir) if cache_dir else None
+        self.session = session or requests.Session()
 
-    @staticmethod
-    def _download_file_from_url(url, directory=None):
+    def download_file(self, url, directory=None):
         """
         Download file from given URL and save it in given directory
 
         :param url: URL of file
-        :param directory: path to download directory
+        :param directory: path to download directory; temporary dir if None
+                          (or cache directory, if caching is enabled)
         :return: path to downloaded file
         """
-        # Files are saved in temporary folder if `directory` isn't specified
-        if not directory:
-            return urlretrieve(url)[0]
-        else:
+        if self.cache:
+            path = self._download_to_cache(url)
+            if not directory:
+                return path
+
             # Get the filename from URL
-            css_filename = os.path.join(directory, url.split('/')[-1])
-            return urlretrieve(url, filename=css_filename)[0]
+            filename = os.path.join(directory, url.split('/')[-1])
+            shutil.copyfile(path, filename)
+            return filename
 
-    @staticmethod
-    def _get_latest_tag_from_github(repo_api_url):
+        # Files are saved in temporary folder if `directory` isn't specified
+        filename = os.path.join(directory or tempfile.mkdtemp(),
+                                url.split('/')[-1])
+
+        response = self.session.get(url, headers=self.headers, stream=True,
+                                    timeout=self.timeout)
+        response.raise_for_status()
+        with open(filename, 'wb') as f:
+            for chunk in response.iter_content(self.chunk_size):
+                f.write(chunk)
+
+        return filename
+
+    def _download_to_cache(self, url):
+        """
+        Downloads file from given URL into the cache, unless the cached one
+        is still up to date, resuming interrupted download if possible.
+
+        :param url: URL of file
+        :return: path to cached file
+        """
+        cached = self.cache.get(url)
+        partial = self.cache.get_partial(url)
+
+        headers = dict(self.headers)
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+        if partial:
+            headers['Range'] = 'bytes={start}-'.format(start=partial[0])
+            headers['If-Range'] = partial[1]
+
+        try:
+            response = self.session.get(url, headers=headers, stream=True,
+                                        timeout=self.timeout)
+        except requests.RequestException:
+            # Use cached file when offline
+            if cached:
+                return cached['path']
+            raise
+
+        if response.status_code == 304 and cached:
+            return cached['path']
+        response.raise_for_status()
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        # Only strong validators can be used to resume downloads
+        validator = last_modified
+        if etag and not etag.startswith('W/'):
+            validator = etag
+
+        resumed = response.status_code == 206
+        path = self.cache.start_partial(url, validator)
+        with open(path, 'ab' if resumed else 'wb') as f:
+            for chunk in response.iter_content(self.chunk_size):
+                f.write(chunk)
+
+        return self.cache.set(url, etag, last_modified)
+
+    def _get_latest_tag_from_github(self, repo_api_url):
         """Get latest icon font tag via GitHub API"""
         url = '/'.join([repo_api_url, 'tags'])
-        r = requests.get(url)
+        r = self.session.get(url, timeout=self.timeout)
+        r.raise_for_status()
         latest = r.json()[0]
 
         return latest['name']
@@ -64,16 +150,27 @@ class IconFontDownloader(object):
 
     def download_css(self, directory):
         """Downloads icon font CSS file and returns its path"""
-        return self._download_file_from_url(self.css_url, directory)
+        return self.download_file(self.css_url, directory)
 
     def download_ttf(self, directory):
         """Downloads icon font TTF file and returns its path"""
-        return self._download_file_from_url(self.ttf_url, directory)
+        return self.download_file(self.ttf_url, directory)
 
     def download_files(self):
-        """Download CSS and TTF files"""
-        self.css_path = self.download_css(self.directory)
-        self.ttf_path = self.download_ttf(self.directory)
+        """Download CSS and TTF files (at the same time)"""
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(processes=2)
+        try:
+            css_result = pool.apply_async(self.download_css,
+                                          (self.directory,))
+            ttf_result = pool.apply_async(self.download_ttf,
+                                          (self.directory,))
+            self.css_path = css_result.get()
+            self.ttf_path = ttf_result.get()
+        finally:
+            pool.close()
+            pool.join()
 
 
 class FontAwesomeDownloader(IconFontDownloader):
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import bisect
+import fnmatch
+import re
+
+from six import unichr
+
+# Characters starting a wildcard in glob patterns
+GLOB_CHARS = '*?['
+
+# Characters which aren't literal in regular expressions
+REGEX_SPECIAL_CHARS = '.^$*+?{}[]\\|()'
+
+# Codepoint query, e.g. 'U+F135'
+CODEPOINT_RE = re.compile(r'^[Uu]\+([0-9a-fA-F]{1,6})$')
+
+
+class IconIndex(object):
+    """
+    Icon names of an icon font, sorted, so that icons can be found by
+    prefix, glob pattern (e.g. 'arrow-*') or regular expression (e.g.
+    '/^chevron-/') without going through all of them - only through the
+    names starting with the literal part of the pattern (if it has one).
+    Icons can also be found by their codepoints.
+    """
+    def __init__(self, icons, common_prefix='', keep_prefix=False):
+        """
+        :param icons: dict of icon names and characters
+        :param common_prefix: common icon prefix of the icon font
+        :param keep_prefix: whether icon names include the common prefix
+        """
+        self.names = sorted(icons)
+        self.common_prefix = common_prefix
+        self.keep_prefix = keep_prefix
+
+        self.codepoints = dict()
+        for name in self.names:
+            self.codepoints.setdefault(ord(icons[name]), []).append(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        index = bisect.bisect_left(self.names, name)
+        return index < len(self.names) and self.names[index] == name
+
+    def prefix(self, prefix):
+        """Returns sorted list of icon names starting with given prefix"""
+        if not prefix:
+            return list(self.names)
+
+        start = bisect.bisect_left(self.names, prefix)
+        end = bisect.bisect_left(self.names, _after_prefix(prefix))
+        return self.names[start:end]
+
+    def glob(self, pattern):
+        """
+        Returns sorted list of icon names matching given (case sensitive)
+        glob pattern, e.g. 'arrow-*' or '*-o'.
+        """
+        match = re.compile(fnmatch.translate(pattern)).match
+        return [name for name in self.prefix(_glob_prefix(pattern))
+                if match(name)]
+
+    def regex(self, pattern):
+        """
+        Returns sorted list of icon names in which given regular expression
+        is found (`re.search`), e.g. '^chevron-' or 'circle'.
+
+        :raises ValueError: if the regular expression is invalid
+        """
+        try:
+            search = re.compile(pattern).search
+        except re.error as e:
+            raise ValueError("Invalid regular expression '{pattern}': "
+                             "{error}".format(pattern=pattern, error=e))
+
+        return [name for name in self.prefix(_regex_prefix(pattern))
+                if search(name)]
+
+    def by_codepoint(self, codepoint):
+        """Returns sorted list of names of icons with given codepoint"""
+        return list(self.codepoints.get(codepoint, []))
+
+    def select(self, query):
+        """
+        Returns names of icons matching given query, which is one of:
+
+        - regular expression between slashes, e.g. '/^chevron-/'
+        - glob pattern, e.g. 'arrow-*'
+        - codepoint, e.g. 'U+F135'
+        - icon name
+
+        Glob patterns and icon names can include (or skip) the common icon
+        prefix, regardless of whether icon names include it.
+
+        :returns sorted list of icon names
+        :raises ValueError: if the regular expression is invalid
+        """
+        if len(query) > 1 and query.startswith('/') and query.endswith('/'):
+            return self.regex(query[1:-1])
+
+        match = CODEPOINT_RE.match(query)
+        if match:
+            return self.by_codepoint(int(match.group(1), 16))
+
+        if any(char in query for char in GLOB_CHARS):
+            return self.glob(self.normalize(query))
+
+        name = self.find(query)
+        return [name] if name is not None else []
+
+    def find(self, name):
+        """
+        Returns icon name as used in the index, or None if it's missing.
+        Given name can include (or skip) the common icon prefix.
+        """
+        name = self.normalize(name)
+        return name if name in self else None
+
+    def normalize(self, name):
+        """
+        Adds or removes the common prefix of given icon name (or pattern),
+        to match the icon names in the index.
+        """
+        if not self.common_prefix:
+            return name
+
+        prefixed = name.startswith(self.common_prefix)
+        if self.keep_prefix and not prefixed:
+            return self.common_prefix + name
+        elif not self.keep_prefix and prefixed:
+            return name[len(self.common_prefix):]
+        return name
+
+
+def is_pattern(query):
+    """Returns whether given `IconIndex.select` query can match many icons"""
+    return (
+        (len(query) > 1 and query.startswith('/') and query.endswith('/')) or
+        any(char in query for char in GLOB_CHARS)
+    )
+
+
+def _after_prefix(prefix):
+    """Returns the first string greater than all strings with given prefix"""
+    return prefix[:-1] + unichr(ord(prefix[-1]) + 1)
+
+
+def _glob_prefix(pattern):
+    """Returns the literal part of glob pattern, before any wildcards"""
+    for index, char in enumerate(pattern):
+        if char in GLOB_CHARS:
+            return pattern[:index]
+    return pattern
+
+
+def _regex_prefix(pattern):
+    """
+    Returns literal prefix all strings matching regular expression anchored
+    at the start ('^...') begin with; empty one if there isn't any.
+    """
+    if not pattern.startswith('^') or '|' in pattern:
+        return ''
+
+    prefix = []
+    for char in pattern[1:]:
+        if char in REGEX_SPECIAL_CHARS:
+            # Last character is optional, or can be repeated
+            if char in '*?{' and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+
+    return ''.join(prefix)
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import json
+import os
+import re
+from collections import OrderedDict
+
+import six
+
+from icon_font_to_png.encoder import ImageEncoder
+from icon_font_to_png.index import is_pattern
+from icon_font_to_png.registry import FontRegistry
+
+# Options of icon fonts defined in job files, and their `IconFont` names
+FONT_OPTIONS = OrderedDict([
+    ('css', 'css_file'),
+    ('ttf', 'ttf_file'),
+    ('keep_prefix', 'keep_prefix'),
+    ('css_parser', 'css_parser'),
+    ('rasterizer', 'rasterizer'),
+    ('supersample', 'supersample'),
+])
+
+# Options of jobs, and their default values
+JOB_OPTIONS = OrderedDict([
+    ('font', None),
+    ('icons', None),
+    ('size', 16),
+    ('color', 'black'),
+    ('scale', 'auto'),
+    ('filename', None),
+    ('export_dir', 'exported'),
+    ('format', 'png'),
+    ('compress_level', None),
+    ('png_strategy', None),
+    ('palette', False),
+    ('incremental', False),
+])
+
+
+class Batch(object):
+    """
+    Icons of one icon font exported with the same parameters, merged from
+    one or more jobs (see `schedule`).
+    """
+    def __init__(self, font, sizes, colors, scale, export_dir, encoder,
+                 incremental):
+        self.font = font
+        self.sizes = sizes
+        self.colors = colors
+        self.scale = scale
+        self.export_dir = export_dir
+        self.encoder = encoder
+        self.incremental = incremental
+
+        # Icon names and their output file names (or templates)
+        self.filenames = OrderedDict()
+
+    @property
+    def icons(self):
+        return list(self.filenames)
+
+    def export(self, registry, jobs=1):
+        """
+        Exports all icons of the batch.
+
+        :param registry: `FontRegistry` the batch font is registered in
+        :param jobs: number of worker processes
+        :returns dict of failed icon names and error messages
+        """
+        return registry[self.font].export_icons(
+            self.icons, self.sizes, self.colors, self.scale,
+            filenames=self.filenames, export_dir=self.export_dir, jobs=jobs,
+            incremental=self.incremental, encoder=self.encoder,
+        )
+
+
+def load_jobfile(path, **options):
+    """
+    Reads job file (JSON, or YAML if PyYAML is installed), and loads all
+    icon fonts it uses.
+
+    Job file contains a list of jobs, or a dict with the list under 'jobs'
+    key, and optionally named icon fonts under 'fonts' key (with 'css',
+    'ttf' and other `FONT_OPTIONS`) and default job options under
+    'defaults' key. Job options are described by `JOB_OPTIONS`; icon font
+    is either given by its name ('font') or by its files ('css' and
+    'ttf'). Icons are names, patterns or codepoints (see
+    `IconIndex.select`), or 'ALL'. Relative paths are relative to the job
+    file directory.
+
+    :param path: path to job file
+    :param options: default `IconFont` arguments (see `FontRegistry`)
+    :returns `FontRegistry` instance, list of jobs (dicts of all
+             `JOB_OPTIONS`, with icon names resolved)
+    :raises ValueError: if the job file is invalid
+    """
+    data = _read_file(path)
+    if isinstance(data, list):
+        data = {'jobs': data}
+    if not isinstance(data, dict) or not isinstance(data.get('jobs'), list):
+        raise ValueError("Job file has to contain a list of jobs")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    registry = FontRegistry(**options)
+
+    # Fonts defined by their files are registered under their paths
+    fonts = OrderedDict(data.get('fonts') or {})
+    jobs = []
+    for number, job in enumerate(data['jobs'], 1):
+        if not isinstance(job, dict):
+            raise ValueError("Job {number} isn't a dict".format(
+                number=number)
+            )
+
+        options = dict(data.get('defaults') or {})
+        options.update(job)
+        job = options
+        if 'css' in job or 'ttf' in job:
+            font = dict((name, job.pop(name)) for name in FONT_OPTIONS
+                        if name in job)
+            # Icon font names can't contain ':' (Windows drive letters)
+            job['font'] = '{css}|{ttf}'.format(
+                css=font.get('css'), ttf=font.get('ttf')
+            ).replace(':', '|')
+            fonts.setdefault(job['font'], font)
+
+        unknown = set(job) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError("Unknown option(s) of job {number}: "
+                             "{options}".format(number=number,
+                                                options=', '.join(unknown)))
+        if job.get('font') not in fonts:
+            raise ValueError("Job {number} has no (known) icon font".format(
+                number=number)
+            )
+        if not job.get('icons'):
+            raise ValueError("Job {number} has no icons".format(
+                number=number)
+            )
+
+        options = dict(JOB_OPTIONS)
+        options.update(job)
+        _check_types(options, number)
+        jobs.append(options)
+
+    for name, font in fonts.items():
+        if not isinstance(font, dict) or 'css' not in font or \
+                'ttf' not in font:
+            raise ValueError("Icon font '{name}' needs 'css' and 'ttf' "
+                             "files".format(name=name))
+        supersample = font.get('supersample')
+        if supersample is not None and not _is_positive_int(supersample):
+            raise ValueError("Icon font '{name}': 'supersample' has to be "
+                             "a positive integer".format(name=name))
+
+        kwargs = dict((FONT_OPTIONS[option], value)
+                      for option, value in font.items()
+                      if option in FONT_OPTIONS)
+        kwargs['css_file'] = os.path.join(base_dir, kwargs['css_file'])
+        kwargs['ttf_file'] = os.path.join(base_dir, kwargs['ttf_file'])
+        try:
+            registry.register(name, **kwargs)
+        except (IOError, OSError) as e:
+            raise ValueError("Can't load icon font '{name}': {error}".format(
+                name=name, error=e)
+            )
+
+    for number, job in enumerate(jobs, 1):
+        job['icons'] = _select_icons(registry[job['font']], job['icons'],
+                                     number)
+        job['export_dir'] = os.path.join(base_dir, job['export_dir'])
+
+    return registry, jobs
+
+
+def schedule(registry, jobs):
+    """
+    Merges jobs into batches of icons exported with the same parameters,
+    and orders them by icon font and icon size - so that icon fonts are
+    loaded once, and fonts loaded in each size are reused as much as
+    possible. The same icon files requested by multiple jobs are exported
+    only once.
+
+    :param registry: `FontRegistry` instance
+    :param jobs: list of jobs (see `load_jobfile`)
+    :returns list of `Batch` instances
+    :raises ValueError: if any of the jobs has invalid parameters
+    """
+    batches = OrderedDict()
+    for number, job in enumerate(jobs, 1):
+        sizes = _to_list(job['size'])
+        colors = _to_list(job['color'])
+        try:
+            encoder = ImageEncoder(format=job['format'],
+                                   compress_level=job['compress_level'],
+                                   strategy=job['png_strategy'],
+                                   palette=job['palette'])
+        except ValueError as e:
+            raise ValueError("Job {number}: {error}".format(number=number,
+                                                            error=e))
+
+        filename = job['filename']
+        if filename:
+            _check_filename(filename, job['icons'], sizes, colors, encoder,
+                            number)
+        if filename and not filename.lower().endswith(encoder.extension):
+            filename += encoder.extension
+
+        key = (job['font'], tuple(sizes), tuple(colors), str(job['scale']),
+               job['export_dir'],
+               tuple(sorted(encoder.get_options().items())),
+               job['incremental'])
+        candidates = batches.setdefault(key, [])
+
+        # The same icon exported to different files can't share a batch
+        for icon in job['icons']:
+            for batch in candidates:
+                if batch.filenames.get(icon, filename) == filename:
+                    break
+            else:
+                batch = Batch(job['font'], sizes, colors, job['scale'],
+                              job['export_dir'], encoder, job['incremental'])
+                candidates.append(batch)
+
+            batch.filenames[icon] = filename
+
+    fonts = list(registry)
+    return sorted(
+        (batch for candidates in batches.values() for batch in candidates),
+        key=lambda batch: (fonts.index(batch.font),
+                           registry[batch.font].canvas_size(batch.sizes),
+                           str(batch.scale))
+    )
+
+
+def _check_types(job, number):
+    """Makes sure job options have values of the right types"""
+    for name, is_valid, description in (
+            ('icons', _is_string, "strings"),
+            ('size', _is_positive_int, "positive integers"),
+            ('color', _is_string, "strings")):
+        values = _to_list(job[name])
+        if not values or not all(is_valid(value) for value in values):
+            raise ValueError("Job {number}: '{name}' has to be one or a "
+                             "list of {description}".format(
+                                 number=number, name=name,
+                                 description=description))
+
+    if job['scale'] != 'auto' and not _is_fraction(job['scale']):
+        raise ValueError("Job {number}: 'scale' has to be a number between "
+                         "0 and 1, or 'auto'".format(number=number))
+
+
+def _is_string(value):
+    return isinstance(value, six.string_types)
+
+
+def _is_positive_int(value):
+    return (isinstance(value, six.integer_types) and
+            not isinstance(value, bool) and value > 0)
+
+
+def _is_fraction(value):
+    if isinstance(value, bool):
+        return False
+    try:
+        return 0 < float(value) <= 1
+    except (TypeError, ValueError):
+        return False
+
+
+def _check_filename(filename, icons, sizes, colors, encoder, number):
+    """
+    Makes sure that no two files exported by a job get the same name
+    (ICO files contain all sizes of an icon)
+    """
+    for field, values in (('icon', icons),
+                          ('size', [] if encoder.multiple_sizes else sizes),
+                          ('color', colors)):
+        if len(values) > 1 and not _has_field(filename, field):
+            raise ValueError("Job {number} exports multiple {field}s, so its "
+                             "filename has to contain '{{{field}}}'".format(
+                                 number=number, field=field))
+
+
+def _has_field(template, field):
+    return re.search(r'\{%s[!:}]' % field, template) is not None
+
+
+def _read_file(path):
+    with io.open(path, encoding='utf-8') as f:
+        content = f.read()
+
+    if os.path.splitext(path)[1].lower() in ('.yml', '.yaml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML has to be installed to read YAML job "
+                             "files")
+        try:
+            return yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            raise ValueError("Invalid job file: {error}".format(error=e))
+
+    try:
+        return json.loads(content)
+    except ValueError as e:
+        raise ValueError("Invalid job file: {error}".format(error=e))
+
+
+def _select_icons(icon_font, queries, number):
+    """Returns names of icons matching job icon queries"""
+    if isinstance(queries, six.string_types):
+        queries = [queries]
+    if queries == ['ALL']:
+        return [icon for icon in icon_font.css_icons if icon]
+
+    icons = OrderedDict()
+    for query in queries:
+        selected = icon_font.index.select(query)
+        if not selected:
+            raise ValueError(
+                ("No icons match '{query}' (job {number})" if is_pattern(query)
+                 else "Unknown icon name '{query}' (job {number})").format(
+                    query=query, number=number)
+            )
+        icons.update((icon, None) for icon in selected)
+
+    return list(icons)
+
+
+def _to_list(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
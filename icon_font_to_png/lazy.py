@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import importlib
+import sys
+
+
+class LazyModule(object):
+    """
+    Stands in for a module, which is only imported when one of its
+    attributes is first accessed.
+
+    Keeps heavy dependencies (Pillow, tinycss, requests) out of the import
+    time of the package, so that commands which don't need them (like
+    listing icons) start quicker.
+    """
+    def __init__(self, name):
+        """
+        :param name: absolute module name, e.g. 'PIL.Image'
+        """
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        """Imports the module (only once) and returns it"""
+        if self._module is None:
+            self.__dict__['_module'] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __repr__(self):
+        return '<lazy module {name!r}>'.format(name=self._name)
+
+
+def lazy_import(name):
+    """
+    Returns given module, or a placeholder importing it on first use if it
+    hasn't been imported yet.
+
+    :param name: absolute module name
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
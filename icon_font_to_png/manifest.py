@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import json
+import os
+
+from icon_font_to_png.cache import atomic_write
+
+
+class ExportManifest(object):
+    """
+    Records what each file in an export directory was rendered from,
+    so that up to date files can be skipped when exporting again.
+    """
+    filename = '.icon-font-to-png.json'
+
+    def __init__(self, export_dir):
+        """
+        :param export_dir: path to export directory
+        """
+        self.export_dir = export_dir
+        self.path = os.path.join(export_dir, self.filename)
+
+        try:
+            with open(self.path, 'rb') as f:
+                self.entries = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            self.entries = dict()
+
+    def is_up_to_date(self, filename, fingerprint):
+        """
+        Checks whether exported file exists and was rendered from the same
+        inputs.
+
+        :param filename: name of the exported file
+        :param fingerprint: dict describing rendering inputs
+        """
+        return (self.entries.get(filename) == fingerprint and
+                os.path.isfile(os.path.join(self.export_dir, filename)))
+
+    def set(self, filename, fingerprint):
+        """
+        Records rendering inputs of exported file.
+
+        :param filename: name of the exported file
+        :param fingerprint: dict describing rendering inputs
+        """
+        self.entries[filename] = fingerprint
+
+    def save(self):
+        """Saves the manifest in the export directory"""
+        data = json.dumps(self.entries, indent=1, sort_keys=True)
+        atomic_write(self.path, data.encode('utf-8'))
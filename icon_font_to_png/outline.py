@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import math
+
+from icon_font_to_png.lazy import lazy_import
+
+Image = lazy_import('PIL.Image')
+ImageChops = lazy_import('PIL.ImageChops')
+ImageDraw = lazy_import('PIL.ImageDraw')
+
+
+def contour_segments(contour):
+    """
+    Converts TrueType contour to path segments, adding on curve points
+    implied between consecutive off curve points.
+
+    :param contour: list of (x, y, on curve) points
+    :returns start point, list of segments - ('L', end point) lines and
+             ('Q', control point, end point) quadratic Bezier curves
+    """
+    points = [(x, y) for x, y, _ in contour]
+    on_curve = [on for _, _, on in contour]
+
+    # Start with an on curve point (possibly implied one)
+    if on_curve[0]:
+        start = points[0]
+        rest = list(zip(points[1:], on_curve[1:]))
+    elif on_curve[-1]:
+        start = points[-1]
+        rest = list(zip(points[:-1], on_curve[:-1]))
+    else:
+        start = _midpoint(points[-1], points[0])
+        rest = list(zip(points, on_curve))
+
+    segments = []
+    control = None
+    for point, on in rest + [(start, True)]:
+        if on:
+            if control is None:
+                segments.append(('L', point))
+            else:
+                segments.append(('Q', control, point))
+            control = None
+        elif control is None:
+            control = point
+        else:
+            implied = _midpoint(control, point)
+            segments.append(('Q', control, implied))
+            control = point
+
+    return start, segments
+
+
+def svg_path(contours):
+    """
+    Converts glyph outline to SVG path data (in font units, with the y axis
+    pointing up).
+
+    :param contours: list of contours (see `TTFFile.glyph_contours`)
+    """
+    commands = []
+    for contour in contours:
+        if not contour:
+            continue
+
+        start, segments = contour_segments(contour)
+        commands.append('M{0}'.format(_format_point(start)))
+        for segment in segments:
+            commands.append(segment[0] + ' '.join(
+                _format_point(point) for point in segment[1:]
+            ))
+        commands.append('Z')
+
+    return ''.join(commands)
+
+
+def flatten_contour(contour, transform, tolerance=0.25):
+    """
+    Approximates contour with a polygon.
+
+    :param contour: list of (x, y, on curve) points
+    :param transform: function mapping (x, y) points to pixel coordinates
+    :param tolerance: maximum distance (in pixels) between the curve and
+                      the polygon
+    :returns list of (x, y) tuples
+    """
+    start, segments = contour_segments(contour)
+    current = transform(start)
+    polygon = [current]
+
+    for segment in segments:
+        end = transform(segment[-1])
+        if segment[0] == 'Q':
+            control = transform(segment[1])
+
+            # Curve split into n lines is at most |p0 - 2p1 + p2| / 8n^2
+            # away from them
+            deviation = abs(current[0] - 2 * control[0] + end[0]) + \
+                abs(current[1] - 2 * control[1] + end[1])
+            steps = max(1, int((deviation / (8 * tolerance)) ** 0.5) + 1)
+
+            for i in range(1, steps):
+                t = float(i) / steps
+                u = 1 - t
+                polygon.append((
+                    u * u * current[0] + 2 * u * t * control[0] +
+                    t * t * end[0],
+                    u * u * current[1] + 2 * u * t * control[1] +
+                    t * t * end[1],
+                ))
+
+        polygon.append(end)
+        current = end
+
+    return polygon
+
+
+def rasterize(contours, size, transform, supersample=4):
+    """
+    Draws glyph outline on an alpha mask, using the nonzero winding rule
+    (as TrueType rasterizers do). Edges are antialiased by drawing the
+    outline in higher resolution and scaling it down.
+
+    :param contours: list of contours (see `TTFFile.glyph_contours`)
+    :param size: mask size in pixels
+    :param transform: function mapping font units (x, y) points to pixel
+                      coordinates
+    :param supersample: how many times bigger the outline is drawn
+    :returns "L" mode image
+    """
+    big_size = size * supersample
+
+    def big_transform(point):
+        x, y = transform(point)
+        return x * supersample, y * supersample
+
+    polygons = [
+        flatten_contour(contour, big_transform, tolerance=0.25 * supersample)
+        for contour in contours if len(contour) > 1
+    ]
+    polygons = [(_signed_area(polygon), polygon) for polygon in polygons]
+
+    # Each contour adds (or subtracts, depending on its direction) one to
+    # the winding number of pixels inside it; 128 means zero. The biggest
+    # contour is drawn directly, and only the parts of the image covered by
+    # the others are updated.
+    polygons.sort(key=lambda t: -abs(t[0]))
+    winding = Image.new("L", (big_size, big_size), 128)
+
+    for i, (area, polygon) in enumerate(polygons):
+        clockwise = area > 0
+
+        if i == 0:
+            ImageDraw.Draw(winding).polygon(polygon,
+                                            fill=129 if clockwise else 127)
+            continue
+
+        box = _bounding_box(polygon, big_size)
+        if box is None:
+            continue
+
+        left, upper = box[:2]
+        contour_mask = Image.new("L", (box[2] - left, box[3] - upper), 0)
+        ImageDraw.Draw(contour_mask).polygon(
+            [(x - left, y - upper) for x, y in polygon], fill=1
+        )
+
+        region = winding.crop(box)
+        if clockwise:
+            region = ImageChops.add(region, contour_mask)
+        else:
+            region = ImageChops.subtract(region, contour_mask)
+        winding.paste(region, box)
+
+    mask = winding.point([0 if value == 128 else 255
+                          for value in range(256)])
+
+    if supersample > 1:
+        mask = mask.resize((size, size), Image.BOX)
+
+    return mask
+
+
+def _bounding_box(polygon, size):
+    """
+    Returns (left, upper, right, lower) box of pixels polygon can cover,
+    within a `size` x `size` image, or None if it's outside of it
+    """
+    left = max(0, int(math.floor(min(x for x, _ in polygon))))
+    upper = max(0, int(math.floor(min(y for _, y in polygon))))
+    right = min(size, int(math.ceil(max(x for x, _ in polygon))) + 1)
+    lower = min(size, int(math.ceil(max(y for _, y in polygon))) + 1)
+
+    if left >= right or upper >= lower:
+        return None
+    return left, upper, right, lower
+
+
+def _midpoint(a, b):
+    return (a[0] + b[0]) / 2.0, (a[1] + b[1]) / 2.0
+
+
+def _signed_area(polygon):
+    """Returns polygon area, positive if it's clockwise on the screen"""
+    area = 0
+    for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+        area += x1 * y2 - x2 * y1
+    return area / 2.0
+
+
+def _format_point(point):
+    return '{0} {1}'.format(_format_number(point[0]),
+                            _format_number(point[1]))
+
+
+def _format_number(value):
+    """Formats coordinate with at most two decimal places"""
+    if value == int(value):
+        return '{0:d}'.format(int(value))
+    return '{0:.2f}'.format(value).rstrip('0').rstrip('.')
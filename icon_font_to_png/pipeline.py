@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+from collections import OrderedDict
+
+from six.moves import queue
+
+from icon_font_to_png.cache import make_dirs
+from icon_font_to_png.encoder import ImageEncoder
+
+# Put in a queue after the last item
+_DONE = object()
+
+
+class ExportPipeline(object):
+    """
+    Exports icons in three stages running at the same time - rendering,
+    encoding and writing files - connected by bounded queues, so that
+    neither CPU nor disk sit idle while the other one is busy.
+
+    Each stage runs in its own threads (Pillow releases the GIL while
+    rasterizing, resizing and compressing images), files are written by
+    separate threads, so that slow (e.g. network) file systems don't hold
+    up rendering. At most `max_in_flight` rendered and `max_in_flight`
+    encoded files wait in the queues, which keeps memory use bounded
+    regardless of the number and size of exported icons.
+
+    As FreeType fonts can't be used by multiple threads at the same time,
+    each render thread uses its own copy of the icon font (sharing loaded
+    icons and font data).
+    """
+    def __init__(self, icon_font, render_workers=1, encode_workers=2,
+                 write_workers=4, max_in_flight=16):
+        """
+        :param icon_font: `IconFont` instance
+        :param render_workers: number of icons rendered at the same time
+        :param encode_workers: number of files encoded at the same time
+        :param write_workers: number of files written at the same time
+        :param max_in_flight: maximum number of rendered (and of encoded)
+                              files waiting for the next stage
+        """
+        for name, value in (('render_workers', render_workers),
+                            ('encode_workers', encode_workers),
+                            ('write_workers', write_workers),
+                            ('max_in_flight', max_in_flight)):
+            if value < 1:
+                raise ValueError("{name} has to be a positive number".format(
+                    name=name)
+                )
+
+        self.icon_font = icon_font
+        self.render_workers = render_workers
+        self.encode_workers = encode_workers
+        self.write_workers = write_workers
+        self.max_in_flight = max_in_flight
+
+    def export_icons(self, icons, size, color='black', scale='auto',
+                     filenames=None, export_dir='exported',
+                     incremental=False, encoder=None, outdated=None):
+        """
+        Exports multiple icons (see `IconFont.export_icons`).
+
+        :param icons: list of valid icon names
+        :param size: icon size in pixels, or list of sizes
+        :param color: color name or hex value, or list of colors
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :param filenames: dict of icon names and output file names
+                          (or templates, see `IconFont.export_icon`);
+                          icon name is used if it's missing
+        :param export_dir: path to export directory
+        :param incremental: whether to skip icons exported before
+        :param encoder: `ImageEncoder` instance; default PNG if None
+        :param outdated: in incremental mode, icons already known to be
+                         outdated, so that they aren't checked again;
+                         checked if None
+        :returns dict of failed icon names and error messages
+        """
+        encoder = encoder or ImageEncoder()
+        filenames = filenames or {}
+
+        if incremental and outdated is None:
+            icons = self.icon_font.outdated_icons(
+                icons, size, color, scale, filenames, export_dir, encoder
+            )
+        elif incremental:
+            outdated = set(outdated)
+            icons = [icon for icon in icons if icon in outdated]
+
+        # Created before render threads start creating it all at once
+        make_dirs(export_dir)
+
+        errors = dict()
+        lock = threading.Lock()
+        remaining = iter(icons)
+        encode_queue = queue.Queue(maxsize=self.max_in_flight)
+        write_queue = queue.Queue(maxsize=self.max_in_flight)
+
+        def fail(icon, e):
+            with lock:
+                errors.setdefault(icon, _error_message(e))
+
+        def next_icon():
+            with lock:
+                return next(remaining, _DONE)
+
+        def render_worker(icon_font):
+            while True:
+                icon = next_icon()
+                if icon is _DONE:
+                    return
+
+                try:
+                    missing = icon_font.missing_files(
+                        icon, size, color, scale, filenames.get(icon),
+                        export_dir, encoder
+                    )
+                    for entry, content in icon_font.render_files(
+                            icon, missing, scale, encoder):
+                        encode_queue.put((icon, entry, content))
+                except Exception as e:
+                    fail(icon, e)
+
+        def encode_worker():
+            while True:
+                item = encode_queue.get()
+                if item is _DONE:
+                    return
+
+                icon, entry, content = item
+                try:
+                    data = self.icon_font.encode_file(entry, content,
+                                                      encoder)
+                except Exception as e:
+                    fail(icon, e)
+                    continue
+
+                write_queue.put((icon, entry, data))
+
+        def write_worker():
+            while True:
+                item = write_queue.get()
+                if item is _DONE:
+                    return
+
+                icon, entry, data = item
+                try:
+                    self.icon_font.save_file(
+                        entry, lambda path: _write_bytes(path, data)
+                    )
+                except Exception as e:
+                    fail(icon, e)
+
+        icon_fonts = [self.icon_font] + [
+            self.icon_font.copy() for _ in range(self.render_workers - 1)
+        ]
+        stages = [
+            ([_start(render_worker, icon_font) for icon_font in icon_fonts],
+             encode_queue, self.encode_workers),
+            ([_start(encode_worker) for _ in range(self.encode_workers)],
+             write_queue, self.write_workers),
+            ([_start(write_worker) for _ in range(self.write_workers)],
+             None, 0),
+        ]
+
+        # Following stage is done once it gets all the items
+        for threads, next_queue, consumers in stages:
+            for thread in threads:
+                thread.join()
+            for _ in range(consumers):
+                next_queue.put(_DONE)
+
+        failed = OrderedDict(
+            (icon, errors[icon]) for icon in icons if icon in errors
+        )
+
+        if incremental and icons:
+            self.icon_font.record_exports(
+                [icon for icon in icons if icon not in failed], size, color,
+                scale, filenames, export_dir, encoder
+            )
+
+        return failed
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _error_message(e):
+    return '{name}: {error}'.format(name=type(e).__name__, error=e)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import os
+from collections import OrderedDict
+
+from icon_font_to_png.icon_font import IconFont
+from icon_font_to_png.ttf import TTFFile
+
+
+class FontRegistry(object):
+    """
+    Icon fonts of a long running process, available by name, with icons
+    referenced as 'font:icon'.
+
+    Each TTF file is parsed only once, and its metrics and glyph outlines
+    (see `TTFFile`) are shared by all icon fonts using it. Once everything
+    is loaded (see `preload`), worker processes forked afterwards share the
+    loaded icons and metrics with the parent process, instead of each of
+    them loading its own copies. FreeType fonts open the TTF file by its
+    path, so their file data is shared through the page cache.
+    """
+    separator = ':'
+
+    def __init__(self, **options):
+        """
+        :param options: default `IconFont` arguments of registered icon
+                        fonts, e.g. `keep_prefix` or `cache_dir`
+        """
+        self.options = options
+        self._fonts = OrderedDict()
+        self._ttf_files = dict()
+
+    def __getitem__(self, name):
+        return self._fonts[name]
+
+    def __contains__(self, name):
+        return name in self._fonts
+
+    def __iter__(self):
+        return iter(self._fonts)
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def register(self, name, css_file, ttf_file, **options):
+        """
+        Adds icon font, reading its TTF file unless it was read before.
+
+        :param name: icon font name, used in icon references
+        :param css_file: path to icon font CSS file
+        :param ttf_file: path to icon font TTF file
+        :param options: `IconFont` arguments, overriding the default ones
+        :returns `IconFont` instance
+        """
+        if not name or self.separator in name:
+            raise ValueError("Invalid icon font name '{name}'".format(
+                name=name)
+            )
+
+        if name in self._fonts:
+            raise ValueError("Icon font '{name}' is already registered"
+                             .format(name=name))
+
+        key = os.path.realpath(ttf_file)
+        ttf = self._ttf_files.get(key)
+        if ttf is None:
+            ttf = TTFFile(ttf_file)
+            self._ttf_files[key] = ttf
+
+        kwargs = dict(self.options)
+        kwargs.update(options)
+        icon_font = IconFont(css_file=css_file, ttf_file=ttf_file, ttf=ttf,
+                             **kwargs)
+        self._fonts[name] = icon_font
+
+        return icon_font
+
+    def preload(self):
+        """
+        Loads icons of all registered icon fonts, which otherwise happens
+        when they're first used; should be called before forking worker
+        processes.
+        """
+        for icon_font in self._fonts.values():
+            icon_font.css_icons
+
+    def resolve(self, reference):
+        """
+        Finds icon referenced as 'font:icon'. If font name is skipped, icon
+        fonts are searched in the order they were registered. Icon name can
+        include the common prefix of the icon font, e.g. 'fa:fa-rocket'.
+
+        :param reference: icon reference
+        :returns `IconFont` instance, icon name
+        :raises KeyError: if icon font or icon doesn't exist
+        """
+        name, separator, icon = reference.partition(self.separator)
+        if separator:
+            icon_fonts = [self[name]]
+        else:
+            icon = name
+            icon_fonts = self._fonts.values()
+
+        for icon_font in icon_fonts:
+            found = icon_font.index.find(icon)
+            if found is not None:
+                return icon_font, found
+
+        raise KeyError(reference)
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals, print_function
+
+import argparse
+import io
+import re
+import threading
+
+from six.moves import BaseHTTPServer, queue
+from six.moves.urllib.parse import parse_qs, unquote, urlparse
+
+from icon_font_to_png.cache import LRUCache, RenderCache
+from icon_font_to_png.icon_font import CSS_PARSERS
+from icon_font_to_png.lazy import lazy_import
+from icon_font_to_png.registry import FontRegistry
+
+ImageColor = lazy_import('PIL.ImageColor')
+
+
+class IconRenderer(object):
+    """
+    Renders icons of multiple icon fonts as PNG images, keeping rendered
+    images in memory.
+
+    Icon fonts are loaded once; as FreeType fonts can't be used by multiple
+    threads at the same time, each thread renders with its own copy of the
+    icon font (sharing loaded icons and font data), so it should be used
+    by a bounded number of threads (see `IconServer`). Entity tags are
+    derived from the icon parameters, so they're known without rendering.
+    """
+    max_size = 2048
+
+    def __init__(self, fonts, cache_size=1024):
+        """
+        :param fonts: `FontRegistry` instance, or dict of font names and
+                      `IconFont` instances
+        :param cache_size: how many rendered images to keep in memory
+        """
+        self.fonts = fonts
+        self.cache = LRUCache(maxsize=cache_size)
+        self._local = threading.local()
+
+    def _thread_font(self, font):
+        """Returns current thread's copy of given icon font"""
+        fonts = self._local.__dict__.setdefault('fonts', dict())
+        if font not in fonts:
+            fonts[font] = self.fonts[font].copy()
+        return fonts[font]
+
+    def etag(self, font, icon, size=16, color='black', scale='auto'):
+        """
+        Returns entity tag of given icon's PNG image, without rendering it.
+
+        :param font: icon font name
+        :param icon: valid icon name
+        :param size: icon size in pixels
+        :param color: color name or hex value
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :returns entity tag
+        :raises KeyError: if icon font or icon doesn't exist
+        :raises ValueError: if any of the parameters is invalid
+        """
+        icon_font = self.fonts[font]
+        if icon not in icon_font.css_icons:
+            raise KeyError(icon)
+
+        if not 0 < size <= self.max_size:
+            raise ValueError("Size has to be between 1 and {max}".format(
+                max=self.max_size)
+            )
+
+        if scale != 'auto' and not 0 < float(scale) <= 1:
+            raise ValueError("Scale has to be between 0 and 1, or 'auto'")
+
+        ImageColor.getrgb(color)
+
+        return '"{key}"'.format(key=RenderCache.key(
+            icon_font.fingerprint(icon, size, color, scale)
+        ))
+
+    def cached(self, etag):
+        """Returns cached PNG image with given entity tag, or None"""
+        return self.cache.get(etag)
+
+    def render(self, font, icon, size=16, color='black', scale='auto'):
+        """
+        Returns PNG image of given icon, and its entity tag.
+
+        :param font: icon font name
+        :param icon: valid icon name
+        :param size: icon size in pixels
+        :param color: color name or hex value
+        :param scale: scaling factor between 0 and 1,
+                      or 'auto' for automatic scaling
+        :returns PNG image bytes, entity tag
+        :raises KeyError: if icon font or icon doesn't exist
+        :raises ValueError: if any of the parameters is invalid
+        """
+        etag = self.etag(font, icon, size=size, color=color, scale=scale)
+        png = self.cached(etag)
+        if png is None:
+            png = self._thread_font(font).render_icon(
+                icon, size, color=color, scale=scale, fp=io.BytesIO()
+            ).getvalue()
+            self.cache.set(etag, png)
+
+        return png, etag
+
+
+class IconRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Handles `GET /<font>/<icon>[.png]?size=&color=&scale=` requests (and
+    `HEAD` ones, which don't render icons that aren't cached)
+    """
+    path_re = re.compile(r'^/([^/]+)/([^/]+?)(?:\.png)?$')
+    hex_color_re = re.compile(r'^[0-9a-fA-F]{3,8}$')
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def _respond(self, head):
+        url = urlparse(self.path)
+        match = self.path_re.match(url.path)
+        if not match:
+            return self.send_error(404)
+
+        font, icon = [unquote(value) for value in match.groups()]
+        query = dict(
+            (name, values[-1]) for name, values in parse_qs(url.query).items()
+        )
+
+        # Allow skipping '#' (which has to be escaped) in hex colors
+        color = query.get('color', 'black')
+        if self.hex_color_re.match(color):
+            color = '#' + color
+
+        renderer = self.server.renderer
+        try:
+            params = dict(size=int(query.get('size', 16)), color=color,
+                          scale=query.get('scale', 'auto'))
+            etag = renderer.etag(font, icon, **params)
+
+            # Icons are only rendered when their content is sent
+            not_modified = etag in self.headers.get('If-None-Match', '')
+            if not_modified:
+                png = None
+            elif head:
+                png = renderer.cached(etag)
+            else:
+                png = renderer.render(font, icon, **params)[0]
+        except KeyError:
+            return self.send_error(404)
+        except ValueError as e:
+            return self.send_error(400, str(e))
+
+        if not_modified:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        if png is not None:
+            self.send_header('Content-Length', str(len(png)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        if not head:
+            self.wfile.write(png)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, format,
+                                                              *args)
+
+
+class IconServer(BaseHTTPServer.HTTPServer):
+    """
+    HTTP server rendering icons, handling requests in a fixed pool of
+    worker threads (each rendering with its own icon fonts). Once all of
+    them are busy, up to `backlog` accepted requests wait in a queue, and
+    further ones aren't accepted until there's room.
+    """
+    def __init__(self, renderer, address=('127.0.0.1', 8000), quiet=False,
+                 workers=4, backlog=64):
+        """
+        :param renderer: `IconRenderer` instance
+        :param address: (host, port) tuple
+        :param quiet: whether to skip logging requests
+        :param workers: number of requests handled at the same time
+        :param backlog: maximum number of accepted requests waiting for
+                        a worker
+        """
+        if workers < 1 or backlog < 1:
+            raise ValueError("Number of workers and backlog have to be "
+                             "positive numbers")
+
+        BaseHTTPServer.HTTPServer.__init__(self, address, IconRequestHandler)
+        self.renderer = renderer
+        self.quiet = quiet
+
+        self._requests = queue.Queue(maxsize=backlog)
+        self._workers = []
+        for _ in range(workers):
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+            self._workers.append(thread)
+
+    def process_request(self, request, client_address):
+        """Hands accepted request over to the worker threads"""
+        self._requests.put((request, client_address))
+
+    def _work(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def server_close(self):
+        """Closes the socket, and stops worker threads once they're done"""
+        BaseHTTPServer.HTTPServer.server_close(self)
+        for _ in self._workers:
+            self._requests.put(None)
+        for thread in self._workers:
+            thread.join()
+
+
+def run(arguments):
+    """Main function for `icon-font-to-png serve` command line usage"""
+    parser = argparse.ArgumentParser(
+        prog='icon-font-to-png serve',
+        description="Serves font icons as PNG images over HTTP, "
+                    "at /<font>/<icon>.png?size=&color=&scale= URLs."
+    )
+    parser.add_argument(
+        '--font',
+        nargs=3,
+        metavar=('NAME', 'CSS-FILE', 'TTF-FILE'),
+        action='append',
+        required=True,
+        help="icon font name (used in URLs) and paths to its CSS and TTF "
+             "files; can be repeated"
+    )
+    parser.add_argument(
+        '--host',
+        type=str,
+        default='127.0.0.1',
+        help="address to listen on (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8000,
+        help="port to listen on (default: 8000)"
+    )
+    parser.add_argument(
+        '--cache_size',
+        type=int,
+        default=1024,
+        help="how many rendered images to keep in memory (default: 1024)"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help="number of requests handled at the same time (default: 4)"
+    )
+    parser.add_argument(
+        '--keep_prefix',
+        default=False,
+        action='store_true',
+        help="do not remove common icon prefix "
+             "(i.e. 'fa-arrow-right' instead of 'arrow-right')"
+    )
+    parser.add_argument(
+        '--css_parser',
+        choices=CSS_PARSERS,
+        default='tinycss',
+        help="CSS parser (default: tinycss)"
+    )
+    args = parser.parse_args(arguments)
+
+    fonts = FontRegistry(keep_prefix=args.keep_prefix,
+                         css_parser=args.css_parser)
+    for name, css_file, ttf_file in args.font:
+        try:
+            fonts.register(name, css_file, ttf_file)
+        except ValueError as e:
+            parser.error(str(e))
+    fonts.preload()
+
+    if args.workers < 1:
+        parser.error("--workers has to be a positive number")
+
+    renderer = IconRenderer(fonts, cache_size=args.cache_size)
+    server = IconServer(renderer, address=(args.host, args.port),
+                        workers=args.workers)
+
+    print("Serving icons at http://{host}:{port}/".format(
+        host=args.host, port=server.server_address[1])
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import timeit
+from collections import OrderedDict
+
+
+class ExportStats(object):
+    """
+    Collects time spent in each stage of exporting icons (loading fonts,
+    fitting the glyph, drawing masks, resizing, saving images, ...) and
+    counters like auto-scale iterations or cache hits.
+
+    Stage times are exclusive - time spent in a stage started inside
+    another one is only counted in the inner stage, so that all stages add
+    up to the total time spent in them.
+    """
+    def __init__(self):
+        # Stage name -> [calls, seconds]
+        self.timings = OrderedDict()
+        self.counters = OrderedDict()
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stage(self, name):
+        """
+        Returns context manager measuring time spent in given stage.
+
+        :param name: stage name
+        """
+        return _Stage(self, name)
+
+    def add_time(self, name, seconds, calls=1):
+        """Adds time spent in given stage"""
+        with self._lock:
+            timing = self.timings.setdefault(name, [0, 0.0])
+            timing[0] += calls
+            timing[1] += seconds
+
+    def increment(self, name, value=1):
+        """Increases given counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other):
+        """
+        Adds stats collected elsewhere (e.g. in another process).
+
+        :param other: `ExportStats` instance or dict (see `to_dict`)
+        """
+        if isinstance(other, ExportStats):
+            other = other.to_dict()
+
+        for name, (calls, seconds) in other['timings'].items():
+            self.add_time(name, seconds, calls)
+        for name, value in other['counters'].items():
+            self.increment(name, value)
+
+    def to_dict(self):
+        """Returns collected stats as a (picklable, JSON serializable) dict"""
+        with self._lock:
+            return {
+                'timings': OrderedDict(
+                    (name, list(timing))
+                    for name, timing in self.timings.items()
+                ),
+                'counters': OrderedDict(self.counters),
+            }
+
+    def clear(self):
+        """Removes all collected stats"""
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+
+    @property
+    def total_time(self):
+        """Time spent in all stages, in seconds"""
+        return sum(seconds for _, seconds in self.timings.values())
+
+    def report(self):
+        """Returns collected stats as human readable text"""
+        total = self.total_time
+        lines = ["{stage:<16} {calls:>8} {time:>10} {percent:>6}".format(
+            stage="Stage", calls="Calls", time="Time", percent="%")]
+
+        for name, (calls, seconds) in sorted(self.timings.items(),
+                                             key=lambda t: -t[1][1]):
+            lines.append(
+                "{stage:<16} {calls:>8} {time:>8.1f}ms {percent:>5.1f}%"
+                .format(stage=name, calls=calls, time=seconds * 1000,
+                        percent=100.0 * seconds / total if total else 0)
+            )
+        lines.append("{stage:<16} {calls:>8} {time:>8.1f}ms".format(
+            stage="Total", calls='', time=total * 1000))
+
+        if self.counters:
+            lines.append('')
+            for name, value in self.counters.items():
+                lines.append("{name:<25} {value:>8}".format(name=name,
+                                                            value=value))
+
+        return '\n'.join(lines)
+
+
+class _Stage(object):
+    """Context manager measuring (exclusive) time of `ExportStats` stage"""
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.start = None
+        self.nested = 0.0
+
+    def __enter__(self):
+        stack = self.stats._local.__dict__.setdefault('stack', [])
+        stack.append(self)
+        self.start = timeit.default_timer()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = timeit.default_timer() - self.start
+        stack = self.stats._local.stack
+        stack.pop()
+
+        # Outer stage doesn't count the time spent in this one
+        if stack:
+            stack[-1].nested += elapsed
+
+        self.stats.add_time(self.name, elapsed - self.nested)
+
+
+class _NullStage(object):
+    """Context manager doing nothing, used when stats aren't collected"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+NULL_STAGE = _NullStage()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import zipfile
+
+import pytest
+
+from icon_font_to_png.archive import ArchiveWriter, guess_format
+
+
+# Fixtures
+@pytest.fixture
+def tmp_dir(request):
+    """Create a temporary directory for archives"""
+    path = tempfile.mkdtemp()
+    request.addfinalizer(lambda: shutil.rmtree(path))
+    return path
+
+
+class UnseekableFile(io.RawIOBase):
+    """Write-only file object, like a pipe"""
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+# Tests
+def test_guess_format():
+    """Test guessing archive format from its path"""
+    assert guess_format('icons.zip') == 'zip'
+    assert guess_format('icons.TAR') == 'tar'
+    assert guess_format('icons.tar.gz') == 'tar.gz'
+    assert guess_format('icons.tgz') == 'tar.gz'
+    assert guess_format('-') == 'tar'
+    assert guess_format(io.BytesIO()) == 'tar'
+    assert guess_format('icons.rar') is None
+
+
+@pytest.mark.parametrize("name,open_archive", [
+    ('icons.zip', lambda path: zipfile.ZipFile(path).namelist()),
+    ('icons.tar', lambda path: tarfile.open(path).getnames()),
+    ('icons.tar.gz', lambda path: tarfile.open(path, 'r:gz').getnames()),
+])
+def test_archive_writer(tmp_dir, name, open_archive):
+    """Test writing archives"""
+    path = os.path.join(tmp_dir, name)
+    with ArchiveWriter(path) as archive:
+        archive.write('rocket.png', b'png')
+        archive.write(os.path.join('icons', 'star.svg'), b'<svg/>',
+                      compress=True)
+
+    assert open_archive(path) == ['rocket.png', 'icons/star.svg']
+
+
+def test_archive_writer_errors(tmp_dir):
+    """Test archive format errors"""
+    with pytest.raises(ValueError):
+        ArchiveWriter(os.path.join(tmp_dir, 'icons.rar'))
+    with pytest.raises(ValueError):
+        ArchiveWriter(os.path.join(tmp_dir, 'icons.zip'), format='rar')
+    assert not os.listdir(tmp_dir)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5),
+                    reason="Unseekable zip archives require Python 3.5+")
+def test_unseekable_file():
+    """Test streaming archives into unseekable files"""
+    for format in ('zip', 'tar'):
+        fp = UnseekableFile()
+        with ArchiveWriter(fp, format=format, mtime=0) as archive:
+            archive.write('rocket.png', b'png')
+        assert not fp.closed
+
+        fp.buffer.seek(0)
+        if format == 'zip':
+            with zipfile.ZipFile(fp.buffer) as zf:
+                assert zf.read('rocket.png') == b'png'
+        else:
+            with tarfile.open(fileobj=fp.buffer) as tf:
+                assert tf.extractfile('rocket.png').read() == b'png'
+                assert tf.getmember('rocket.png').mtime == 0
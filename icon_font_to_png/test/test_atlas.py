@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+from PIL import Image, ImageChops
+
+from icon_font_to_png.atlas import Atlas, css_class_name
+
+
+# Tests
+def test_pack():
+    """Test packing images without overlaps"""
+    atlas = Atlas(max_size=64, padding=1)
+    for i in range(20):
+        size = (16, 32)[i % 2]
+        atlas.add('icon-{i}'.format(i=i), Image.new("RGBA", (size, size)))
+
+    sheets = atlas.pack()
+    assert len(sheets) > 1
+    assert sum(len(sheet['sprites']) for sheet in sheets) == 20
+
+    for sheet in sheets:
+        assert sheet['width'] <= 64
+        assert sheet['height'] <= 64
+
+        sprites = list(sheet['sprites'].values())
+        for i, (x1, y1, w1, h1) in enumerate(sprites):
+            for x2, y2, w2, h2 in sprites[i + 1:]:
+                assert (x1 + w1 <= x2 or x2 + w2 <= x1 or
+                        y1 + h1 <= y2 or y2 + h2 <= y1)
+
+
+def test_too_big_image():
+    """Test adding image bigger than the atlas"""
+    atlas = Atlas(max_size=64)
+    with pytest.raises(ValueError):
+        atlas.add('foo', Image.new("RGBA", (65, 16)))
+
+
+def test_save():
+    """Test saving sprite sheet, JSON and CSS files"""
+    export_dir = tempfile.mkdtemp()
+    red = Image.new("RGBA", (16, 16), 'red')
+    blue = Image.new("RGBA", (32, 32), 'blue')
+
+    atlas = Atlas()
+    atlas.add('red', red)
+    atlas.add('blue', blue)
+    atlas.save('icons', export_dir=export_dir)
+
+    with io.open(os.path.join(export_dir, 'icons.json')) as f:
+        manifest = json.load(f)
+    assert list(manifest.keys()) == ['red', 'blue']
+
+    sheet = Image.open(os.path.join(export_dir, 'icons.png'))
+    for name, image in (('red', red), ('blue', blue)):
+        values = manifest[name]
+        assert values['sheet'] == 'icons.png'
+
+        sprite = sheet.crop((values['x'], values['y'],
+                             values['x'] + values['width'],
+                             values['y'] + values['height']))
+        assert ImageChops.difference(sprite, image).getbbox() is None
+
+    with io.open(os.path.join(export_dir, 'icons.css')) as f:
+        assert '.red {' in f.read()
+
+    shutil.rmtree(export_dir)
+
+
+def test_css_class_name():
+    """Test converting sprite names to CSS class names"""
+    assert css_class_name('arrow-right') == 'arrow-right'
+    assert css_class_name('arrow-16-#fff') == 'arrow-16--fff'
+    assert css_class_name('500px') == '_500px'
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from icon_font_to_png.cache import (
+    DownloadCache, IconMapCache, LRUCache, RenderCache, atomic_write,
+    make_dirs, user_cache_dir
+)
+
+
+# Tests
+def test_lru_cache():
+    """Test storing values and hit / miss counters"""
+    cache = LRUCache(maxsize=2)
+
+    assert cache.get('foo') is None
+    assert cache.misses == 1
+
+    cache.set('foo', 1)
+    assert cache.get('foo') == 1
+    assert cache.hits == 1
+    assert 'foo' in cache
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+def test_lru_cache_eviction():
+    """Test evicting least recently used values"""
+    cache = LRUCache(maxsize=2)
+    cache.set('foo', 1)
+    cache.set('bar', 2)
+
+    # Mark 'foo' as recently used
+    cache.get('foo')
+    cache.set('baz', 3)
+
+    assert 'foo' in cache
+    assert 'bar' not in cache
+    assert 'baz' in cache
+
+
+def test_lru_cache_size():
+    """Test invalid cache size"""
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_icon_map_cache():
+    """Test caching icons parsed from CSS files"""
+    cache_dir = tempfile.mkdtemp()
+    css_file = os.path.join(cache_dir, 'test.css')
+    atomic_write(css_file, b'.foo-bar:before { content: "\\f001"; }')
+
+    cache = IconMapCache(cache_dir)
+    assert cache.get(css_file) is None
+
+    cache.set(css_file, {'foo-bar': '\uf001'}, 'foo-')
+    assert cache.get(css_file) == ({'foo-bar': '\uf001'}, 'foo-')
+
+    # Icons found by another parser aren't reused
+    assert cache.get(css_file, 'fast') is None
+    cache.set(css_file, {'foo-bar': '\uf001', 'foo-baz': '\uf002'}, 'foo-',
+              'fast')
+    assert cache.get(css_file) == ({'foo-bar': '\uf001'}, 'foo-')
+
+    # Changed file invalidates the cache
+    atomic_write(css_file, b'.foo-bar:before { content: "\\f002"; }')
+    assert cache.get(css_file) is None
+
+    # Explicit invalidation
+    cache.set(css_file, {'foo-bar': '\uf002'}, 'foo-')
+    cache.set(css_file, {'foo-bar': '\uf002'}, 'foo-', 'fast')
+    cache.invalidate(css_file)
+    assert cache.get(css_file) is None
+    assert cache.get(css_file, 'fast') is None
+
+    cache.set(css_file, {'foo-bar': '\uf002'}, 'foo-')
+    cache.invalidate()
+    assert cache.get(css_file) is None
+
+    shutil.rmtree(cache_dir)
+
+
+def test_render_cache():
+    """Test caching rendered images"""
+    cache_dir = tempfile.mkdtemp()
+    image_file = os.path.join(cache_dir, 'image.png')
+    copied_file = os.path.join(cache_dir, 'copied.png')
+    atomic_write(image_file, b'foo')
+
+    cache = RenderCache(os.path.join(cache_dir, 'cache'))
+    key = cache.key({'size': 16})
+    assert key == cache.key({'size': 16})
+    assert key != cache.key({'size': 32})
+
+    assert not cache.get(key, copied_file)
+    assert cache.misses == 1
+
+    cache.set(key, image_file)
+    assert cache.get(key, copied_file)
+    assert cache.hits == 1
+    with open(copied_file, 'rb') as f:
+        assert f.read() == b'foo'
+
+    # Editing exported file in place doesn't change the cached image
+    with open(copied_file, 'r+b') as f:
+        f.write(b'bar')
+    other_file = os.path.join(cache_dir, 'other.png')
+    assert cache.get(key, other_file)
+    with open(other_file, 'rb') as f:
+        assert f.read() == b'foo'
+
+    shutil.rmtree(cache_dir)
+
+
+def test_render_cache_eviction():
+    """Test removing least recently used images"""
+    cache_dir = tempfile.mkdtemp()
+    image_file = os.path.join(cache_dir, 'image.png')
+    atomic_write(image_file, b'0123456789')
+
+    cache = RenderCache(os.path.join(cache_dir, 'cache'), max_size=35)
+    keys = [cache.key({'size': size}) for size in range(4)]
+    for i, key in enumerate(keys[:3]):
+        cache.set(key, image_file)
+        # Make sure modification times differ
+        os.utime(cache._path(key, image_file), (i, i))
+
+    # Mark first image as recently used
+    assert cache.get(keys[0], os.path.join(cache_dir, 'copied.png'))
+
+    cache.set(keys[3], image_file)
+    assert os.path.isfile(cache._path(keys[0], image_file))
+    assert not os.path.isfile(cache._path(keys[1], image_file))
+    assert os.path.isfile(cache._path(keys[2], image_file))
+    assert os.path.isfile(cache._path(keys[3], image_file))
+
+    shutil.rmtree(cache_dir)
+
+
+def test_download_cache():
+    """Test caching downloaded files"""
+    cache_dir = tempfile.mkdtemp()
+    cache = DownloadCache(cache_dir)
+    url = 'https://example.com/fonts/font.ttf?v=1'
+    assert cache.get(url) is None
+    assert cache.get_partial(url) is None
+
+    # Interrupted download
+    partial_path = cache.start_partial(url, '"etag"')
+    with open(partial_path, 'wb') as f:
+        f.write(b'0123')
+    assert cache.get(url) is None
+    assert cache.get_partial(url) == (4, '"etag"')
+
+    # Finished download
+    path = cache.set(url, etag='"etag"', last_modified='yesterday')
+    assert os.path.basename(path) == 'font.ttf'
+    assert cache.get(url) == {
+        'url': url,
+        'path': path,
+        'etag': '"etag"',
+        'last_modified': 'yesterday',
+    }
+    assert cache.get_partial(url) is None
+
+    # Removed file
+    os.remove(path)
+    assert cache.get(url) is None
+
+    shutil.rmtree(cache_dir)
+
+
+def test_user_cache_dir(monkeypatch):
+    """Test finding out default cache directory"""
+    monkeypatch.setenv('XDG_CACHE_HOME', '/tmp/cache')
+    assert user_cache_dir() == os.path.join('/tmp/cache', 'icon_font_to_png')
+
+
+def test_make_dirs(monkeypatch):
+    """Test creating directories created by someone else at the same time"""
+    tmp_dir = tempfile.mkdtemp()
+    directory = os.path.join(tmp_dir, 'a', 'b')
+    make_dirs(directory)
+    assert os.path.isdir(directory)
+
+    # Directory appears between checking and creating it
+    monkeypatch.setattr(os.path, 'exists', lambda path: False)
+    make_dirs(directory)
+
+    with open(os.path.join(tmp_dir, 'file'), 'w'):
+        pass
+    with pytest.raises(OSError):
+        make_dirs(os.path.join(tmp_dir, 'file'))
+
+    monkeypatch.undo()
+    shutil.rmtree(tmp_dir)
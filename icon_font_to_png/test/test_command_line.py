@@ -2,11 +2,15 @@
 from __future__ import absolute_import, unicode_literals
 
 import os
+import json
 import shutil
+import tarfile
+import tempfile
 
 import pytest
 
 from icon_font_to_png import command_line
+from icon_font_to_png.icon_font import IconFont
 
 
 BASE_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -47,6 +51,44 @@ def test_list_option(capfd):
     assert out == 'foo-bar\nfoo-test\n'
 
 
+def test_icon_patterns(capfd):
+    """Test selecting icons by patterns and codepoints"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    with pytest.raises(SystemExit):
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} --list '
+            'arrow-circle-* /^chevron-circle-(up|down)$/ U+F135 '
+            'fa-rocket'.format(css_file=css_file, ttf_file=ttf_file).split()
+        )
+    out, err = capfd.readouterr()
+    assert out.split() == [
+        'arrow-circle-down', 'arrow-circle-left', 'arrow-circle-o-down',
+        'arrow-circle-o-left', 'arrow-circle-o-right', 'arrow-circle-o-up',
+        'arrow-circle-right', 'arrow-circle-up', 'chevron-circle-down',
+        'chevron-circle-up', 'rocket',
+    ]
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} '
+        'github-* U+F135'.format(css_file=css_file, ttf_file=ttf_file).split()
+    )
+    out, err = capfd.readouterr()  # For skipping stdout
+    for name in ('github-alt.png', 'github-square.png', 'rocket.png'):
+        assert os.path.isfile(os.path.join('exported', name))
+
+    for query, error in (('foo-*', "No icons match 'foo-*'"),
+                         ('/(/', "Invalid regular expression"),
+                         ('U+FFFF', "Unknown icon name 'U+FFFF'")):
+        with pytest.raises(SystemExit):
+            command_line.run([
+                '--css', css_file, '--ttf', ttf_file, '--list', query
+            ])
+        out, err = capfd.readouterr()
+        assert error in err
+
+
 def test_icon_export(capfd):
     """Test exporting icons (on Font Awesome files)"""
     css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
@@ -119,6 +161,398 @@ def test_filename_option(capfd):
     assert os.path.isfile(os.path.join('exported', 'foo-github.png'))
     assert os.path.isfile(os.path.join('exported', 'foo-star.png'))
 
+    # Braces which aren't template fields are taken literally
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} '
+        '--filename x{{ github'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    out, err = capfd.readouterr()
+
+    assert "Exporting icon 'github' as 'x{.png'" in out
+    assert os.path.isfile(os.path.join('exported', 'x{.png'))
+
+    # Invalid template
+    with pytest.raises(SystemExit):
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} '
+            '--filename {{icon}}{{ github'.format(
+                css_file=css_file, ttf_file=ttf_file
+            ).split()
+        )
+    out, err = capfd.readouterr()
+
+    assert "Invalid file name template '{icon}{'" in err
+
+
+def test_multiple_sizes_and_colors(capfd):
+    """Test exporting multiple sizes and colors"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} --size 16 --size 32 '
+        '--color blue --color #123123 github'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    out, err = capfd.readouterr()  # For skipping stdout
+
+    for size in ('16', '32'):
+        for color in ('blue', '123123'):
+            assert os.path.isfile(os.path.join(
+                'exported', 'github-{size}-{color}.png'.format(size=size,
+                                                               color=color)
+            ))
+
+    # Filename template
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} --size 16 --size 32 '
+        '--filename icon_{{icon}}_{{size}} github star'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    out, err = capfd.readouterr()  # For skipping stdout
+
+    assert os.path.isfile(os.path.join('exported', 'icon_github_16.png'))
+    assert os.path.isfile(os.path.join('exported', 'icon_star_32.png'))
+
+
+def test_atlas_option(capfd):
+    """Test exporting icons into a sprite sheet"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} '
+        '--atlas sprites github star'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    out, err = capfd.readouterr()
+
+    for extension in ('png', 'json', 'css'):
+        path = os.path.join('exported', 'sprites.' + extension)
+        assert os.path.isfile(path)
+        assert "Saved '{path}'".format(path=path) in out
+    assert "Exporting icon" not in out
+
+    # Sprite sheets aren't exported in parallel
+    with pytest.raises(SystemExit):
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} --jobs 2 '
+            '--atlas sprites github'.format(
+                css_file=css_file, ttf_file=ttf_file
+            ).split()
+        )
+    out, err = capfd.readouterr()
+    assert "--atlas can't be combined with --jobs" in err
+
+    # Sprite sheets are saved as PNG files, regardless of encoder options
+    for option in ('--incremental', '--format webp', '--palette',
+                   '--compress_level 9', '--png_strategy rle'):
+        with pytest.raises(SystemExit):
+            command_line.run(
+                '--css {css_file} --ttf {ttf_file} {option} '
+                '--atlas sprites github'.format(
+                    css_file=css_file, ttf_file=ttf_file, option=option
+                ).split()
+            )
+        out, err = capfd.readouterr()
+        assert "--atlas can't be combined with --incremental" in err
+
+    # Icons bigger than the sprite sheet
+    with pytest.raises(SystemExit):
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} --size 64 '
+            '--atlas sprites --atlas_size 32 github'.format(
+                css_file=css_file, ttf_file=ttf_file
+            ).split()
+        )
+    out, err = capfd.readouterr()  # For skipping stdout
+
+
+def test_incremental_option(capfd, monkeypatch):
+    """Test skipping up to date icons"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    arguments = (
+        '--css {css_file} --ttf {ttf_file} --size 20 '
+        '--filename inc- --incremental github star'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+
+    command_line.run(arguments)
+    out, err = capfd.readouterr()
+    assert "Exported 2 icons, skipped 0 up to date icons" in out
+
+    os.remove(os.path.join('exported', 'inc-star.png'))
+    command_line.run(arguments)
+    out, err = capfd.readouterr()
+    assert "Exported 1 icons, skipped 1 up to date icons" in out
+    assert os.path.isfile(os.path.join('exported', 'inc-star.png'))
+
+    # Icons are checked only once
+    outdated_icons = IconFont.outdated_icons
+    calls = []
+
+    def counting_outdated_icons(self, *args, **kwargs):
+        calls.append(args)
+        return outdated_icons(self, *args, **kwargs)
+
+    monkeypatch.setattr(IconFont, 'outdated_icons', counting_outdated_icons)
+    for extra_arguments in ([], ['--pipeline']):
+        del calls[:]
+        os.remove(os.path.join('exported', 'inc-star.png'))
+        command_line.run(arguments + extra_arguments)
+        out, err = capfd.readouterr()
+        assert "Exported 1 icons, skipped 1 up to date icons" in out
+        assert len(calls) == 1
+
+
+def test_format_options(capfd):
+    """Test exporting icons in other formats"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} --size 16 --size 32 '
+        '--color blue --color red --format ico --filename fmt- '
+        'github star'.format(css_file=css_file, ttf_file=ttf_file).split()
+    )
+    out, err = capfd.readouterr()
+    assert ("Exporting icon 'star' as 'fmt-star-blue.ico', "
+            "'fmt-star-red.ico' (16x16, 32x32 pixels)") in out
+    for icon in ('github', 'star'):
+        for color in ('blue', 'red'):
+            assert os.path.isfile(os.path.join(
+                'exported', 'fmt-{icon}-{color}.ico'.format(icon=icon,
+                                                            color=color)
+            ))
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} --palette --compress_level 9 '
+        '--png_strategy filtered --filename fmt-palette.png github'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    assert os.path.isfile(os.path.join('exported', 'fmt-palette.png'))
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} --format svg --size 1024 '
+        '--filename fmt-vector github'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    assert os.path.isfile(os.path.join('exported', 'fmt-vector.svg'))
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} --rasterizer outline '
+        '--filename fmt-outline github'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    assert os.path.isfile(os.path.join('exported', 'fmt-outline.png'))
+
+    # Invalid options
+    with pytest.raises(SystemExit):
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} --format webp --palette '
+            'github'.format(css_file=css_file, ttf_file=ttf_file).split()
+        )
+    out, err = capfd.readouterr()
+    assert "Palette output is only supported for PNG images" in err
+
+
+def test_jobs_option(capfd):
+    """Test exporting icons in parallel"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} '
+        '--jobs 2 github star rocket'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    out, err = capfd.readouterr()  # For skipping stdout
+
+    assert os.path.isfile(os.path.join('exported', 'github.png'))
+    assert os.path.isfile(os.path.join('exported', 'star.png'))
+    assert os.path.isfile(os.path.join('exported', 'rocket.png'))
+
+    # Invalid number of jobs
+    with pytest.raises(SystemExit):
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} '
+            '--jobs 0 github'.format(
+                css_file=css_file, ttf_file=ttf_file
+            ).split()
+        )
+    out, err = capfd.readouterr()  # For skipping stdout
+
+
+def test_supersample_option(capfd):
+    """Test rendering icons with supersampling factor"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} --supersample 1 '
+        '--size 16 --filename rocket-direct rocket'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    out, err = capfd.readouterr()  # For skipping stdout
+
+    assert os.path.isfile(os.path.join('exported', 'rocket-direct.png'))
+
+    # Invalid supersampling factor
+    with pytest.raises(SystemExit):
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} '
+            '--supersample 0 rocket'.format(
+                css_file=css_file, ttf_file=ttf_file
+            ).split()
+        )
+    out, err = capfd.readouterr()
+    assert "Supersampling factor has to be a positive number" in err
+
+
+def test_pipeline_option(capfd):
+    """Test exporting icons in pipeline mode"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} --pipeline --jobs 2 '
+        '--in_flight 2 --size 16 --size 32 github star'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    out, err = capfd.readouterr()  # For skipping stdout
+
+    for name in ('github-16-black.png', 'github-32-black.png',
+                 'star-16-black.png', 'star-32-black.png'):
+        assert os.path.isfile(os.path.join('exported', name))
+
+    # Invalid number of images in flight
+    with pytest.raises(SystemExit):
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} '
+            '--pipeline --in_flight 0 github'.format(
+                css_file=css_file, ttf_file=ttf_file
+            ).split()
+        )
+    out, err = capfd.readouterr()
+    assert "images in flight" in err
+
+
+def test_stats_option(capfd):
+    """Test printing export stats"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    command_line.run(
+        '--css {css_file} --ttf {ttf_file} '
+        '--stats --size 16 --size 32 github'.format(
+            css_file=css_file, ttf_file=ttf_file
+        ).split()
+    )
+    out, err = capfd.readouterr()
+
+    assert 'draw_glyph' in out
+    assert 'auto_scale_iterations' in out
+    assert 'files_saved' in out
+
+
+def test_serve_command(capfd):
+    """Test 'serve' command arguments"""
+    # No icon fonts
+    with pytest.raises(SystemExit):
+        command_line.run(['serve'])
+    out, err = capfd.readouterr()
+    assert '--font' in err
+
+
+def test_jobfile_option(capfd):
+    """Test exporting icons described by job file"""
+    tmp_dir = tempfile.mkdtemp()
+    path = os.path.join(tmp_dir, 'jobs.json')
+    with open(path, 'w') as f:
+        json.dump({
+            'fonts': {'fa': {
+                'css': os.path.join(BASE_DIR, 'files', 'font-awesome.css'),
+                'ttf': os.path.join(BASE_DIR, 'files',
+                                    'fontawesome-webfont.ttf'),
+            }},
+            'jobs': [
+                {'font': 'fa', 'icons': ['github', 'star'], 'size': 32},
+                {'font': 'fa', 'icons': 'github', 'size': 32,
+                 'color': 'red', 'filename': 'github-red'},
+            ],
+        }, f)
+
+    try:
+        command_line.run('--jobfile {path} --stats'.format(path=path).split())
+        out, err = capfd.readouterr()
+        assert "Exporting 2 icons of 'fa' font" in out
+        assert 'files_saved' in out
+        assert 'All done' in out
+
+        for name in ('github.png', 'star.png', 'github-red.png'):
+            assert os.path.isfile(os.path.join(tmp_dir, 'exported', name))
+
+        with open(path, 'w') as f:
+            json.dump([{'font': 'foo', 'icons': 'github'}], f)
+        with pytest.raises(SystemExit):
+            command_line.run('--jobfile {path}'.format(path=path).split())
+        out, err = capfd.readouterr()
+        assert "Job 1 has no (known) icon font" in err
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_archive_option(capfd):
+    """Test writing icons into an archive"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    tmp_dir = tempfile.mkdtemp()
+    path = os.path.join(tmp_dir, 'icons.tar.gz')
+
+    try:
+        command_line.run(
+            '--css {css_file} --ttf {ttf_file} --size 16 --size 32 '
+            '--archive {path} github star'.format(
+                css_file=css_file, ttf_file=ttf_file, path=path
+            ).split()
+        )
+        out, err = capfd.readouterr()
+        assert 'All done' in out
+
+        with tarfile.open(path, 'r:gz') as archive:
+            assert archive.getnames() == [
+                'github-16-black.png', 'github-32-black.png',
+                'star-16-black.png', 'star-32-black.png',
+            ]
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    for options, error in (
+        ('--archive icons.rar', "Can't guess archive format"),
+        ('--archive icons.zip --incremental', "can't be combined"),
+    ):
+        with pytest.raises(SystemExit):
+            command_line.run(
+                '--css {css_file} --ttf {ttf_file} {options} github'.format(
+                    css_file=css_file, ttf_file=ttf_file, options=options
+                ).split()
+            )
+        out, err = capfd.readouterr()
+        assert error in err
+
 
 def test_download_option(capfd):
     """Test icon font download option"""
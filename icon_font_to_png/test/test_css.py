@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from icon_font_to_png import icon_font
+from icon_font_to_png.css import extract_icons, iter_css_icons
+
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+# Tests
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_css_icons(chunk_size):
+    """Test scanning CSS for icons, regardless of formatting"""
+    css = (
+        '/* .comment:before { content: "\\f000"; } */'
+        '@font-face{font-family:"Foo";src:url("foo.ttf")}'
+        '.foo{display:inline-block}'
+        '.foo-a:before{content:"\\f001"}'
+        '.foo-b::before,.foo-c:before{color:red;content:\'\\f002\'}'
+        '@media print{.foo-d:before{content:"\\f003";}}'
+        '.foo-e:before{content:"\\f004";content:"\\F005"}'
+        '.foo-f:before{color:red}'
+    )
+    icons = list(iter_css_icons(io.StringIO(css), chunk_size=chunk_size))
+
+    assert icons == [
+        ('foo-a', '\uf001'),
+        ('foo-b', '\uf002'),
+        ('foo-c', '\uf002'),
+        ('foo-d', '\uf003'),
+        ('foo-e', '\uf005'),
+    ]
+
+
+@pytest.mark.parametrize("css_file", [
+    'font-awesome.css',
+    'octicons.css',
+    'test.css',
+    'test-foo.css',
+])
+def test_extract_icons(css_file):
+    """Test that results are the same as when parsing with tinycss"""
+    css_file = os.path.join(BASE_DIR, 'files', css_file)
+    obj = icon_font.IconFont(css_file=css_file, ttf_file=None)
+
+    assert extract_icons(css_file) == obj.parse_css()
+
+
+@pytest.mark.parametrize("css", [
+    '@charset "UTF-8";.x-a:before{content:"\\f101"}'
+    '.x-b:before{content:"\\f102"}',
+    '@import url("foo.css");/* .x-c:before{} */.x-a:before{content:"\\f101"}'
+    '.x-b::before{content:"\\f102"}',
+    '::before{content:""}.x-b:before,.x-c:before{content:"\\f102"}',
+])
+def test_extract_icons_parity(css):
+    """Test that at-rules and minified selectors don't lose any icons"""
+    tmp_dir = tempfile.mkdtemp()
+    css_file = os.path.join(tmp_dir, 'icons.css')
+    with io.open(css_file, 'w', encoding='utf-8') as f:
+        f.write(css)
+    obj = icon_font.IconFont(css_file=css_file, ttf_file=None)
+
+    icons, common_prefix = extract_icons(css_file)
+    assert (icons, common_prefix) == obj.parse_css()
+    assert 'x-b' in icons
+    assert '' not in icons
+
+    shutil.rmtree(tmp_dir)
+
+
+def test_css_parser_option():
+    """Test choosing CSS parser in IconFont"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    obj1 = icon_font.IconFont(css_file=css_file, ttf_file=None)
+    obj2 = icon_font.IconFont(css_file=css_file, ttf_file=None,
+                              css_parser='fast')
+
+    assert obj1.css_icons == obj2.css_icons
+    assert obj1.common_prefix == obj2.common_prefix
+
+    with pytest.raises(ValueError):
+        icon_font.IconFont(css_file=css_file, ttf_file=None,
+                           css_parser='foo')
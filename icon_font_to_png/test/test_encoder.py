@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+
+import pytest
+from PIL import Image, ImageChops
+
+from icon_font_to_png.encoder import ImageEncoder, to_palette_image
+
+
+# Fixtures
+@pytest.fixture(scope='module')
+def image():
+    """Create a single color image with gradually changing opacity"""
+    mask = Image.new("L", (32, 32), 0)
+    mask.putdata([(x * 8) % 256 for x in range(32 * 32)])
+
+    image = Image.new("RGBA", mask.size, '#336699')
+    image.putalpha(mask)
+    return image
+
+
+def save(encoder, images, color='#336699'):
+    fp = io.BytesIO()
+    encoder.save(images, fp, color)
+    fp.seek(0)
+    return Image.open(fp)
+
+
+# Tests
+def test_init():
+    """Test validating options"""
+    ImageEncoder(format='webp')
+    ImageEncoder(compress_level=0, strategy='rle', palette=True)
+
+    with pytest.raises(ValueError):
+        ImageEncoder(format='bmp')
+
+    with pytest.raises(ValueError):
+        ImageEncoder(compress_level=10)
+
+    with pytest.raises(ValueError):
+        ImageEncoder(strategy='foo')
+
+    with pytest.raises(ValueError):
+        ImageEncoder(format='ico', palette=True)
+
+
+@pytest.mark.parametrize("options", [
+    dict(),
+    dict(compress_level=1),
+    dict(compress_level=9, strategy='filtered'),
+    dict(format='webp'),
+])
+def test_lossless(image, options):
+    """Test saving images without losing quality"""
+    saved = save(ImageEncoder(**options), [image])
+    assert saved.format == options.get('format', 'png').upper()
+    assert ImageChops.difference(saved.convert("RGBA"), image).getbbox() \
+        is None
+
+
+def test_palette(image):
+    """Test saving single color images as 8-bit indexed ones"""
+    palette_image = to_palette_image(image, '#336699')
+    assert palette_image.mode == 'P'
+
+    saved = save(ImageEncoder(palette=True), [image])
+    assert saved.mode == 'P'
+    assert ImageChops.difference(saved.convert("RGBA"), image).getbbox() \
+        is None
+
+
+def test_ico(image):
+    """Test saving multiple sizes in one ICO file"""
+    encoder = ImageEncoder(format='ico')
+    assert encoder.extension == '.ico'
+    assert encoder.multiple_sizes
+
+    images = [image.resize((16, 16)), image]
+    saved = save(encoder, images)
+    assert saved.format == 'ICO'
+    assert set(saved.info['sizes']) == set([(16, 16), (32, 32)])
+
+    # Too big image
+    with pytest.raises(ValueError):
+        save(encoder, [image.resize((512, 512))])
+
+    # Other formats store only one image per file
+    with pytest.raises(ValueError):
+        save(ImageEncoder(), images)
@@ -1,15 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import io
 import os
 import shutil
 import tempfile
 import uuid
+import zipfile
 
 import pytest
-from PIL import Image, ImageChops
+from PIL import Image, ImageChops, ImageDraw, ImageStat
 
 from icon_font_to_png import icon_font
+from icon_font_to_png.archive import ArchiveWriter
+from icon_font_to_png.encoder import ImageEncoder
+from icon_font_to_png.stats import ExportStats
 
 
 BASE_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -54,6 +59,63 @@ def test_common_prefix():
     assert obj.common_prefix == ''
 
 
+def test_lazy_css(monkeypatch):
+    """Test loading icons only when they're first needed"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    calls = []
+    parse_css = icon_font.IconFont.parse_css
+
+    def counted_parse_css(self):
+        calls.append(self)
+        return parse_css(self)
+
+    monkeypatch.setattr(icon_font.IconFont, 'parse_css', counted_parse_css)
+    obj = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file)
+    assert len(calls) == 0
+
+    assert obj.common_prefix == 'fa-'
+    assert 'rocket' in obj.css_icons
+    assert len(calls) == 1
+
+
+def test_cache_dir(monkeypatch):
+    """Test caching parsed CSS file"""
+    cache_dir = tempfile.mkdtemp()
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    obj1 = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                              cache_dir=cache_dir)
+    assert len(obj1.css_icons) > 0
+    assert len(os.listdir(cache_dir)) == 1
+
+    # Cached icons are loaded without parsing the file
+    def parse_css(self):
+        raise AssertionError("CSS file shouldn't be parsed")
+
+    monkeypatch.setattr(icon_font.IconFont, 'parse_css', parse_css)
+    obj2 = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                              cache_dir=cache_dir)
+    assert obj2.css_icons == obj1.css_icons
+    assert obj2.common_prefix == obj1.common_prefix
+
+    obj3 = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                              keep_prefix=True, cache_dir=cache_dir)
+    assert 'fa-rocket' in obj3.css_icons
+
+    # Icons found by the other parser aren't reused
+    monkeypatch.undo()
+    obj4 = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                              css_parser='fast', cache_dir=cache_dir,
+                              stats=ExportStats())
+    assert obj4.css_icons == obj1.css_icons
+    assert obj4.stats.counters['css_cache_misses'] == 1
+    assert len(os.listdir(cache_dir)) == 2
+
+    shutil.rmtree(cache_dir)
+
+
 @pytest.mark.parametrize("image,size", [
     ("rocket_16.png", 16),
     ("rocket_100.png", 100),
@@ -115,6 +177,429 @@ def test_scale(font_awesome, image, scale):
     assert ImageChops.difference(img1, img2).getbbox() is None
 
 
+def test_font_cache():
+    """Test caching loaded fonts"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    obj = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                             font_cache_size=2)
+
+    font = obj.get_font(100)
+    assert obj.get_font(100) is font
+    assert obj.font_cache.hits == 1
+    assert obj.font_cache.misses == 1
+
+    # Least recently used size gets evicted
+    obj.get_font(110)
+    obj.get_font(120)
+    assert len(obj.font_cache) == 2
+    assert obj.get_font(100) is not font
+
+    # Exporting the same icon twice loads the font only once
+    obj.font_cache.clear()
+    obj.export_icon(icon='rocket', size=16, export_dir='/tmp')
+    misses = obj.font_cache.misses
+    obj.export_icon(icon='rocket', size=16, export_dir='/tmp')
+    assert obj.font_cache.misses == misses
+
+
+def test_fit_font(font_awesome):
+    """Test finding the biggest font size that fits given boundary"""
+    draw = ImageDraw.Draw(Image.new("RGBA", (150, 150)))
+
+    for size in (16, 48, 150):
+        stats = ExportStats()
+        font_awesome.stats = stats
+        for icon in font_awesome.css_icons.values():
+            font, width, height = font_awesome.fit_font(icon, size, draw)
+            assert max(width, height) <= size
+            assert max(draw.textsize(icon, font=font)) <= size
+
+        # Text is measured at most twice per icon
+        font_awesome.stats = None
+        assert stats.counters['auto_scale_iterations'] <= \
+            2 * len(font_awesome.css_icons)
+
+    for icon in font_awesome.css_icons.values():
+        font, width, height = font_awesome.fit_font(icon, 150, draw)
+
+        # Hinting may make us a size off, but not more
+        if font.size + 2 < 150:
+            bigger = font_awesome.get_font(font.size + 2)
+            assert max(draw.textsize(icon, font=bigger)) > 150
+
+
+def test_draw_fitted_mask(font_awesome):
+    """Test fitting glyphs rasterized directly in the icon size"""
+    for size in (16, 24, 64):
+        stats = ExportStats()
+        font_awesome.stats = stats
+        for icon in font_awesome.css_icons:
+            bbox = font_awesome.draw_fitted_mask(icon, size).getbbox()
+            assert max(bbox[2] - bbox[0], bbox[3] - bbox[1]) <= size
+
+        # Font size is fitted (and corrected) at most three times per icon
+        font_awesome.stats = None
+        assert stats.counters['auto_scale_iterations'] <= \
+            3 * len(font_awesome.css_icons)
+
+
+def test_draw_mask(font_awesome):
+    """Test drawing icon on an alpha mask"""
+    mask = font_awesome.draw_mask('rocket', 150)
+    assert mask.mode == 'L'
+    assert mask.size == (150, 150)
+    assert mask.getbbox() is not None
+
+
+def test_render_icon(font_awesome):
+    """Test rendering icon without saving it"""
+    original_file = os.path.join(BASE_DIR, 'files', 'rocket_blue.png')
+    image = font_awesome.render_icon('rocket', size=16, color='blue')
+
+    assert ImageChops.difference(Image.open(original_file),
+                                 image).getbbox() is None
+
+    # Encoded image written into a buffer
+    buf = io.BytesIO()
+    assert font_awesome.render_icon('rocket', size=16, color='blue',
+                                    fp=buf) is buf
+    buf.seek(0)
+    assert ImageChops.difference(Image.open(original_file),
+                                 Image.open(buf)).getbbox() is None
+
+
+def test_multiple_sizes_and_colors(font_awesome):
+    """Test exporting multiple sizes and colors at once"""
+    export_dir = tempfile.mkdtemp()
+    font_awesome.export_icon(icon='rocket', size=[16, 32],
+                             color=['blue', 'cyan', '#123123'],
+                             export_dir=export_dir)
+
+    for size in (16, 32):
+        for color in ('blue', 'cyan', '123123'):
+            exported_file = os.path.join(
+                export_dir, 'rocket-{size}-{color}.png'.format(size=size,
+                                                               color=color)
+            )
+            assert Image.open(exported_file).size == (size, size)
+
+    # Colors are the same as when exported one by one
+    for color in ('blue', 'cyan', '123123'):
+        original_file = os.path.join(BASE_DIR, 'files',
+                                     'rocket_{color}.png'.format(color=color))
+        exported_file = os.path.join(
+            export_dir, 'rocket-16-{color}.png'.format(color=color)
+        )
+
+        img1 = Image.open(original_file)
+        img2 = Image.open(exported_file)
+        assert ImageChops.difference(img1, img2).getbbox() is None
+
+    # Custom filename template
+    font_awesome.export_icon(icon='rocket', size=[16, 32],
+                             filename='{icon}_{size}px.png',
+                             export_dir=export_dir)
+    assert os.path.isfile(os.path.join(export_dir, 'rocket_16px.png'))
+    assert os.path.isfile(os.path.join(export_dir, 'rocket_32px.png'))
+    shutil.rmtree(export_dir)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_colorize_masks(font_awesome, monkeypatch, use_numpy):
+    """Test coloring alpha mask with multiple colors at once"""
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(icon_font, 'numpy', False)
+
+    colors = ['blue', '#123123', '#f00', '#12312380']
+    mask = font_awesome.draw_mask('rocket', 64)
+    images = icon_font.colorize_masks(mask, colors)
+
+    assert len(images) == len(colors)
+    for color, image in zip(colors, images):
+        assert image.mode == 'RGBA'
+        assert image.tobytes() == \
+            icon_font.colorize_mask(mask, color).tobytes()
+
+    # Empty mask
+    empty = Image.new("L", (16, 16), 0)
+    for image in icon_font.colorize_masks(empty, colors):
+        assert image.getbbox() is None
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_export_icons(font_awesome, jobs):
+    """Test exporting multiple icons"""
+    export_dir = tempfile.mkdtemp()
+    failed = font_awesome.export_icons(
+        icons=['rocket', 'github', 'foo'], size=16,
+        filenames={'github': 'bar.png'}, export_dir=export_dir, jobs=jobs,
+    )
+
+    assert os.path.isfile(os.path.join(export_dir, 'rocket.png'))
+    assert os.path.isfile(os.path.join(export_dir, 'bar.png'))
+
+    # Unknown icon doesn't stop the export
+    assert list(failed.keys()) == ['foo']
+    shutil.rmtree(export_dir)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_archive_icons(font_awesome, jobs):
+    """Test writing multiple icons into an archive"""
+    fp = io.BytesIO()
+    with ArchiveWriter(fp, format='zip') as archive:
+        failed = font_awesome.archive_icons(
+            icons=['rocket', 'github', 'foo'], archive=archive,
+            size=[16, 32], color='blue', filenames={'github': 'bar-{size}'},
+            jobs=jobs,
+        )
+
+    # File names are the same as when exported into separate files
+    fp.seek(0)
+    with zipfile.ZipFile(fp) as zf:
+        assert zf.namelist() == ['rocket-16-blue.png', 'rocket-32-blue.png',
+                                 'bar-16', 'bar-32']
+        original_file = os.path.join(BASE_DIR, 'files', 'rocket_blue.png')
+        image = Image.open(io.BytesIO(zf.read('rocket-16-blue.png')))
+        assert ImageChops.difference(Image.open(original_file),
+                                     image).getbbox() is None
+
+    # Unknown icon doesn't stop the export
+    assert list(failed.keys()) == ['foo']
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_export_stats(jobs):
+    """Test collecting per-stage timings and counters"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    stats = ExportStats()
+    obj = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                             stats=stats)
+
+    export_dir = tempfile.mkdtemp()
+    obj.export_icons(icons=['rocket', 'github'], size=[16, 200],
+                     export_dir=export_dir, jobs=jobs)
+    shutil.rmtree(export_dir)
+
+    assert stats.timings['draw_glyph'][0] == 2
+    assert stats.timings['fit_font'][0] == 2
+    assert stats.timings['resize'][0] == 2
+    assert stats.timings['save'][0] == 4
+    assert stats.counters['files_saved'] == 4
+    assert stats.counters['auto_scale_iterations'] >= 2
+    assert 'load_css' in stats.timings
+    assert stats.counters['font_cache_misses'] >= 1
+
+    # Nothing is collected by default
+    obj = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file)
+    assert obj.stats is None
+    obj.render_icon('rocket', 16)
+
+
+def test_incremental_export(font_awesome):
+    """Test skipping icons exported before"""
+    export_dir = tempfile.mkdtemp()
+    kwargs = dict(size=[16, 32], color='blue', export_dir=export_dir)
+
+    assert font_awesome.outdated_icons(['rocket', 'github'],
+                                       **kwargs) == ['rocket', 'github']
+    font_awesome.export_icons(['rocket', 'github'], incremental=True,
+                              **kwargs)
+    assert font_awesome.outdated_icons(['rocket', 'github'], **kwargs) == []
+
+    # Different parameters
+    assert font_awesome.outdated_icons(['rocket'], size=[16, 32],
+                                       color='red', export_dir=export_dir,
+                                       filenames={'rocket': '{size}.png'})
+
+    # Missing file
+    os.remove(os.path.join(export_dir, 'rocket-32-blue.png'))
+    assert font_awesome.outdated_icons(['rocket', 'github'],
+                                       **kwargs) == ['rocket']
+
+    # Only outdated icons are exported
+    mtime = os.path.getmtime(os.path.join(export_dir, 'github-16-blue.png'))
+    font_awesome.export_icons(['rocket', 'github'], incremental=True,
+                              **kwargs)
+    assert os.path.isfile(os.path.join(export_dir, 'rocket-32-blue.png'))
+    assert mtime == os.path.getmtime(
+        os.path.join(export_dir, 'github-16-blue.png')
+    )
+
+    shutil.rmtree(export_dir)
+
+
+def test_render_cache(monkeypatch):
+    """Test reusing icons rendered before"""
+    cache_dir = tempfile.mkdtemp()
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    obj = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                             render_cache_dir=os.path.join(cache_dir, 'cache'))
+
+    obj.export_icon('rocket', size=16, color='blue',
+                    export_dir=os.path.join(cache_dir, 'first'))
+    assert obj.render_cache.misses == 1
+
+    # Cached icons aren't rendered again
+    def render_variants(*args, **kwargs):
+        raise AssertionError("Icon shouldn't be rendered")
+
+    monkeypatch.setattr(obj, 'render_variants', render_variants)
+    obj.export_icon('rocket', size=16, color='blue',
+                    export_dir=os.path.join(cache_dir, 'second'))
+    assert obj.render_cache.hits == 1
+
+    original_file = os.path.join(BASE_DIR, 'files', 'rocket_blue.png')
+    exported_file = os.path.join(cache_dir, 'second', 'rocket.png')
+    assert ImageChops.difference(Image.open(original_file),
+                                 Image.open(exported_file)).getbbox() is None
+
+    # Images in other formats are cached separately
+    monkeypatch.undo()
+    obj.export_icon('rocket', size=16, color='blue',
+                    export_dir=os.path.join(cache_dir, 'second'),
+                    encoder=ImageEncoder(palette=True))
+    assert obj.render_cache.misses == 2
+    assert Image.open(exported_file).mode == 'P'
+
+    shutil.rmtree(cache_dir)
+
+
+def test_export_formats(font_awesome):
+    """Test exporting icons in other formats"""
+    export_dir = tempfile.mkdtemp()
+    original_file = os.path.join(BASE_DIR, 'files', 'rocket_blue.png')
+
+    # Palette PNG images are equal to the RGBA ones
+    font_awesome.export_icon('rocket', size=16, color='blue',
+                             export_dir=export_dir,
+                             encoder=ImageEncoder(palette=True,
+                                                  compress_level=9))
+    exported = Image.open(os.path.join(export_dir, 'rocket.png'))
+    assert exported.mode == 'P'
+    assert ImageChops.difference(Image.open(original_file),
+                                 exported.convert("RGBA")).getbbox() is None
+
+    font_awesome.export_icon('rocket', size=16, color='blue',
+                             export_dir=export_dir,
+                             encoder=ImageEncoder(format='webp'))
+    exported = Image.open(os.path.join(export_dir, 'rocket.webp'))
+    assert exported.format == 'WEBP'
+
+    # ICO files contain all sizes
+    font_awesome.export_icon('rocket', size=[16, 32], color=['blue', 'red'],
+                             export_dir=export_dir,
+                             encoder=ImageEncoder(format='ico'))
+    for color in ('blue', 'red'):
+        exported = Image.open(os.path.join(
+            export_dir, 'rocket-{color}.ico'.format(color=color)
+        ))
+        assert set(exported.info['sizes']) == set([(16, 16), (32, 32)])
+
+    shutil.rmtree(export_dir)
+
+
+def test_svg_export(font_awesome):
+    """Test exporting icons as SVG images"""
+    export_dir = tempfile.mkdtemp()
+    font_awesome.export_icon('rocket', size=[16, 1024], color='#123123',
+                             export_dir=export_dir,
+                             encoder=ImageEncoder(format='svg'))
+
+    for size in (16, 1024):
+        exported_file = os.path.join(
+            export_dir, 'rocket-{size}-123123.svg'.format(size=size)
+        )
+        with io.open(exported_file, encoding='utf-8') as f:
+            svg = f.read()
+
+        assert svg == font_awesome.render_svg('rocket', size, '#123123')
+        assert 'width="{size}" height="{size}"'.format(size=size) in svg
+        assert 'fill="#123123"' in svg
+        assert 'd="M' in svg
+
+    shutil.rmtree(export_dir)
+
+
+def test_outline_rasterizer():
+    """Test rendering icons from glyph outlines"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    obj = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                             rasterizer='outline')
+
+    with pytest.raises(ValueError):
+        icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                           rasterizer='foo')
+
+    # Outlines are read only once
+    obj.glyph_outline('rocket')
+    obj.glyph_outline('rocket')
+    assert obj.outline_cache.hits == 1
+
+    # Icons look (almost) the same as rendered by FreeType
+    original = Image.open(os.path.join(BASE_DIR, 'files', 'rocket_256.png'))
+    image = obj.render_icon('rocket', 256)
+    assert image.size == (256, 256)
+    difference = ImageChops.difference(original.split()[3],
+                                       image.split()[3])
+    assert ImageStat.Stat(difference).mean[0] < 8
+
+    # Rasterizer is a part of the fingerprint
+    assert obj.fingerprint('rocket', 16, 'black')['rasterizer'] == 'outline'
+
+
+def test_supersample():
+    """Test rendering icons with supersampling factor"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+
+    with pytest.raises(ValueError):
+        icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                           supersample=0)
+
+    # Supersampled icons look (almost) the same as rendered on 150x150
+    # pixels canvas; hinted ones have sharper edges
+    original = Image.open(os.path.join(BASE_DIR, 'files', 'rocket_16.png'))
+    for supersample, max_difference in ((1, 40), (4, 16)):
+        obj = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                                 supersample=supersample, stats=ExportStats())
+        assert obj.get_options()['supersample'] == supersample
+        assert obj.canvas_size([16, 32]) == 32 * supersample
+
+        image = obj.render_icon('rocket', 16)
+        assert image.size == (16, 16)
+        difference = ImageChops.difference(original.split()[3],
+                                           image.split()[3])
+        assert ImageStat.Stat(difference).mean[0] < max_difference
+
+        # Glyph fills the icon
+        bbox = image.getbbox()
+        assert max(bbox[2] - bbox[0], bbox[3] - bbox[1]) >= 15
+
+        # Factor 1 rasterizes the glyph directly in the icon size
+        assert ('resize' in obj.stats.timings) == (supersample > 1)
+
+        # Supersampling factor is a part of the fingerprint
+        assert obj.fingerprint('rocket', 16, 'black')['supersample'] == \
+            supersample
+
+        # Icons don't depend on other sizes exported along
+        assert obj.fingerprint('rocket', 16, 'black', canvas_size=512) == \
+            obj.fingerprint('rocket', 16, 'black')
+
+    assert 'supersample' not in icon_font.IconFont(
+        css_file=css_file, ttf_file=ttf_file
+    ).fingerprint('rocket', 16, 'black')
+    assert icon_font.get_canvas_size([16, 32]) == 150
+    assert icon_font.get_canvas_size([16, 32], 2) == 64
+
+
 # Teardown
 def teardown_module():
     """Delete exported icons directory"""
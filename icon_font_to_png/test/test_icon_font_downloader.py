@@ -1,17 +1,128 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import gzip
+import hashlib
+import io
 import os
+import shutil
 import tempfile
+import threading
 
 import pytest
+import requests
 from flaky import flaky
+from six.moves import BaseHTTPServer, socketserver
 
 from icon_font_to_png.icon_font_downloader import (
-    FontAwesomeDownloader, OcticonsDownloader
+    FontAwesomeDownloader, IconFontDownloader, OcticonsDownloader
 )
 
 
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+class FileRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Serves files from `server.files` dict, supporting conditional and range
+    requests (and gzip encoding if `server.gzip` is set), and records all
+    requests' headers in `server.requests`
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+
+        if self.path not in self.server.files:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        content = self.server.files[self.path]
+        etag = '"{hash}"'.format(hash=hashlib.sha1(content).hexdigest())
+        status = 200
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        # Ranges of encoded files are ranges of the encoded bytes
+        encoding = None
+        if (self.server.gzip and
+                'gzip' in self.headers.get('Accept-Encoding', '')):
+            encoding = 'gzip'
+            content = gzip_bytes(content)
+
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') == etag:
+            start = int(range_header.split('=')[1].rstrip('-'))
+            content = content[start:]
+            status = 206
+
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FileServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def gzip_bytes(content):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb', mtime=0) as f:
+        f.write(content)
+    return buf.getvalue()
+
+
+# Fixtures
+@pytest.fixture
+def file_server():
+    """Run HTTP server with bundled Font Awesome files in the background"""
+    server = FileServer(('127.0.0.1', 0), FileRequestHandler)
+    server.requests = []
+    server.gzip = False
+    server.files = dict()
+    for filename in ('font-awesome.css', 'fontawesome-webfont.ttf'):
+        with open(os.path.join(BASE_DIR, 'files', filename), 'rb') as f:
+            server.files['/' + filename] = f.read()
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def downloader(file_server):
+    """Create downloader class of files served by `file_server`"""
+    url = 'http://127.0.0.1:{port}/'.format(port=file_server.server_address[1])
+
+    class LocalDownloader(IconFontDownloader):
+        css_url = url + 'font-awesome.css'
+        ttf_url = url + 'fontawesome-webfont.ttf'
+
+        def get_latest_version_number(self):
+            return '1.0'
+
+    return LocalDownloader
+
+
 # Tests
 @flaky
 @pytest.mark.parametrize("downloader", [
@@ -43,3 +154,151 @@ def test_font_awesome_latest_version_number(downloader):
     """Test that getting latest version number"""
     obj = downloader(tempfile.mkdtemp())
     assert obj.get_latest_version_number()
+
+
+def test_latest_tag_from_github(file_server, downloader):
+    """Test getting latest tag with downloader's session"""
+    file_server.files['/repo/tags'] = b'[{"name": "v1.2.3"}, {"name": "v1"}]'
+    session = requests.Session()
+    session.headers['X-Session'] = 'shared'
+    obj = downloader(session=session)
+    assert obj._get_latest_tag_from_github(
+        obj.css_url.replace('font-awesome.css', 'repo')
+    ) == 'v1.2.3'
+
+    path, headers = file_server.requests[0]
+    assert path == '/repo/tags'
+    assert headers['X-Session'] == 'shared'
+
+    with pytest.raises(requests.HTTPError):
+        obj._get_latest_tag_from_github(
+            obj.css_url.replace('font-awesome.css', 'missing')
+        )
+    session.close()
+
+
+def test_download_files(file_server, downloader):
+    """Test downloading both files (at the same time)"""
+    directory = tempfile.mkdtemp()
+    obj = downloader(directory)
+    obj.download_files()
+
+    for path, url in ((obj.css_path, obj.css_url),
+                      (obj.ttf_path, obj.ttf_url)):
+        assert os.path.dirname(path) == directory
+        with open(path, 'rb') as f:
+            assert f.read() == file_server.files['/' + url.split('/')[-1]]
+
+    # Without directory
+    obj = downloader()
+    obj.download_files()
+    assert os.path.isfile(obj.css_path)
+    assert os.path.isfile(obj.ttf_path)
+
+    shutil.rmtree(directory)
+
+
+def test_download_cache(file_server, downloader):
+    """Test reusing downloaded files"""
+    cache_dir = tempfile.mkdtemp()
+    obj = downloader(cache_dir=cache_dir)
+    obj.download_files()
+    assert obj.css_path.startswith(cache_dir)
+    assert len(file_server.requests) == 2
+
+    # Files are revalidated, not downloaded again
+    del file_server.requests[:]
+    obj = downloader(cache_dir=cache_dir)
+    obj.download_files()
+    assert len(file_server.requests) == 2
+    for path, headers in file_server.requests:
+        assert 'If-None-Match' in headers
+
+    with open(obj.ttf_path, 'rb') as f:
+        assert f.read() == file_server.files['/fontawesome-webfont.ttf']
+
+    # Changed file is downloaded again
+    file_server.files['/font-awesome.css'] = b'.fa-foo:before{content:"a"}'
+    obj.download_files()
+    with open(obj.css_path, 'rb') as f:
+        assert f.read() == b'.fa-foo:before{content:"a"}'
+
+    # Cached files are copied to given directory
+    directory = tempfile.mkdtemp()
+    obj = downloader(directory, cache_dir=cache_dir)
+    obj.download_files()
+    assert os.path.dirname(obj.css_path) == directory
+
+    shutil.rmtree(directory)
+    shutil.rmtree(cache_dir)
+
+
+def test_resume_download(file_server, downloader):
+    """Test resuming interrupted download"""
+    cache_dir = tempfile.mkdtemp()
+    obj = downloader(cache_dir=cache_dir)
+    content = file_server.files['/fontawesome-webfont.ttf']
+    etag = '"{hash}"'.format(hash=hashlib.sha1(content).hexdigest())
+
+    partial_path = obj.cache.start_partial(obj.ttf_url, etag)
+    with open(partial_path, 'wb') as f:
+        f.write(content[:1000])
+
+    path = obj.download_ttf(None)
+    assert file_server.requests[-1][1]['Range'] == 'bytes=1000-'
+    with open(path, 'rb') as f:
+        assert f.read() == content
+    assert not os.path.exists(partial_path)
+
+    shutil.rmtree(cache_dir)
+
+
+def test_resume_gzip_download(file_server, downloader):
+    """Test that downloads aren't compressed in transfer, so they can be
+    resumed at the offset of the saved bytes"""
+    file_server.gzip = True
+    cache_dir = tempfile.mkdtemp()
+    obj = downloader(cache_dir=cache_dir)
+    content = file_server.files['/fontawesome-webfont.ttf']
+    etag = '"{hash}"'.format(hash=hashlib.sha1(content).hexdigest())
+
+    partial_path = obj.cache.start_partial(obj.ttf_url, etag)
+    with open(partial_path, 'wb') as f:
+        f.write(content[:1000])
+
+    path = obj.download_ttf(None)
+    headers = file_server.requests[-1][1]
+    assert headers['Range'] == 'bytes=1000-'
+    assert headers['Accept-Encoding'] == 'identity'
+    with open(path, 'rb') as f:
+        assert f.read() == content
+
+    # Without cache
+    directory = tempfile.mkdtemp()
+    path = downloader(directory).download_ttf(directory)
+    assert file_server.requests[-1][1]['Accept-Encoding'] == 'identity'
+    with open(path, 'rb') as f:
+        assert f.read() == content
+
+    shutil.rmtree(directory)
+    shutil.rmtree(cache_dir)
+
+
+def test_offline_download(file_server, downloader):
+    """Test using cached files when the server can't be reached"""
+    cache_dir = tempfile.mkdtemp()
+    obj = downloader(cache_dir=cache_dir)
+    path = obj.download_css(None)
+
+    file_server.shutdown()
+    file_server.server_close()
+
+    obj = downloader(cache_dir=cache_dir)
+    obj.timeout = 1
+    assert obj.download_css(None) == path
+
+    # Not cached file
+    with pytest.raises(requests.RequestException):
+        obj.download_ttf(None)
+
+    shutil.rmtree(cache_dir)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import pytest
+
+from icon_font_to_png.index import (
+    IconIndex, _glob_prefix, _regex_prefix, is_pattern
+)
+
+
+# Fixtures
+@pytest.fixture
+def index():
+    """Create an IconIndex instance of a few icons"""
+    icons = {
+        'arrow-down': '',
+        'arrow-up': '',
+        'arrows': '',
+        'chevron-down': '',
+        'chevron-up': '',
+        'rocket': '',
+        'space-shuttle': '',
+    }
+    return IconIndex(icons, common_prefix='fa-')
+
+
+# Tests
+def test_prefix(index):
+    """Test finding icons by prefix"""
+    assert len(index) == 7
+    assert 'rocket' in index
+    assert 'rock' not in index
+    assert index.prefix('arrow') == ['arrow-down', 'arrow-up', 'arrows']
+    assert index.prefix('arrow-') == ['arrow-down', 'arrow-up']
+    assert index.prefix('z') == []
+    assert len(index.prefix('')) == 7
+
+
+def test_glob(index):
+    """Test finding icons by glob patterns"""
+    assert index.glob('arrow-*') == ['arrow-down', 'arrow-up']
+    assert index.glob('*-up') == ['arrow-up', 'chevron-up']
+    assert index.glob('arrow?') == ['arrows']
+    assert index.glob('[cr]*') == ['chevron-down', 'chevron-up', 'rocket']
+    assert index.glob('Arrow-*') == []
+
+
+def test_regex(index):
+    """Test finding icons by regular expressions"""
+    assert index.regex('^chevron-') == ['chevron-down', 'chevron-up']
+    assert index.regex('down$') == ['arrow-down', 'chevron-down']
+    assert index.regex('^arrows?$') == ['arrows']
+    assert index.regex('^(rocket|arrows)$') == ['arrows', 'rocket']
+
+    with pytest.raises(ValueError):
+        index.regex('(')
+
+
+def test_codepoint(index):
+    """Test finding icons by codepoint"""
+    assert index.by_codepoint(0xf135) == ['rocket', 'space-shuttle']
+    assert index.by_codepoint(0xffff) == []
+
+
+def test_select(index):
+    """Test finding icons by any query"""
+    assert index.select('rocket') == ['rocket']
+    assert index.select('fa-rocket') == ['rocket']
+    assert index.select('foo') == []
+    assert index.find('fa-rocket') == 'rocket'
+    assert index.find('foo') is None
+    assert index.select('fa-arrow-*') == ['arrow-down', 'arrow-up']
+    assert index.select('/^chevron-/') == ['chevron-down', 'chevron-up']
+    assert index.select('U+F135') == ['rocket', 'space-shuttle']
+    assert index.select('u+f063') == ['arrow-down']
+
+    # Icon names including the prefix
+    prefixed = IconIndex({'fa-rocket': ''}, common_prefix='fa-',
+                         keep_prefix=True)
+    assert prefixed.select('rocket') == ['fa-rocket']
+    assert prefixed.select('fa-rocket') == ['fa-rocket']
+    assert prefixed.select('r*') == ['fa-rocket']
+    assert prefixed.find('rocket') == 'fa-rocket'
+    assert prefixed.find('fa-rocket') == 'fa-rocket'
+    assert prefixed.find('r*') is None
+
+    assert is_pattern('arrow-*')
+    assert is_pattern('/^arrow/')
+    assert not is_pattern('rocket')
+    assert not is_pattern('/')
+
+
+def test_literal_prefixes():
+    """Test finding literal prefixes of patterns"""
+    assert _glob_prefix('arrow-*-up') == 'arrow-'
+    assert _glob_prefix('[ab]*') == ''
+    assert _glob_prefix('rocket') == 'rocket'
+
+    assert _regex_prefix('^chevron-') == 'chevron-'
+    assert _regex_prefix('^arrows?') == 'arrow'
+    assert _regex_prefix('^ab+c') == 'ab'
+    assert _regex_prefix('^a.c') == 'a'
+    assert _regex_prefix('^a|b') == ''
+    assert _regex_prefix('chevron') == ''
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from icon_font_to_png.jobfile import load_jobfile, schedule
+
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+FA_CSS = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+FA_TTF = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+OCTICONS_CSS = os.path.join(BASE_DIR, 'files', 'octicons.css')
+OCTICONS_TTF = os.path.join(BASE_DIR, 'files', 'octicons.ttf')
+
+
+# Fixtures
+@pytest.fixture
+def tmp_dir(request):
+    """Create a temporary directory for job files"""
+    path = tempfile.mkdtemp()
+    request.addfinalizer(lambda: shutil.rmtree(path))
+    return path
+
+
+def write_jobfile(tmp_dir, data, name='jobs.json'):
+    path = os.path.join(tmp_dir, name)
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False))
+    return path
+
+
+# Tests
+def test_load_jobfile(tmp_dir):
+    """Test loading job files"""
+    path = write_jobfile(tmp_dir, {
+        'fonts': {'fa': {'css': FA_CSS, 'ttf': FA_TTF}},
+        'defaults': {'size': [16, 32], 'export_dir': 'icons'},
+        'jobs': [
+            {'font': 'fa', 'icons': ['github-*', 'U+F135']},
+            {'font': 'fa', 'icons': 'star', 'color': 'red', 'size': 64},
+            {'css': OCTICONS_CSS, 'ttf': OCTICONS_TTF,
+             'icons': ['mark-github']},
+        ],
+    })
+    registry, jobs = load_jobfile(path, keep_prefix=True)
+
+    assert len(registry) == 2
+    assert registry['fa'].keep_prefix
+    assert len(jobs) == 3
+
+    assert jobs[0]['icons'] == ['fa-github-alt', 'fa-github-square',
+                                'fa-rocket']
+    assert jobs[0]['size'] == [16, 32]
+    assert jobs[0]['color'] == 'black'
+    assert jobs[0]['export_dir'] == os.path.join(tmp_dir, 'icons')
+
+    assert jobs[1]['icons'] == ['fa-star']
+    assert jobs[1]['size'] == 64
+    assert jobs[1]['color'] == 'red'
+
+    # Icon fonts can be given by their files too
+    assert jobs[2]['font'] in registry
+    assert jobs[2]['icons'] == ['octicon-mark-github']
+
+    # Job file can be just a list of jobs, with relative paths
+    shutil.copy(FA_CSS, tmp_dir)
+    shutil.copy(FA_TTF, tmp_dir)
+    path = write_jobfile(tmp_dir, [
+        {'css': 'font-awesome.css', 'ttf': 'fontawesome-webfont.ttf',
+         'icons': 'ALL'},
+    ])
+    registry, jobs = load_jobfile(path)
+    assert len(jobs[0]['icons']) == 786
+    assert jobs[0]['export_dir'] == os.path.join(tmp_dir, 'exported')
+
+
+def test_load_jobfile_errors(tmp_dir):
+    """Test validating job files"""
+    fonts = {'fa': {'css': FA_CSS, 'ttf': FA_TTF}}
+    for data, error in (
+        ({'fonts': fonts}, "has to contain a list of jobs"),
+        (['fa'], "Job 1 isn't a dict"),
+        ([{'font': 'fa', 'icons': 'star'}], "Job 1 has no (known) icon font"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa'}]}, "Job 1 has no icons"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'star',
+                                    'colour': 'red'}]},
+         "Unknown option(s) of job 1: colour"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'star'},
+                                   {'font': 'fa', 'icons': 'foo'}]},
+         "Unknown icon name 'foo' (job 2)"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'foo-*'}]},
+         "No icons match 'foo-*' (job 1)"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': '/^a{2}/'}]},
+         "No icons match '/^a{2}/' (job 1)"),
+        ({'fonts': {'fa': {'css': FA_CSS}},
+          'jobs': [{'font': 'fa', 'icons': 'star'}]},
+         "Icon font 'fa' needs 'css' and 'ttf' files"),
+        ({'fonts': {'fa': {'css': FA_CSS, 'ttf': 'foo.ttf'}},
+          'jobs': [{'font': 'fa', 'icons': 'star'}]},
+         "Can't load icon font 'fa'"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'star',
+                                    'size': '16'}]},
+         "Job 1: 'size' has to be one or a list of positive integers"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'star',
+                                    'size': [16, 0]}]},
+         "Job 1: 'size' has to be one or a list of positive integers"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'star'},
+                                   {'font': 'fa', 'icons': 'star',
+                                    'size': []}]},
+         "Job 2: 'size' has to be"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': ['star', 1]}]},
+         "Job 1: 'icons' has to be one or a list of strings"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'star',
+                                    'color': 255}]},
+         "Job 1: 'color' has to be one or a list of strings"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'star',
+                                    'scale': 'big'}]},
+         "Job 1: 'scale' has to be a number between 0 and 1"),
+        ({'fonts': fonts, 'jobs': [{'font': 'fa', 'icons': 'star',
+                                    'scale': 2}]},
+         "Job 1: 'scale' has to be a number between 0 and 1"),
+        ({'fonts': {'fa': {'css': FA_CSS, 'ttf': FA_TTF,
+                           'supersample': '4'}},
+          'jobs': [{'font': 'fa', 'icons': 'star'}]},
+         "Icon font 'fa': 'supersample' has to be a positive integer"),
+    ):
+        path = write_jobfile(tmp_dir, data)
+        with pytest.raises(ValueError) as excinfo:
+            load_jobfile(path)
+        assert error in str(excinfo.value)
+
+    path = os.path.join(tmp_dir, 'jobs.json')
+    with io.open(path, 'w') as f:
+        f.write('{"jobs": [')
+    with pytest.raises(ValueError) as excinfo:
+        load_jobfile(path)
+    assert "Invalid job file" in str(excinfo.value)
+
+
+def test_schedule(tmp_dir):
+    """Test merging jobs into batches"""
+    path = write_jobfile(tmp_dir, {
+        'fonts': {
+            'octicons': {'css': OCTICONS_CSS, 'ttf': OCTICONS_TTF},
+            'fa': {'css': FA_CSS, 'ttf': FA_TTF},
+        },
+        'jobs': [
+            {'font': 'fa', 'icons': ['star', 'github'], 'size': 64},
+            {'font': 'octicons', 'icons': 'mark-github', 'size': 64},
+            {'font': 'fa', 'icons': ['github', 'rocket'], 'size': 64},
+            {'font': 'fa', 'icons': 'star', 'size': [16, 200]},
+            {'font': 'fa', 'icons': 'rocket', 'size': 64,
+             'filename': 'big-rocket'},
+            {'font': 'fa', 'icons': ['star', 'rocket'], 'size': 64,
+             'filename': 'big'},
+        ],
+    })
+    registry, jobs = load_jobfile(path)
+
+    with pytest.raises(ValueError) as excinfo:
+        schedule(registry, jobs)
+    assert "Job 6 exports multiple icons" in str(excinfo.value)
+
+    batches = schedule(registry, jobs[:5])
+    assert [(batch.font, batch.sizes, batch.icons) for batch in batches] == [
+        ('octicons', [64], ['mark-github']),
+        ('fa', [64], ['star', 'github', 'rocket']),
+        ('fa', [64], ['rocket']),
+        ('fa', [16, 200], ['star']),
+    ]
+    assert batches[1].filenames['rocket'] is None
+    assert batches[2].filenames['rocket'] == 'big-rocket.png'
+
+    # Multiple sizes or colors need their own file names too
+    jobs[4]['size'] = [16, 64]
+    with pytest.raises(ValueError) as excinfo:
+        schedule(registry, jobs[:5])
+    assert "Job 5 exports multiple sizes" in str(excinfo.value)
+
+    jobs[4]['filename'] = 'big-rocket-{size}'
+    jobs[4]['color'] = ['red', 'blue']
+    with pytest.raises(ValueError) as excinfo:
+        schedule(registry, jobs[:5])
+    assert "Job 5 exports multiple colors" in str(excinfo.value)
+
+    # ICO files contain all sizes
+    jobs[4]['filename'] = 'big-rocket-{color}'
+    jobs[4]['format'] = 'ico'
+    assert schedule(registry, jobs[:5])
+
+    jobs[0]['format'] = 'foo'
+    with pytest.raises(ValueError) as excinfo:
+        schedule(registry, jobs)
+    assert "Job 1:" in str(excinfo.value)
+
+
+def test_export(tmp_dir):
+    """Test exporting batches"""
+    path = write_jobfile(tmp_dir, {
+        'fonts': {'fa': {'css': FA_CSS, 'ttf': FA_TTF}},
+        'jobs': [
+            {'font': 'fa', 'icons': ['star', 'github'],
+             'size': [16, 32], 'filename': '{icon}-{size}'},
+            {'font': 'fa', 'icons': 'rocket', 'format': 'webp',
+             'export_dir': 'webp'},
+        ],
+    })
+    registry, jobs = load_jobfile(path)
+
+    for batch in schedule(registry, jobs):
+        assert batch.export(registry) == {}
+
+    for name in ('star-16.png', 'star-32.png', 'github-16.png',
+                 'github-32.png'):
+        assert os.path.isfile(os.path.join(tmp_dir, 'exported', name))
+    assert os.path.isfile(os.path.join(tmp_dir, 'webp', 'rocket.webp'))
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import sys
+
+from icon_font_to_png.lazy import LazyModule, lazy_import
+
+
+# Tests
+def test_lazy_module(monkeypatch):
+    """Test importing module on first attribute access"""
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+
+    module = lazy_import('colorsys')
+    assert isinstance(module, LazyModule)
+    assert 'colorsys' not in sys.modules
+
+    assert module.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert 'colorsys' in sys.modules
+
+
+def test_imported_module():
+    """Test already imported modules being returned as they are"""
+    assert lazy_import('sys') is sys
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+from PIL import ImageStat
+
+from icon_font_to_png import outline
+
+
+# A square with a square hole (drawn in the opposite direction)
+SQUARE = [(0, 0, True), (0, 100, True), (100, 100, True), (100, 0, True)]
+HOLE = [(25, 25, True), (75, 25, True), (75, 75, True), (25, 75, True)]
+
+
+def identity(point):
+    return point
+
+
+# Tests
+def test_contour_segments():
+    """Test adding implied on curve points"""
+    contour = [(0, 0, True), (10, 10, False), (20, 10, False),
+               (30, 0, True)]
+    start, segments = outline.contour_segments(contour)
+    assert start == (0, 0)
+    assert segments == [
+        ('Q', (10, 10), (15.0, 10.0)),
+        ('Q', (20, 10), (30, 0)),
+        ('L', (0, 0)),
+    ]
+
+    # Only off curve points
+    contour = [(0, 0, False), (10, 0, False), (10, 10, False)]
+    start, segments = outline.contour_segments(contour)
+    assert start == (5.0, 5.0)
+    assert segments[-1] == ('Q', (10, 10), (5.0, 5.0))
+
+
+def test_svg_path():
+    """Test converting outline to SVG path data"""
+    assert outline.svg_path([SQUARE]) == 'M0 0L0 100L100 100L100 0L0 0Z'
+    assert outline.svg_path([[(0, 0, True), (5, 10, False),
+                              (10.5, 0, True)]]) == \
+        'M0 0Q5 10 10.5 0L0 0Z'
+    assert outline.svg_path([]) == ''
+
+
+def test_flatten_contour():
+    """Test approximating curves with polygons"""
+    polygon = outline.flatten_contour(SQUARE, identity)
+    assert polygon == [(0, 0), (0, 100), (100, 100), (100, 0), (0, 0)]
+
+    curve = [(0, 0, True), (50, 100, False), (100, 0, True)]
+    coarse = outline.flatten_contour(curve, identity, tolerance=10)
+    fine = outline.flatten_contour(curve, identity, tolerance=0.1)
+    assert 2 < len(coarse) < len(fine)
+    # Curve apex
+    assert (50, 50) in fine
+
+
+def test_rasterize():
+    """Test drawing outline with the nonzero winding rule"""
+    def transform(point):
+        return point[0] / 10.0, point[1] / 10.0
+
+    mask = outline.rasterize([SQUARE, HOLE], 10, transform)
+    assert mask.mode == 'L'
+    assert mask.size == (10, 10)
+    assert mask.getpixel((1, 1)) == 255
+    assert mask.getpixel((5, 5)) == 0
+
+    # Contour in the same direction doesn't make a hole
+    mask = outline.rasterize([SQUARE, list(reversed(HOLE))], 10, transform)
+    assert mask.getpixel((5, 5)) == 255
+
+    # Antialiased edges
+    mask = outline.rasterize([[(5, 5, True), (5, 95, True), (95, 95, True),
+                               (95, 5, True)]], 10, transform)
+    assert 0 < mask.getpixel((0, 5)) < 255
+
+    # Empty outline
+    mask = outline.rasterize([], 10, transform)
+    assert ImageStat.Stat(mask).sum[0] == 0
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from icon_font_to_png import icon_font
+from icon_font_to_png.encoder import ImageEncoder
+from icon_font_to_png.pipeline import ExportPipeline
+from icon_font_to_png.stats import ExportStats
+
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+# Fixtures
+@pytest.fixture
+def font_awesome():
+    """Create a IconFont instance from Font Awesome files"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    return icon_font.IconFont(css_file=css_file, ttf_file=ttf_file,
+                              stats=ExportStats())
+
+
+def read_files(directory):
+    """Returns dict of file names and contents"""
+    files = dict()
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), 'rb') as f:
+            files[name] = f.read()
+    return files
+
+
+# Tests
+def test_init(font_awesome):
+    """Test validating pipeline options"""
+    for option in ('render_workers', 'encode_workers', 'write_workers',
+                   'max_in_flight'):
+        with pytest.raises(ValueError):
+            ExportPipeline(font_awesome, **{option: 0})
+
+
+@pytest.mark.parametrize("render_workers,max_in_flight", [(1, 1), (3, 16)])
+@pytest.mark.parametrize("format", ['png', 'ico', 'svg'])
+def test_export_icons(font_awesome, render_workers, max_in_flight, format):
+    """Test exporting the same files as `IconFont.export_icons`"""
+    icons = ['rocket', 'github', 'star', 'foo', 'heart']
+    kwargs = dict(size=[16, 48], color=['blue', '#123123'],
+                  filenames={'github': 'bar-{size}-{color}.' + format},
+                  encoder=ImageEncoder(format=format))
+
+    expected_dir = tempfile.mkdtemp()
+    font_awesome.export_icons(icons, export_dir=expected_dir, **kwargs)
+
+    export_dir = tempfile.mkdtemp()
+    pipeline = ExportPipeline(font_awesome, render_workers=render_workers,
+                              max_in_flight=max_in_flight)
+    failed = pipeline.export_icons(icons, export_dir=export_dir, **kwargs)
+
+    # Unknown icon doesn't stop the export
+    assert list(failed.keys()) == ['foo']
+    assert read_files(export_dir) == read_files(expected_dir)
+    assert font_awesome.stats.timings['encode'][0] > 0
+
+    shutil.rmtree(expected_dir)
+    shutil.rmtree(export_dir)
+
+
+def test_fresh_export_dir(font_awesome):
+    """Test render threads exporting into a directory that doesn't exist"""
+    tmp_dir = tempfile.mkdtemp()
+    export_dir = os.path.join(tmp_dir, 'a', 'b', 'c')
+    icons = list(font_awesome.css_icons)[:32]
+
+    pipeline = ExportPipeline(font_awesome, render_workers=8)
+    assert not pipeline.export_icons(icons, size=16, export_dir=export_dir)
+    assert len(os.listdir(export_dir)) == len(icons)
+
+    shutil.rmtree(tmp_dir)
+
+
+def test_incremental_export(font_awesome):
+    """Test skipping icons exported before"""
+    export_dir = tempfile.mkdtemp()
+    pipeline = ExportPipeline(font_awesome)
+    kwargs = dict(size=16, export_dir=export_dir, incremental=True)
+
+    assert pipeline.export_icons(['rocket', 'github'], **kwargs) == {}
+    assert font_awesome.outdated_icons(['rocket', 'github'], 16,
+                                       export_dir=export_dir) == []
+
+    os.remove(os.path.join(export_dir, 'rocket.png'))
+    font_awesome.stats.clear()
+    pipeline.export_icons(['rocket', 'github'], **kwargs)
+    assert font_awesome.stats.counters['files_saved'] == 1
+    assert os.path.isfile(os.path.join(export_dir, 'rocket.png'))
+
+    shutil.rmtree(export_dir)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import os
+import shutil
+import tempfile
+
+import pytest
+from PIL import ImageChops
+
+from icon_font_to_png import icon_font
+from icon_font_to_png.registry import FontRegistry
+
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+# Fixtures
+@pytest.fixture
+def registry():
+    """Create a FontRegistry instance with Font Awesome and Octicons"""
+    registry = FontRegistry()
+    registry.register(
+        'fa',
+        css_file=os.path.join(BASE_DIR, 'files', 'font-awesome.css'),
+        ttf_file=os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf'),
+    )
+    registry.register(
+        'octicons',
+        css_file=os.path.join(BASE_DIR, 'files', 'octicons.css'),
+        ttf_file=os.path.join(BASE_DIR, 'files', 'octicons.ttf'),
+    )
+    registry.preload()
+    return registry
+
+
+# Tests
+def test_register(registry):
+    """Test registering icon fonts"""
+    assert list(registry) == ['fa', 'octicons']
+    assert len(registry) == 2
+    assert 'fa' in registry
+    assert 'foo' not in registry
+
+    # TTF files are read only once
+    fa_prefixed = registry.register(
+        'fa-prefixed',
+        css_file=os.path.join(BASE_DIR, 'files', 'font-awesome.css'),
+        ttf_file=os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf'),
+        keep_prefix=True,
+    )
+    assert fa_prefixed.ttf is registry['fa'].ttf
+    assert fa_prefixed.keep_prefix
+    assert registry['octicons'].ttf is not registry['fa'].ttf
+
+    # Options are passed to worker processes too
+    assert registry['fa'].get_options()['ttf'] is registry['fa'].ttf
+
+    with pytest.raises(ValueError):
+        registry.register('fa', css_file=None, ttf_file=None)
+    with pytest.raises(ValueError):
+        registry.register('fa:foo', css_file=None, ttf_file=None)
+
+
+def test_resolve(registry):
+    """Test finding icons by 'font:icon' references"""
+    assert registry.resolve('fa:rocket') == (registry['fa'], 'rocket')
+    assert registry.resolve('fa:fa-rocket') == (registry['fa'], 'rocket')
+    assert registry.resolve('octicons:mark-github') == (
+        registry['octicons'], 'mark-github'
+    )
+
+    # Without font name
+    assert registry.resolve('rocket') == (registry['fa'], 'rocket')
+    assert registry.resolve('octicon-mark-github') == (
+        registry['octicons'], 'mark-github'
+    )
+
+    for reference in ('fa:mark-github', 'foo:rocket', 'foo', ''):
+        with pytest.raises(KeyError):
+            registry.resolve(reference)
+
+
+def test_shared_font_data(registry):
+    """Test rendering icons with shared font data"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    separate = icon_font.IconFont(css_file=css_file, ttf_file=ttf_file)
+
+    for size in (16, 200):
+        image = registry['fa'].render_icon('rocket', size)
+        assert ImageChops.difference(
+            image, separate.render_icon('rocket', size)
+        ).getbbox() is None
+
+    # Worker processes get the already loaded font
+    export_dir = tempfile.mkdtemp()
+    failed = registry['fa'].export_icons(['rocket', 'github'], 16,
+                                         export_dir=export_dir, jobs=2)
+    assert not failed
+    assert os.path.isfile(os.path.join(export_dir, 'rocket.png'))
+    shutil.rmtree(export_dir)
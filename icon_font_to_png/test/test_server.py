@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import os
+import threading
+
+import pytest
+import requests
+from PIL import Image, ImageChops
+
+from icon_font_to_png import icon_font
+from icon_font_to_png.server import IconRenderer, IconServer
+
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+# Fixtures
+@pytest.fixture(scope='module')
+def renderer():
+    """Create an IconRenderer instance with Font Awesome icon font"""
+    css_file = os.path.join(BASE_DIR, 'files', 'font-awesome.css')
+    ttf_file = os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf')
+    fonts = {
+        'fa': icon_font.IconFont(css_file=css_file, ttf_file=ttf_file),
+    }
+    return IconRenderer(fonts, cache_size=16)
+
+
+@pytest.fixture(scope='module')
+def server_url(renderer):
+    """Run IconServer in a background thread"""
+    server = IconServer(renderer, address=('127.0.0.1', 0), quiet=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield 'http://127.0.0.1:{port}'.format(port=server.server_address[1])
+
+    server.shutdown()
+    server.server_close()
+
+
+# Tests
+def test_renderer_cache(renderer):
+    """Test caching rendered images"""
+    renderer.cache.clear()
+    png, etag = renderer.render('fa', 'rocket', size=32)
+    assert renderer.render('fa', 'rocket', size=32) == (png, etag)
+    assert renderer.cache.hits == 1
+
+    # Different parameters are cached separately
+    assert renderer.render('fa', 'rocket', size=32, color='blue')[1] != etag
+
+    with pytest.raises(KeyError):
+        renderer.render('foo', 'rocket')
+    with pytest.raises(KeyError):
+        renderer.render('fa', 'foo')
+    with pytest.raises(ValueError):
+        renderer.render('fa', 'rocket', size=0)
+    with pytest.raises(ValueError):
+        renderer.render('fa', 'rocket', scale='2')
+    with pytest.raises(ValueError):
+        renderer.etag('fa', 'rocket', color='foo')
+
+
+def test_renderer_threads(renderer):
+    """Test that each thread renders with its own icon font"""
+    renderer.cache.clear()
+    fonts = []
+
+    def render(size):
+        renderer.render('fa', 'rocket', size=size)
+        fonts.append(renderer._thread_font('fa'))
+
+    threads = [threading.Thread(target=render, args=(size,))
+               for size in (16, 32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(renderer.cache) == 2
+    assert fonts[0] is not fonts[1]
+    assert renderer.fonts['fa'] not in fonts
+
+
+def test_render_icon(server_url):
+    """Test rendering icons over HTTP"""
+    r = requests.get(server_url + '/fa/rocket.png?size=16&color=123123')
+    assert r.status_code == 200
+    assert r.headers['Content-Type'] == 'image/png'
+
+    original_file = os.path.join(BASE_DIR, 'files', 'rocket_123123.png')
+    image = Image.open(io.BytesIO(r.content))
+    assert ImageChops.difference(Image.open(original_file),
+                                 image).getbbox() is None
+
+    # Conditional request
+    r = requests.get(server_url + '/fa/rocket.png?size=16&color=123123',
+                     headers={'If-None-Match': r.headers['ETag']})
+    assert r.status_code == 304
+    assert r.content == b''
+
+
+def test_head_requests(renderer, server_url):
+    """Test that HEAD and conditional requests don't render icons"""
+    renderer.cache.clear()
+    url = server_url + '/fa/rocket.png?size=48'
+
+    r = requests.head(url)
+    assert r.status_code == 200
+    assert r.headers['Content-Type'] == 'image/png'
+    etag = r.headers['ETag']
+
+    r = requests.get(url, headers={'If-None-Match': etag})
+    assert r.status_code == 304
+    assert len(renderer.cache) == 0
+
+    # Entity tag of rendered image is the same
+    r = requests.get(url)
+    assert r.headers['ETag'] == etag
+    assert len(renderer.cache) == 1
+
+    r = requests.head(url)
+    assert r.headers['Content-Length'] == str(len(
+        requests.get(url).content
+    ))
+    assert r.content == b''
+
+    assert requests.head(server_url + '/fa/foo.png').status_code == 404
+    assert requests.head(url + '&color=foo').status_code == 400
+
+
+def test_concurrent_requests(renderer, server_url):
+    """Test handling more requests at once than there are workers"""
+    renderer.cache.clear()
+    results = []
+
+    def get(size):
+        r = requests.get(server_url + '/fa/star.png?size={size}'.format(
+            size=size))
+        results.append(r.status_code)
+
+    threads = [threading.Thread(target=get, args=(size,))
+               for size in range(16, 40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [200] * len(threads)
+
+
+@pytest.mark.parametrize("path,status_code", [
+    ('/fa/rocket', 200),
+    ('/fa/rocket.png?size=64&scale=0.5&color=%23ff0000', 200),
+    ('/', 404),
+    ('/foo/rocket.png', 404),
+    ('/fa/foo.png', 404),
+    ('/fa/rocket.png?size=foo', 400),
+    ('/fa/rocket.png?color=foo', 400),
+])
+def test_status_codes(server_url, path, status_code):
+    """Test response status codes"""
+    assert requests.get(server_url + path).status_code == status_code
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import time
+
+from icon_font_to_png.stats import ExportStats
+
+
+# Tests
+def test_stages():
+    """Test measuring exclusive time of nested stages"""
+    stats = ExportStats()
+
+    with stats.stage('outer'):
+        time.sleep(0.01)
+        with stats.stage('inner'):
+            time.sleep(0.05)
+    with stats.stage('inner'):
+        pass
+
+    assert stats.timings['outer'][0] == 1
+    assert stats.timings['inner'][0] == 2
+    assert stats.timings['inner'][1] >= 0.05
+    assert stats.timings['outer'][1] < 0.05
+    assert stats.total_time == (stats.timings['outer'][1] +
+                                stats.timings['inner'][1])
+
+
+def test_counters_and_merging():
+    """Test counters and merging stats from other processes"""
+    stats = ExportStats()
+    stats.increment('hits')
+    stats.increment('hits', 2)
+    stats.add_time('save', 0.5)
+    assert stats.counters['hits'] == 3
+
+    other = ExportStats()
+    other.increment('hits')
+    other.increment('misses')
+    other.add_time('save', 0.25, calls=2)
+
+    stats.merge(other.to_dict())
+    stats.merge(other)
+    assert stats.counters == {'hits': 5, 'misses': 2}
+    assert stats.timings['save'] == [5, 1.0]
+
+    report = stats.report()
+    assert 'save' in report
+    assert 'misses' in report
+
+    stats.clear()
+    assert stats.total_time == 0
+    assert stats.counters == {}
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import os
+
+import pytest
+
+from icon_font_to_png.ttf import TTFFile
+
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+# Fixtures
+@pytest.fixture(scope='module')
+def font_awesome():
+    """Create a TTFFile instance from Font Awesome TTF file"""
+    return TTFFile(os.path.join(BASE_DIR, 'files', 'fontawesome-webfont.ttf'))
+
+
+# Tests
+def test_metrics(font_awesome):
+    """Test reading font metrics"""
+    assert font_awesome.units_per_em == 1792
+    assert font_awesome.ascender == 1536
+    assert font_awesome.descender == -256
+
+
+def test_glyph_metrics(font_awesome):
+    """Test reading glyph metrics ('fa-rocket' icon)"""
+    rocket = ''
+    assert font_awesome.glyph_index(rocket) > 0
+    assert font_awesome.advance_width(rocket) == 1664
+    assert font_awesome.glyph_bbox(rocket) == (36, -224, 1664, 1408)
+
+    # Missing glyph
+    assert font_awesome.glyph_index('a') == 0
+
+
+def test_glyph_contours(font_awesome):
+    """Test reading glyph outline ('fa-rocket' icon)"""
+    rocket = ''
+    contours = font_awesome.glyph_contours(rocket)
+    assert len(contours) == 2
+
+    # On curve points are within glyph bounding box
+    x_min, y_min, x_max, y_max = font_awesome.glyph_bbox(rocket)
+    for contour in contours:
+        for x, y, on_curve in contour:
+            if on_curve:
+                assert x_min <= x <= x_max
+                assert y_min <= y <= y_max
+
+    # Glyph without outline
+    assert font_awesome.glyph_contours(' ') == []
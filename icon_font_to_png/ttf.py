@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import struct
+
+
+class TTFFile(object):
+    """
+    Minimal TrueType font reader.
+
+    It only reads the tables needed to find out glyph metrics (and doesn't
+    depend on FreeType), so it's cheap enough to be used once per font.
+    """
+    def __init__(self, ttf_file):
+        """
+        :param ttf_file: path to TTF file
+        """
+        self.ttf_file = ttf_file
+
+        with open(ttf_file, 'rb') as f:
+            self.data = f.read()
+
+        self.tables = self._read_table_directory()
+
+        head = self.tables['head']
+        self.units_per_em, = struct.unpack_from('>H', self.data, head + 18)
+        self.index_to_loc_format, = struct.unpack_from('>h', self.data,
+                                                       head + 50)
+
+        hhea = self.tables['hhea']
+        self.ascender, self.descender = struct.unpack_from('>hh', self.data,
+                                                           hhea + 4)
+        self.number_of_h_metrics, = struct.unpack_from('>H', self.data,
+                                                       hhea + 34)
+
+        self.cmap = self._read_cmap()
+
+    def _read_table_directory(self):
+        """Returns dict of table tags and their offsets"""
+        num_tables, = struct.unpack_from('>H', self.data, 4)
+        tables = dict()
+
+        for i in range(num_tables):
+            tag, _, offset, _ = struct.unpack_from('>4sLLL', self.data,
+                                                   12 + 16 * i)
+            tables[tag.decode('latin-1')] = offset
+
+        return tables
+
+    def _read_cmap(self):
+        """Returns dict of codepoints and glyph indexes"""
+        cmap = self.tables['cmap']
+        num_subtables, = struct.unpack_from('>H', self.data, cmap + 2)
+
+        subtables = dict()
+        for i in range(num_subtables):
+            platform, encoding, offset = struct.unpack_from(
+                '>HHL', self.data, cmap + 4 + 8 * i
+            )
+            fmt, = struct.unpack_from('>H', self.data, cmap + offset)
+            subtables[(platform, encoding, fmt)] = cmap + offset
+
+        # Prefer full Unicode tables
+        for key in ((3, 10, 12), (0, 4, 12), (3, 1, 4), (0, 3, 4)):
+            if key in subtables:
+                if key[2] == 12:
+                    return self._read_cmap_format_12(subtables[key])
+                return self._read_cmap_format_4(subtables[key])
+
+        return dict()
+
+    def _read_cmap_format_4(self, offset):
+        """Reads 'segment mapping to delta values' cmap subtable"""
+        seg_count = struct.unpack_from('>H', self.data, offset + 6)[0] // 2
+        ends_offset = offset + 14
+        starts_offset = ends_offset + 2 * seg_count + 2
+        deltas_offset = starts_offset + 2 * seg_count
+        range_offsets_offset = deltas_offset + 2 * seg_count
+
+        ends = struct.unpack_from('>%dH' % seg_count, self.data, ends_offset)
+        starts = struct.unpack_from('>%dH' % seg_count, self.data,
+                                    starts_offset)
+        deltas = struct.unpack_from('>%dh' % seg_count, self.data,
+                                    deltas_offset)
+        range_offsets = struct.unpack_from('>%dH' % seg_count, self.data,
+                                           range_offsets_offset)
+
+        cmap = dict()
+        for i in range(seg_count):
+            for codepoint in range(starts[i], ends[i] + 1):
+                if codepoint == 0xFFFF:
+                    continue
+
+                if range_offsets[i] == 0:
+                    glyph = (codepoint + deltas[i]) & 0xFFFF
+                else:
+                    glyph_offset = (range_offsets_offset + 2 * i +
+                                    range_offsets[i] +
+                                    2 * (codepoint - starts[i]))
+                    glyph, = struct.unpack_from('>H', self.data, glyph_offset)
+                    if glyph:
+                        glyph = (glyph + deltas[i]) & 0xFFFF
+
+                if glyph:
+                    cmap[codepoint] = glyph
+
+        return cmap
+
+    def _read_cmap_format_12(self, offset):
+        """Reads 'segmented coverage' cmap subtable"""
+        num_groups, = struct.unpack_from('>L', self.data, offset + 12)
+
+        cmap = dict()
+        for i in range(num_groups):
+            start, end, glyph = struct.unpack_from('>LLL', self.data,
+                                                   offset + 16 + 12 * i)
+            for codepoint in range(start, end + 1):
+                cmap[codepoint] = glyph + codepoint - start
+
+        return cmap
+
+    def _glyph_offset(self, glyph):
+        """Returns glyph data offset and length in 'glyf' table"""
+        loca = self.tables['loca']
+        if self.index_to_loc_format == 0:
+            start, end = struct.unpack_from('>HH', self.data, loca + 2 * glyph)
+            start, end = start * 2, end * 2
+        else:
+            start, end = struct.unpack_from('>LL', self.data, loca + 4 * glyph)
+
+        return self.tables['glyf'] + start, end - start
+
+    def glyph_index(self, char):
+        """Returns glyph index of given character (0 if it's missing)"""
+        return self.cmap.get(ord(char), 0)
+
+    def advance_width(self, char):
+        """Returns glyph advance width, in font units"""
+        glyph = min(self.glyph_index(char), self.number_of_h_metrics - 1)
+        width, = struct.unpack_from('>H', self.data,
+                                    self.tables['hmtx'] + 4 * glyph)
+        return width
+
+    def glyph_bbox(self, char):
+        """
+        Returns glyph outline bounding box (xMin, yMin, xMax, yMax),
+        in font units, or None for glyphs without (TrueType) outline.
+        """
+        if 'glyf' not in self.tables:
+            return None
+
+        offset, length = self._glyph_offset(self.glyph_index(char))
+        if length == 0:
+            return None
+
+        return struct.unpack_from('>hhhh', self.data, offset + 2)
+
+    def glyph_contours(self, char):
+        """
+        Returns glyph outline, in font units, as a list of contours - lists
+        of (x, y, on curve) points, where off curve points are control
+        points of quadratic Bezier curves. Components of composite glyphs
+        are merged into a single outline.
+        """
+        if 'glyf' not in self.tables:
+            return []
+
+        return self._glyph_contours(self.glyph_index(char))
+
+    def _glyph_contours(self, glyph, depth=0):
+        """Reads (simple or composite) glyph outline"""
+        offset, length = self._glyph_offset(glyph)
+        if length == 0:
+            return []
+
+        num_contours, = struct.unpack_from('>h', self.data, offset)
+        offset += 10
+
+        if num_contours >= 0:
+            return self._read_simple_glyph(offset, num_contours)
+
+        # Protect from (invalid) recursive composite glyphs
+        if depth > 8:
+            return []
+
+        return self._read_composite_glyph(offset, depth)
+
+    def _read_simple_glyph(self, offset, num_contours):
+        """Reads glyph outline made of contours"""
+        end_points = struct.unpack_from('>%dH' % num_contours, self.data,
+                                        offset)
+        offset += 2 * num_contours
+        num_points = end_points[-1] + 1 if end_points else 0
+
+        instructions_length, = struct.unpack_from('>H', self.data, offset)
+        offset += 2 + instructions_length
+
+        flags = []
+        while len(flags) < num_points:
+            flag = struct.unpack_from('>B', self.data, offset)[0]
+            offset += 1
+            repeat = 1
+            if flag & 0x08:
+                repeat += struct.unpack_from('>B', self.data, offset)[0]
+                offset += 1
+            flags.extend([flag] * repeat)
+        flags = flags[:num_points]
+
+        xs, offset = self._read_coordinates(flags, offset, 0x02, 0x10)
+        ys, offset = self._read_coordinates(flags, offset, 0x04, 0x20)
+
+        contours = []
+        start = 0
+        for end in end_points:
+            contours.append([
+                (xs[i], ys[i], bool(flags[i] & 0x01))
+                for i in range(start, end + 1)
+            ])
+            start = end + 1
+
+        return contours
+
+    def _read_coordinates(self, flags, offset, short_flag, same_flag):
+        """Reads delta encoded x or y coordinates of simple glyph points"""
+        coordinates = []
+        value = 0
+
+        for flag in flags:
+            if flag & short_flag:
+                delta, = struct.unpack_from('>B', self.data, offset)
+                offset += 1
+                if not flag & same_flag:
+                    delta = -delta
+            elif flag & same_flag:
+                delta = 0
+            else:
+                delta, = struct.unpack_from('>h', self.data, offset)
+                offset += 2
+
+            value += delta
+            coordinates.append(value)
+
+        return coordinates, offset
+
+    def _read_composite_glyph(self, offset, depth):
+        """Reads glyph outline made of (transformed) other glyphs"""
+        contours = []
+
+        while True:
+            flags, glyph = struct.unpack_from('>HH', self.data, offset)
+            offset += 4
+
+            if flags & 0x0001:
+                dx, dy = struct.unpack_from('>hh', self.data, offset)
+                offset += 4
+            else:
+                dx, dy = struct.unpack_from('>bb', self.data, offset)
+                offset += 2
+
+            # Matching points instead of offsets aren't supported
+            if not flags & 0x0002:
+                dx, dy = 0, 0
+
+            xx, xy, yx, yy = 1.0, 0.0, 0.0, 1.0
+            if flags & 0x0008:
+                xx = yy = _f2dot14(self.data, offset)
+                offset += 2
+            elif flags & 0x0040:
+                xx = _f2dot14(self.data, offset)
+                yy = _f2dot14(self.data, offset + 2)
+                offset += 4
+            elif flags & 0x0080:
+                xx = _f2dot14(self.data, offset)
+                xy = _f2dot14(self.data, offset + 2)
+                yx = _f2dot14(self.data, offset + 4)
+                yy = _f2dot14(self.data, offset + 6)
+                offset += 8
+
+            for contour in self._glyph_contours(glyph, depth + 1):
+                if (xx, xy, yx, yy) == (1.0, 0.0, 0.0, 1.0):
+                    contours.append([
+                        (x + dx, y + dy, on_curve)
+                        for x, y, on_curve in contour
+                    ])
+                else:
+                    contours.append([
+                        (x * xx + y * yx + dx, x * xy + y * yy + dy,
+                         on_curve)
+                        for x, y, on_curve in contour
+                    ])
+
+            if not flags & 0x0020:
+                break
+
+        return contours
+
+
+def _f2dot14(data, offset):
+    """Reads 2.14 fixed point number"""
+    value, = struct.unpack_from('>h', data, offset)
+    return value / 16384.0
@@ -61,7 +61,9 @@ setup(
         'tinycss>=0.4',
     ],
     extras_require={
+        'numpy': ['numpy'],
         'testing': ['pytest'],
+        'yaml': ['PyYAML'],
     },
     scripts=['bin/font-awesome-to-png', 'bin/icon-font-to-png'],
     keywords='icon font export font awesome octicons',